@@ -0,0 +1,13 @@
+"""
+Пакет benchmarks - замеры производительности менеджера заметок.
+
+Запуск: python -m benchmarks.run --sizes 1000 10000
+
+Modules:
+    corpus: Генератор синтетических корпусов заметок с фиксированным seed
+    common: Реестр замеров и вспомогательные функции
+    bench_core: Замеры Storage, Note, поиска и заполнения Treeview
+    bench_crypto: Цена шифрования хранилища по сравнению с открытым JSON
+    bench_parallel: Масштабирование разбора и поиска по количеству процессов
+    run: Запуск замеров и сравнение с сохраненным baseline
+"""
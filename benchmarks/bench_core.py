@@ -0,0 +1,166 @@
+"""
+Модуль bench_core - замеры основных операций приложения.
+
+Замеряются время импорта приложения, Storage.get_all (с теплым снимком
+и без него), save/delete, Note.from_dict/to_dict (с проверкой по схеме
+и в доверенном режиме), фильтрация
+поиска в том виде, как ее выполнял NoteApp.refresh_notes, поиск по
+TrigramIndex и заполнение Treeview без показа окна.
+"""
+
+import os
+import subprocess
+import sys
+from notebook import Note, Storage
+from notebook.search import TrigramIndex
+from .common import benchmark, SkipBenchmark
+
+SEARCH_QUERY = "урок"
+TYPO_QUERY = "урки"
+
+
+@benchmark("storage.get_all")
+def bench_get_all(ctx):
+    storage = Storage(ctx.corpus_path)
+    return storage.get_all
+
+
+@benchmark("storage.get_all_cold")
+def bench_get_all_cold(ctx):
+    storage = Storage(ctx.corpus_path, use_snapshot=False)
+    return storage.get_all
+
+
+@benchmark("startup.import")
+def bench_startup_import(ctx):
+    # время запуска интерпретатора с импортом main (без открытия окна)
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    command = [sys.executable, "-c", "import main"]
+    return lambda: subprocess.run(command, cwd=root, check=True)
+
+
+@benchmark("storage.save")
+def bench_save(ctx):
+    storage = Storage(ctx.copy_corpus("save.json"))
+    note = Note.from_dict(ctx.records[0])
+    return lambda: storage.save(note)
+
+
+@benchmark("storage.delete")
+def bench_delete(ctx):
+    path = ctx.copy_corpus("delete.json")
+    storage = Storage(path)
+    return (lambda: ctx.copy_corpus("delete.json"),
+            lambda: storage.delete(ctx.size))
+
+
+@benchmark("note.from_dict")
+def bench_from_dict(ctx):
+    records = ctx.records
+    return lambda: [Note.from_dict(item) for item in records]
+
+
+@benchmark("note.from_dict_trusted")
+def bench_from_dict_trusted(ctx):
+    records = ctx.records
+    return lambda: [Note.from_dict(item, trusted=True) for item in records]
+
+
+@benchmark("note.to_dict")
+def bench_to_dict(ctx):
+    notes = [Note.from_dict(item) for item in ctx.records]
+    return lambda: [n.to_dict() for n in notes]
+
+
+def _search_rows(notes, search):
+    """Повторяет фильтрацию и подготовку строк из NoteApp.refresh_notes."""
+    rows = []
+    for note in notes:
+        tags_str = ", ".join([f"#{t}" for t in note.tags]) if note.tags else "—"
+        priority_text = {"low": "Низкий", "medium": "Средний", "high": "Высокий"}[note.priority]
+        status_text = {"active": "В работе", "done": "Готово", "archived": "Архив"}[note.status]
+        if search:
+            if (search in note.title.lower() or
+                    search in note.content.lower() or
+                    search in " ".join(note.tags)):
+                rows.append((note.id, note.title, tags_str, priority_text, status_text, note.created_at[:10]))
+        else:
+            rows.append((note.id, note.title, tags_str, priority_text, status_text, note.created_at[:10]))
+    return rows
+
+
+@benchmark("search.filter")
+def bench_search(ctx):
+    notes = [Note.from_dict(item) for item in ctx.records]
+    return lambda: _search_rows(notes, SEARCH_QUERY)
+
+
+@benchmark("search.index_build")
+def bench_index_build(ctx):
+    notes = [Note.from_dict(item) for item in ctx.records]
+    return lambda: TrigramIndex(notes)
+
+
+@benchmark("search.exact")
+def bench_search_exact(ctx):
+    index = TrigramIndex(Note.from_dict(item) for item in ctx.records)
+    return index._cache.clear, lambda: index.search(SEARCH_QUERY, fuzzy=False)
+
+
+@benchmark("search.fuzzy")
+def bench_search_fuzzy(ctx):
+    index = TrigramIndex(Note.from_dict(item) for item in ctx.records)
+    return index._cache.clear, lambda: index.search(TYPO_QUERY, fuzzy=True)
+
+
+@benchmark("search.typing")
+def bench_search_typing(ctx):
+    index = TrigramIndex(Note.from_dict(item) for item in ctx.records)
+    prefixes = [SEARCH_QUERY[:end] for end in range(1, len(SEARCH_QUERY) + 1)]
+
+    def typing():
+        for prefix in prefixes:
+            index.search(prefix, fuzzy=False)
+
+    # каждый повтор начинается с пустого кэша
+    return index._cache.clear, typing
+
+
+@benchmark("display.rows")
+def bench_display_rows(ctx):
+    try:
+        from gui.app import display_row
+    except ImportError as e:
+        raise SkipBenchmark(f"tkinter недоступен: {e}")
+    notes = [Note.from_dict(item) for item in ctx.records]
+    cache = {note.id: display_row(note) for note in notes}
+
+    def cached_rows():
+        # так таблица получает строки при обновлении: только поиск в кэше
+        return [cache[note.id] for note in notes]
+
+    return cached_rows
+
+
+@benchmark("treeview.populate")
+def bench_treeview(ctx):
+    try:
+        import tkinter as tk
+        from tkinter import ttk
+        root = tk.Tk()
+    except Exception as e:  # нет дисплея или tkinter
+        raise SkipBenchmark(f"Tk недоступен: {e}")
+    root.withdraw()
+    tree = ttk.Treeview(root, columns=("id", "title", "tags", "priority", "status", "date"), show="headings")
+    rows = _search_rows([Note.from_dict(item) for item in ctx.records], "")
+
+    def clear():
+        tree.delete(*tree.get_children())
+
+    def populate():
+        for row in rows:
+            tree.insert("", "end", values=row)
+        root.update_idletasks()
+
+    ctx.cleanup.append(root.destroy)
+    return clear, populate
@@ -0,0 +1,55 @@
+"""
+Модуль bench_crypto - цена шифрования хранилища.
+
+Замеры повторяют storage.get_all_cold и storage.save для зашифрованного
+файла, поэтому накладные расходы видны прямым сравнением строк таблицы.
+Отдельно замеряются чтение одной заметки (по оглавлению против полного
+разбора открытого JSON) и получение ключа из пароля без кэша.
+"""
+
+from notebook import Note, Storage
+from notebook.crypto import derive_key
+from .common import benchmark, SkipBenchmark
+
+PASSWORD = "benchmark"
+
+
+def _encrypted_storage(ctx, name: str) -> Storage:
+    """Создает зашифрованную копию корпуса."""
+    try:
+        storage = Storage(ctx.copy_corpus(name), password=PASSWORD)
+    except ValueError as e:
+        raise SkipBenchmark(str(e))
+    storage._save_notes(ctx.records)
+    return storage
+
+
+@benchmark("crypto.get_all")
+def bench_get_all(ctx):
+    storage = _encrypted_storage(ctx, "crypto_get_all.json")
+    return storage.get_all
+
+
+@benchmark("crypto.save")
+def bench_save(ctx):
+    storage = _encrypted_storage(ctx, "crypto_save.json")
+    note = Note.from_dict(ctx.records[0])
+    return lambda: storage.save(note)
+
+
+@benchmark("storage.get_one")
+def bench_get_one_plain(ctx):
+    storage = Storage(ctx.corpus_path, use_snapshot=False)
+    return lambda: storage.get(ctx.size // 2)
+
+
+@benchmark("crypto.get_one")
+def bench_get_one(ctx):
+    storage = _encrypted_storage(ctx, "crypto_get_one.json")
+    return lambda: storage.get(ctx.size // 2)
+
+
+@benchmark("crypto.derive_key")
+def bench_derive_key(ctx):
+    salt = b"\0" * 16
+    return derive_key.cache_clear, lambda: derive_key(PASSWORD, salt)
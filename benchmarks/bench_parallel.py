@@ -0,0 +1,49 @@
+"""
+Модуль bench_parallel - масштабирование по ядрам.
+
+Одни и те же операции (фильтрация по тексту и регулярному выражению,
+нечеткий поиск) замеряются для разного количества процессов
+ParallelScanner; w1 - обработка в текущем процессе без пула. Запуск пула
+в замер не входит: перед замером выполняется прогон по всему корпусу,
+который запускает все процессы. Замеры с процессами больше, чем ядер,
+пропускаются.
+"""
+
+import os
+from notebook.parallel import ParallelScanner
+from .common import benchmark, SkipBenchmark
+
+WORKER_COUNTS = (1, 2, 4, 8)
+SEARCH_QUERY = "урок"
+TYPO_QUERY = "урки"
+WARMUP_QUERY = "\x00"  # ни с чем не совпадает
+PATTERN = r"урок\w* \d"
+
+
+def _scanner(ctx, workers: int):
+    """Создает сканер с запущенным пулом и читает корпус."""
+    if workers > (os.cpu_count() or 1):
+        raise SkipBenchmark(f"ядер меньше {workers}")
+    with open(ctx.corpus_path, 'rb') as f:
+        data = f.read()
+    scanner = ParallelScanner(workers, min_bytes=0)
+    # настоящий корпус делится на workers * CHUNKS_PER_WORKER кусков и запускает весь пул
+    scanner.filter(data, WARMUP_QUERY)
+    ctx.cleanup.append(scanner.close)
+    return scanner, data
+
+
+def _register(workers: int):
+    @benchmark(f"parallel.filter.w{workers}")
+    def bench_filter(ctx):
+        scanner, data = _scanner(ctx, workers)
+        return lambda: scanner.filter(data, SEARCH_QUERY, PATTERN)
+
+    @benchmark(f"parallel.fuzzy.w{workers}")
+    def bench_fuzzy(ctx):
+        scanner, data = _scanner(ctx, workers)
+        return lambda: scanner.fuzzy(data, TYPO_QUERY)
+
+
+for _workers in WORKER_COUNTS:
+    _register(_workers)
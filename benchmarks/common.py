@@ -0,0 +1,108 @@
+"""
+Модуль common - реестр замеров и измерение времени.
+
+Замер - это функция, которая получает Context и возвращает функцию без
+аргументов; ее время выполнения и измеряется. Вместо функции можно вернуть
+пару (setup, func): setup вызывается перед каждым повтором и в замер не входит.
+Подготовка (генерация корпуса, запись файлов) в замер не входит.
+"""
+
+import os
+import time
+from typing import Callable, Dict, List, Optional
+from .corpus import generate_notes, write_corpus
+
+BENCHMARKS: Dict[str, Callable] = {}
+
+
+class SkipBenchmark(Exception):
+    """Исключение для замера, который нельзя выполнить в текущем окружении."""
+
+
+class Context:
+    """Общие данные для замеров одного размера корпуса.
+
+    Attributes:
+        size (int): Количество заметок
+        seed (int): Seed генератора
+        work_dir (str): Временная директория для файлов
+        cleanup (List[Callable]): Функции, вызываемые после замеров этого размера
+    """
+
+    def __init__(self, size: int, seed: int, work_dir: str):
+        """Инициализирует контекст.
+
+        Args:
+            size (int): Количество заметок
+            seed (int): Seed генератора
+            work_dir (str): Временная директория для файлов
+        """
+        self.size = size
+        self.seed = seed
+        self.work_dir = work_dir
+        self.cleanup: List[Callable] = []
+        self._records: Optional[List[Dict]] = None
+        self._corpus_path: Optional[str] = None
+
+    @property
+    def records(self) -> List[Dict]:
+        """Корпус в виде списка словарей (генерируется один раз)."""
+        if self._records is None:
+            self._records = generate_notes(self.size, self.seed)
+        return self._records
+
+    @property
+    def corpus_path(self) -> str:
+        """Путь к эталонному файлу корпуса (создается один раз)."""
+        if self._corpus_path is None:
+            self._corpus_path = os.path.join(self.work_dir, f"corpus_{self.size}.json")
+            write_corpus(self._corpus_path, self.records)
+        return self._corpus_path
+
+    def copy_corpus(self, name: str) -> str:
+        """Копирует эталонный файл, чтобы замер мог его изменять.
+
+        Args:
+            name (str): Имя копии
+
+        Returns:
+            str: Путь к копии
+        """
+        path = os.path.join(self.work_dir, name)
+        with open(self.corpus_path, 'rb') as src, open(path, 'wb') as dst:
+            dst.write(src.read())
+        return path
+
+
+def benchmark(name: str):
+    """Декоратор, регистрирующий замер под указанным именем.
+
+    Args:
+        name (str): Имя замера в таблице результатов
+    """
+    def register(func: Callable) -> Callable:
+        BENCHMARKS[name] = func
+        return func
+    return register
+
+
+def measure(func: Callable[[], object], repeat: int,
+            setup: Optional[Callable[[], object]] = None) -> float:
+    """Выполняет функцию несколько раз и возвращает лучшее время.
+
+    Args:
+        func (Callable): Измеряемая функция
+        repeat (int): Количество повторов
+        setup (Optional[Callable], optional): Подготовка перед каждым повтором. Defaults to None.
+
+    Returns:
+        float: Минимальное время выполнения в секундах
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
@@ -0,0 +1,144 @@
+"""
+Модуль corpus - генерация синтетических корпусов заметок.
+
+Корпус воспроизводим: при одинаковых seed и размере генерируются одни и те же
+заметки. Словарь растет с корпусом, как в живых текстах (закон Хипса):
+около 6 тысяч слов на 1000 заметок и 60 тысяч на 100 000. Его голова -
+служебные и обычные слова заметок ("и", "уроки", "report"), хвост -
+псевдослова из слогов, примерно 80% кириллицей. Частоты слов и тегов
+распределены по закону Ципфа: несколько частых слов и длинный хвост редких.
+"""
+
+import json
+import random
+from datetime import datetime, timedelta
+from itertools import accumulate
+from typing import List, Dict, Iterator, Tuple
+
+STOP_WORDS = (
+    "и", "в", "не", "на", "с", "что", "по", "для", "к", "до", "the", "to", "and",
+)
+CYRILLIC_WORDS = (
+    "уроки", "работа", "дом", "покупки", "встреча", "отчет", "проект", "задача",
+    "молоко", "хлеб", "математика", "физика", "позвонить", "купить", "сделать",
+    "неделя", "завтра", "срочно", "идея", "книга", "фильм", "врач", "спорт",
+    "список", "план", "поездка", "подарок", "семья", "друзья", "оплатить",
+)
+LATIN_WORDS = (
+    "meeting", "report", "deadline", "python", "release", "review", "bug",
+    "feature", "invoice", "draft", "todo", "email", "backup", "server", "api",
+)
+TAGS = (
+    "учеба", "работа", "дом", "покупки", "важно", "идеи", "спорт", "здоровье",
+    "финансы", "книги", "work", "personal", "travel", "python", "family",
+)
+CYRILLIC_SYLLABLES = ("б", "в", "г", "д", "ж", "з", "к", "л", "м", "н", "п", "р", "с", "т",
+                      "ф", "х", "ц", "ч", "ш", "щ", ""), ("а", "е", "и", "о", "у", "ы", "я", "ю")
+LATIN_SYLLABLES = ("b", "c", "d", "f", "g", "h", "k", "l", "m", "n", "p", "r", "s", "t",
+                   "v", "w", "z", ""), ("a", "e", "i", "o", "u")
+AVG_WORDS_PER_NOTE = 45
+HEAPS_K = 30
+HEAPS_BETA = 0.5
+PRIORITIES = ("low", "medium", "high")
+STATUSES = ("active", "done", "archived")
+START_DATE = datetime(2024, 1, 1)
+
+
+def vocabulary_size(size: int) -> int:
+    """Оценивает размер словаря корпуса по закону Хипса.
+
+    Args:
+        size (int): Количество заметок
+
+    Returns:
+        int: Количество разных слов (не меньше готовых слов)
+    """
+    base = len(STOP_WORDS) + len(CYRILLIC_WORDS) + len(LATIN_WORDS)
+    return max(base, int(HEAPS_K * (size * AVG_WORDS_PER_NOTE) ** HEAPS_BETA))
+
+
+def _pseudo_word(rng: random.Random) -> str:
+    """Генерирует псевдослово из 1-4 слогов, примерно 80% кириллицей."""
+    consonants, vowels = CYRILLIC_SYLLABLES if rng.random() < 0.8 else LATIN_SYLLABLES
+    syllables = rng.choices((1, 2, 3, 4), weights=(1, 4, 4, 2))[0]
+    word = "".join(rng.choice(consonants) + rng.choice(vowels) for _ in range(syllables))
+    return word + rng.choice(consonants)
+
+
+def build_vocabulary(size: int, rng: random.Random) -> Tuple[List[str], List[float]]:
+    """Строит словарь корпуса с частотами по закону Ципфа.
+
+    Args:
+        size (int): Количество заметок
+        rng (random.Random): Генератор
+
+    Returns:
+        Tuple[List[str], List[float]]: Слова по убыванию частоты и накопленные веса для rng.choices
+    """
+    words = list(STOP_WORDS) + list(CYRILLIC_WORDS) + list(LATIN_WORDS)
+    seen = set(words)
+    target = vocabulary_size(size)
+    while len(words) < target:
+        word = _pseudo_word(rng)
+        if word not in seen:
+            seen.add(word)
+            words.append(word)
+    return words, list(accumulate(1 / rank for rank in range(1, len(words) + 1)))
+
+
+def _words(rng: random.Random, vocabulary: Tuple[List[str], List[float]], count: int) -> str:
+    """Генерирует строку из случайных слов словаря."""
+    words, cum_weights = vocabulary
+    return " ".join(rng.choices(words, cum_weights=cum_weights, k=count))
+
+
+def iter_notes(size: int, seed: int = 42) -> Iterator[Dict]:
+    """Генерирует заметки в виде словарей в формате notes.json.
+
+    Args:
+        size (int): Количество заметок
+        seed (int, optional): Seed генератора. Defaults to 42.
+
+    Yields:
+        Dict: Очередная заметка
+    """
+    rng = random.Random(seed)
+    vocabulary = build_vocabulary(size, rng)
+    tag_weights = [1 / (rank + 1) for rank in range(len(TAGS))]
+    for note_id in range(1, size + 1):
+        tag_count = rng.choices((0, 1, 2, 3), weights=(3, 4, 2, 1))[0]
+        tags = sorted(set(rng.choices(TAGS, weights=tag_weights, k=tag_count)))
+        created = START_DATE + timedelta(seconds=rng.randrange(0, 365 * 24 * 3600))
+        yield {
+            "id": note_id,
+            "title": _words(rng, vocabulary, rng.randint(1, 5)).capitalize(),
+            "content": _words(rng, vocabulary, rng.randint(5, 80)),
+            "priority": rng.choices(PRIORITIES, weights=(3, 5, 2))[0],
+            "status": rng.choices(STATUSES, weights=(6, 3, 1))[0],
+            "tags": tags,
+            "created_at": created.isoformat(),
+        }
+
+
+def generate_notes(size: int, seed: int = 42) -> List[Dict]:
+    """Возвращает корпус заметок списком.
+
+    Args:
+        size (int): Количество заметок
+        seed (int, optional): Seed генератора. Defaults to 42.
+
+    Returns:
+        List[Dict]: Список заметок
+    """
+    return list(iter_notes(size, seed))
+
+
+def write_corpus(path: str, records: List[Dict]) -> None:
+    """Записывает корпус в файл в том же формате, что и Storage.
+
+    Args:
+        path (str): Путь к файлу
+        records (List[Dict]): Заметки корпуса (см. generate_notes)
+    """
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(records, f, ensure_ascii=False, indent=2)
@@ -0,0 +1,142 @@
+"""
+Модуль run - запуск замеров и сравнение с baseline.
+
+Примеры:
+    python -m benchmarks.run --sizes 1000 10000 --save-baseline
+    python -m benchmarks.run --sizes 1000 10000 --only storage. search.
+
+Результаты сравниваются с baseline-файлом (по умолчанию
+benchmarks/baseline.json). Если замер медленнее baseline больше чем на
+--threshold процентов, он помечается как регрессия и скрипт завершается
+с кодом 1.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+from typing import Dict, List, Optional, Tuple
+from .common import BENCHMARKS, Context, SkipBenchmark, measure
+from . import bench_core  # noqa: F401  регистрирует замеры
+from . import bench_crypto  # noqa: F401
+from . import bench_parallel  # noqa: F401
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+
+def parse_arguments(argv: Optional[List[str]] = None):
+    """Парсит аргументы командной строки."""
+    parser = argparse.ArgumentParser(description="Замеры производительности менеджера заметок")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000],
+                        help="Размеры корпусов (от 1k до 1M заметок)")
+    parser.add_argument('--seed', type=int, default=42, help="Seed генератора корпуса")
+    parser.add_argument('--repeat', type=int, default=3, help="Количество повторов каждого замера")
+    parser.add_argument('--only', nargs='*', default=[], help="Префиксы имен замеров")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="Файл baseline")
+    parser.add_argument('--save-baseline', action='store_true', help="Сохранить результаты как baseline")
+    parser.add_argument('--threshold', type=float, default=20.0,
+                        help="Допустимое замедление в процентах")
+    return parser.parse_args(argv)
+
+
+def run_benchmarks(sizes: List[int], seed: int = 42, repeat: int = 3,
+                   only: Optional[List[str]] = None) -> Dict[str, float]:
+    """Выполняет замеры для всех размеров корпуса.
+
+    Args:
+        sizes (List[int]): Размеры корпусов
+        seed (int, optional): Seed генератора. Defaults to 42.
+        repeat (int, optional): Количество повторов. Defaults to 3.
+        only (Optional[List[str]], optional): Префиксы имен замеров. Defaults to None.
+
+    Returns:
+        Dict[str, float]: Время в секундах по ключам вида "имя@размер"
+    """
+    results = {}
+    for size in sizes:
+        work_dir = tempfile.mkdtemp(prefix="notes_bench_")
+        ctx = Context(size, seed, work_dir)
+        try:
+            for name, factory in BENCHMARKS.items():
+                if only and not any(name.startswith(prefix) for prefix in only):
+                    continue
+                try:
+                    prepared = factory(ctx)
+                except SkipBenchmark as e:
+                    print(f"[SKIP] {name}@{size}: {e}", file=sys.stderr)
+                    continue
+                if isinstance(prepared, tuple):
+                    setup, func = prepared
+                else:
+                    setup, func = None, prepared
+                results[f"{name}@{size}"] = measure(func, repeat, setup)
+        finally:
+            for func in ctx.cleanup:
+                func()
+            shutil.rmtree(work_dir, ignore_errors=True)
+    return results
+
+
+def load_baseline(path: str) -> Dict[str, float]:
+    """Читает baseline из файла (пустой словарь, если файла нет)."""
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def format_table(results: Dict[str, float], baseline: Dict[str, float],
+                 threshold: float) -> Tuple[str, List[str]]:
+    """Формирует таблицу сравнения с baseline.
+
+    Args:
+        results (Dict[str, float]): Текущие результаты
+        baseline (Dict[str, float]): Сохраненные результаты
+        threshold (float): Допустимое замедление в процентах
+
+    Returns:
+        Tuple[str, List[str]]: Текст таблицы и список ключей с регрессией
+    """
+    header = f"{'замер':<28}{'размер':>9}{'время, мс':>12}{'baseline':>12}{'изменение':>11}"
+    lines = [header, "-" * len(header)]
+    regressions = []
+    for key, seconds in results.items():
+        name, size = key.rsplit("@", 1)
+        base = baseline.get(key)
+        if base:
+            change = (seconds - base) / base * 100
+            mark = ""
+            if change > threshold:
+                mark = "  РЕГРЕССИЯ"
+                regressions.append(key)
+            base_text, change_text = f"{base * 1000:.2f}", f"{change:+.1f}%"
+        else:
+            base_text, change_text, mark = "—", "—", ""
+        lines.append(f"{name:<28}{size:>9}{seconds * 1000:>12.2f}{base_text:>12}{change_text:>11}{mark}")
+    return "\n".join(lines), regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Точка входа: замеры, таблица и сохранение baseline.
+
+    Returns:
+        int: 1 если найдены регрессии, иначе 0
+    """
+    args = parse_arguments(argv)
+    results = run_benchmarks(args.sizes, args.seed, args.repeat, args.only)
+    baseline = load_baseline(args.baseline)
+    table, regressions = format_table(results, baseline, args.threshold)
+    print(table)
+    if args.save_baseline:
+        baseline.update(results)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"Baseline сохранен: {args.baseline}")
+        return 0
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,15 +4,46 @@
 Содержит класс NoteApp с Tkinter интерфейсом для управления заметками.
 """
 
+import queue
+import threading
+import time
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext
 from notebook import Storage, Note
+from notebook.maintenance import MaintenanceScheduler, check_integrity, compact, stale_index_ids
+from notebook.profiling import stats
+from notebook.search import TrigramIndex
 
 BG_COLOR = "#FFF0F5"
 PINK = "#FFC1CC"
 DARK_PINK = "#FF69B4"
 WHITE = "#FFFFFF"
 TEXT_COLOR = "#333333"
+LOAD_POLL_MS = 30  # период проверки фоновой загрузки заметок
+UPDATE_POLL_MS = 500  # период проверки результатов фонового обслуживания
+MAINTENANCE_INTERVALS = {"index": 300, "integrity": 600, "compact": 1800, "blobs": 3600}  # секунды
+PREVIEW_EXTENSIONS = (".png", ".gif")  # форматы, которые tk.PhotoImage показывает без Pillow
+PREVIEW_MAX_SIZE = 400
+TEXT_INPUTS = (tk.Entry, tk.Text)  # в полях ввода Ctrl+Z отменяет правку текста, а не действие с заметкой
+
+PRIORITY_LABELS = {"low": "Низкий", "medium": "Средний", "high": "Высокий"}
+STATUS_LABELS = {"active": "В работе", "done": "Готово", "archived": "Архив"}
+
+
+def display_row(note: Note) -> tuple:
+    """Формирует строку таблицы для заметки.
+
+    Args:
+        note (Note): Заметка
+
+    Returns:
+        tuple: ID, заголовок, хэштеги, приоритет, статус и дата
+    """
+    tags_str = ", ".join([f"#{t}" for t in note.tags]) if note.tags else "—"
+    # неизвестные значения показываются как есть (их находит проверка целостности)
+    return (note.id, note.title, tags_str, PRIORITY_LABELS.get(note.priority, note.priority),
+            STATUS_LABELS.get(note.status, note.status), note.created_at[:10])
+
 
 class NoteApp:
     """Главный класс графического приложения для управления заметками.
@@ -20,33 +51,104 @@ class NoteApp:
     Attributes:
         root (tk.Tk): Корневое окно приложения
         storage (Storage): Объект для работы с хранилищем
+        index (TrigramIndex): Поисковый индекс загруженных заметок
+        rows (dict): Готовые строки таблицы по ID заметки
         priority_buttons (dict): Кнопки выбора приоритета
         status_buttons (dict): Кнопки выбора статуса
+        undo_stack (list): Действия для отмены: (id, версия до, версия после)
+        redo_stack (list): Отмененные действия для повтора
+        maintenance (MaintenanceScheduler): Фоновое обслуживание хранилища и индекса
     """
 
-    def __init__(self, root, storage_file="notes.json", debug=False):
+    def __init__(self, root, storage_file="notes.json", debug=False, start_time=None, async_load=True,
+                 password=None):
         """Инициализирует приложение.
 
+        Окно строится сразу, а заметки загружаются в фоновом потоке и
+        появляются в таблице, когда загрузка закончится.
+
         Args:
             root (tk.Tk): Корневое окно Tkinter
+            storage_file (str, optional): Путь к файлу заметок. Defaults to "notes.json".
+            debug (bool, optional): Режим отладки. Defaults to False.
+            start_time (float, optional): time.perf_counter() запуска процесса для замера старта.
+            async_load (bool, optional): Загружать заметки в фоне. Defaults to True.
+            password (str, optional): Пароль зашифрованного хранилища. Defaults to None.
+
+        Raises:
+            ValueError: Если пароль неверный или не установлен пакет cryptography
         """
         self.root = root
         self.root.title("Менеджер заметок — #хэштеги")
         self.root.geometry("950x650")
         self.root.minsize(850, 550)
         self.root.configure(bg=BG_COLOR)
-        self.storage = Storage(file_path=storage_file) # чтобы принимал сторэдж файл
+        self.storage = Storage(file_path=storage_file, password=password) # чтобы принимал сторэдж файл
         self.debug = debug
 
         if self.debug:
             print(f"[DEBUG] Используется файл хранилища: {storage_file}")
+            stats.enabled = True
 
         self.priority_buttons = {}
         self.status_buttons = {}
+        self.index = TrigramIndex()
+        self.rows = {}
+        self._generation = self.storage.generation
+        self.undo_stack = []
+        self.redo_stack = []
+
+        self.start_time = start_time if start_time is not None else time.perf_counter()
+        self._load_queue = queue.Queue()
+        self._loaded = False
 
         self.setup_styles()
         self.setup_ui()
-        self.refresh_notes()
+        if async_load:
+            self.root.after_idle(self._report_startup, "startup.first_frame")
+            self._start_background_load()
+        else:
+            self.reload_notes()
+
+        self.root.bind("<Control-z>", self.undo)
+        self.root.bind("<Control-y>", self.redo)
+        self.root.bind("<Control-Shift-Z>", self.redo)
+
+        if self.debug:
+            # F11 — окно статистики, F12 — старт/стоп захвата профиля
+            self.root.bind("<F11>", self.show_stats)
+            self.root.bind("<F12>", self.toggle_profile)
+
+        self.maintenance = MaintenanceScheduler(debug=self.debug)
+        self.maintenance.add_task("index", self._verify_index, MAINTENANCE_INTERVALS["index"])
+        self.maintenance.add_task("integrity", lambda: check_integrity(self.storage),
+                                  MAINTENANCE_INTERVALS["integrity"])
+        self.maintenance.add_task("compact", lambda: compact(self.storage), MAINTENANCE_INTERVALS["compact"])
+        self.maintenance.add_task("blobs", self.storage.collect_garbage, MAINTENANCE_INTERVALS["blobs"])
+        # любое действие пользователя откладывает обслуживание
+        for sequence in ("<KeyPress>", "<ButtonPress>", "<MouseWheel>"):
+            self.root.bind_all(sequence, self.maintenance.touch, add="+")
+        self.maintenance.start()
+        # поток обслуживания останавливается при любом закрытии окна
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
+        self.root.bind("<Destroy>", self._on_destroy, add="+")
+        if not async_load:
+            self._loaded = True
+            self.root.after(UPDATE_POLL_MS, self._poll_background_load)
+
+    def close(self):
+        """Закрывает приложение, дождавшись завершения задачи обслуживания."""
+        self.maintenance.stop()
+        self.root.destroy()
+
+    def _on_destroy(self, event):
+        """Останавливает обслуживание, когда уничтожается корневое окно.
+
+        Args:
+            event: Событие Destroy (приходит и для каждого дочернего виджета)
+        """
+        if event.widget is self.root:
+            self.maintenance.stop()
 
     def setup_styles(self):
         """Настраивает стили для Tkinter виджетов."""
@@ -150,11 +252,15 @@ class NoteApp:
             side=tk.LEFT)
         self.search_entry = ttk.Entry(search_frame, font=('Segoe UI', 11))
         self.search_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
-        self.search_entry.bind("<KeyRelease>", lambda e: self.refresh_notes())
+        self.search_entry.bind("<KeyRelease>", self.on_search)
         clear_btn = tk.Button(search_frame, text="Очистить", bg=DARK_PINK, fg="white", font=('Segoe UI', 9, 'bold'),
                               relief='flat',
                               command=lambda: self.search_entry.delete(0, tk.END) or self.refresh_notes())
         clear_btn.pack(side=tk.RIGHT)
+        self.fuzzy_var = tk.BooleanVar(value=True)
+        tk.Checkbutton(search_frame, text="С опечатками", variable=self.fuzzy_var, bg=BG_COLOR,
+                       activebackground=BG_COLOR, font=('Segoe UI', 9),
+                       command=self.refresh_notes).pack(side=tk.RIGHT, padx=5)
 
         # таблица
         columns = ("id", "title", "tags", "priority", "status", "date")
@@ -174,8 +280,10 @@ class NoteApp:
         btn_frame.pack(pady=8)
         ttk.Button(btn_frame, text="Удалить выбранное", style='Pink.TButton', command=self.delete_selected).pack(
             side=tk.LEFT, padx=5)
-        ttk.Button(btn_frame, text="Обновить список", style='Pink.TButton', command=self.refresh_notes).pack(
+        ttk.Button(btn_frame, text="Обновить список", style='Pink.TButton', command=self.reload_notes).pack(
             side=tk.LEFT)
+        ttk.Button(btn_frame, text="Отменить", style='Pink.TButton', command=self.undo).pack(side=tk.LEFT, padx=5)
+        ttk.Button(btn_frame, text="Повторить", style='Pink.TButton', command=self.redo).pack(side=tk.LEFT)
 
     def select_priority(self, value: str):
         """Выбирает приоритет заметки.
@@ -216,6 +324,8 @@ class NoteApp:
             tags=tags
         )
         if self.storage.save(note):
+            self._update_index(note)
+            self._remember(note.id, None)
             messagebox.showinfo("Готово!", f"Заметка добавлена (ID: {note.id})")
             self.clear_form()
             self.refresh_notes()
@@ -230,31 +340,158 @@ class NoteApp:
         self.select_priority("medium")
         self.select_status("active")
 
-    def refresh_notes(self):
-        """Обновляет список заметок в таблице с учетом поискового запроса."""
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+    def on_search(self, event=None):
+        """Обновляет список при вводе в поле поиска.
+
+        Args:
+            event: Событие отпускания клавиши (опционально)
+        """
+        with stats.timer("search.keystroke"):
+            self.refresh_notes()
+
+    def reload_notes(self):
+        """Перечитывает заметки из хранилища, перестраивает индекс и таблицу."""
+        self._load_index()
+        self.refresh_notes()
 
-        search = self.search_entry.get().lower().lstrip('#')
+    def _load_index(self):
+        """Строит поисковый индекс по всем заметкам хранилища."""
+        with stats.timer("search.index_build"):
+            self.index = TrigramIndex(self.storage.get_all())
+        self.rows = {}
+        self._generation = self.storage.generation
+
+    def _update_index(self, note: Note = None, removed_id: int = None):
+        """Переносит в индекс изменение, только что записанное в хранилище.
+
+        Args:
+            note (Note, optional): Сохраненная заметка. Defaults to None.
+            removed_id (int, optional): ID удаленной заметки. Defaults to None.
+        """
+        if self._generation + 1 != self.storage.generation:
+            # хранилище менялось в обход приложения — перестраиваем целиком
+            self._load_index()
+            return
+        if note is not None:
+            self.index.add(note)
+            self.rows.pop(note.id, None)
+        if removed_id is not None:
+            self.index.remove(removed_id)
+            self.rows.pop(removed_id, None)
+        self._generation = self.storage.generation
+
+    def _start_background_load(self):
+        """Запускает загрузку заметок и построение индекса в фоновом потоке."""
+        generation = self.storage.generation
+
+        def worker():
+            try:
+                with stats.timer("search.index_build"):
+                    notes = self.storage.get_all()
+                    index = TrigramIndex(notes)
+                # строки таблицы тоже готовятся в фоне
+                rows = {note.id: display_row(note) for note in notes}
+            except Exception as e:  # например, DecryptionError; сообщение покажет поток интерфейса
+                self._load_queue.put(e)
+                return
+            self._load_queue.put((generation, index, rows))
+
+        self.root.title(self.root.title() + " (загрузка…)")
+        threading.Thread(target=worker, name="notes-loader", daemon=True).start()
+        self.root.after(LOAD_POLL_MS, self._poll_background_load)
+
+    def _poll_background_load(self):
+        """Забирает результат фоновой загрузки или перестроения индекса в потоке интерфейса.
+
+        После первой загрузки проверка продолжается реже: в очередь кладет
+        перестроенный индекс задача обслуживания _verify_index. Если загрузка
+        не удалась, ошибка показывается пользователю и проверка прекращается.
+        """
+        try:
+            item = self._load_queue.get_nowait()
+        except queue.Empty:
+            self.root.after(UPDATE_POLL_MS if self._loaded else LOAD_POLL_MS, self._poll_background_load)
+            return
+        if isinstance(item, Exception):
+            self.root.title(self.root.title().replace(" (загрузка…)", ""))
+            messagebox.showerror("Ошибка", f"Не удалось загрузить заметки: {item}")
+            return
+        generation, index, rows = item
+        if not self._loaded:
+            self.root.title(self.root.title().replace(" (загрузка…)", ""))
+            self.index = index
+            self.rows = rows
+            # если за время загрузки хранилище изменилось, refresh_notes перечитает его
+            self._generation = generation
+            self.refresh_notes()
+            self._loaded = True
+            self._report_startup("startup.notes_loaded")
+        elif generation == self.storage.generation:
+            self.index = index
+            self.rows = rows
+            self._generation = generation
+            self.refresh_notes()
+        # иначе индекс успел устареть, приложение перечитает хранилище само
+        self.root.after(UPDATE_POLL_MS, self._poll_background_load)
+
+    def _verify_index(self) -> dict:
+        """Сверяет поисковый индекс с хранилищем (задача обслуживания, фоновый поток).
+
+        Если индекс разошелся с данными, новый индекс и строки таблицы строятся
+        здесь же и передаются в поток интерфейса через очередь загрузки.
+
+        Returns:
+            dict: Количество расхождений
+        """
+        if not self._loaded:
+            return {"stale": 0}
+        generation = self.storage.generation
         notes = self.storage.get_all()
+        stale = stale_index_ids(self.index, notes)
+        if stale:
+            stats.add("maintenance.index.stale", len(stale))
+            index = TrigramIndex(notes)
+            rows = {note.id: display_row(note) for note in notes}
+            self._load_queue.put((generation, index, rows))
+        return {"stale": len(stale)}
+
+    def _report_startup(self, name: str):
+        """Записывает время от запуска до этапа старта и печатает его в режиме отладки.
+
+        Args:
+            name (str): Имя этапа, например "startup.first_frame"
+        """
+        elapsed = time.perf_counter() - self.start_time
+        stats.record(name, elapsed)
+        if self.debug:
+            print(f"[DEBUG] {name}: {elapsed * 1000:.1f} мс")
+
+    def refresh_notes(self):
+        """Обновляет список заметок в таблице с учетом поискового запроса.
+
+        Результаты поиска кэшируются индексом; кэш сбрасывается, когда
+        Storage.save/delete меняют данные.
+        """
+        if self._generation != self.storage.generation:
+            self._load_index()
+        with stats.timer("treeview.refresh"):
+            self._refresh_notes()
 
+    def _refresh_notes(self):
+        """Заполняет таблицу заметками, подходящими под поисковый запрос."""
+        self.tree.delete(*self.tree.get_children())
+
+        # точный поиск по подстроке или нечеткий по триграммам с ранжированием
+        with stats.timer("search.query"):
+            notes = self.index.search(self.search_entry.get(), fuzzy=self.fuzzy_var.get())
+
+        rows = self.rows
+        insert = self.tree.insert
         for note in notes:
-            tags_str = ", ".join([f"#{t}" for t in note.tags]) if note.tags else "—"
-            priority_text = {"low": "Низкий", "medium": "Средний", "high": "Высокий"}[note.priority]
-            status_text = {"active": "В работе", "done": "Готово", "archived": "Архив"}[note.status]
-
-            # поиск по заголовку, содержимому или тегам
-            if search:
-                if (search in note.title.lower() or
-                        search in note.content.lower() or
-                        search in " ".join(note.tags)):
-                    self.tree.insert("", tk.END, values=(
-                        note.id, note.title, tags_str, priority_text, status_text, note.created_at[:10]
-                    ))
-            else:
-                self.tree.insert("", tk.END, values=(
-                    note.id, note.title, tags_str, priority_text, status_text, note.created_at[:10]
-                ))
+            row = rows.get(note.id)
+            if row is None:
+                row = rows[note.id] = display_row(note)
+            insert("", tk.END, values=row)
 
     def show_details(self, event=None):
         """Показывает детали выбранной заметки.
@@ -267,7 +504,7 @@ class NoteApp:
             return
         item = self.tree.item(selected[0])
         note_id = int(item["values"][0])
-        note = next((n for n in self.storage.get_all() if n.id == note_id), None)
+        note = self.storage.get(note_id)
         if note:
             self.open_detail_window(note)
 
@@ -299,6 +536,71 @@ class NoteApp:
         text.insert(tk.END, note.content)
         text.config(state=tk.DISABLED)
 
+        # вложения: список строится из описаний, файлы читаются только по запросу
+        attach_frame = ttk.Frame(win)
+        attach_frame.pack(fill=tk.X, padx=20, pady=(0, 10))
+        listbox = tk.Listbox(attach_frame, height=4, font=('Segoe UI', 10), bg=WHITE, relief='flat')
+        listbox.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        preview = ttk.Label(win, background=BG_COLOR)
+
+        def fill():
+            listbox.delete(0, tk.END)
+            for a in note.attachments:
+                listbox.insert(tk.END, f"{a['name']} ({a['size'] / 1024:.1f} КБ)")
+
+        def selected():
+            index = listbox.curselection()
+            return note.attachments[index[0]] if index else None
+
+        def show_preview(event=None):
+            attachment = selected()
+            preview.configure(image="")
+            preview.pack_forget()
+            if attachment is None or not attachment["name"].lower().endswith(PREVIEW_EXTENSIONS):
+                return
+            try:
+                image = tk.PhotoImage(file=self.storage.blobs.path(attachment["sha256"]))
+            except (tk.TclError, ValueError):
+                return
+            factor = max(1, -(-max(image.width(), image.height()) // PREVIEW_MAX_SIZE))
+            preview.image = image.subsample(factor) if factor > 1 else image
+            preview.configure(image=preview.image)
+            preview.pack(padx=20, pady=(0, 10))
+
+        def attach():
+            from tkinter import filedialog  # нужен только здесь
+            path = filedialog.askopenfilename(parent=win)
+            if not path:
+                return
+            # у заметки без истории checkpoint сначала записывает исходную версию,
+            # иначе отмена приняла бы ее за только что созданную и удалила
+            before = self.storage.checkpoint(note.id)
+            saved = self.storage.attach(note.id, path)
+            if saved is None:
+                messagebox.showerror("Ошибка", "Не удалось прикрепить файл", parent=win)
+                return
+            note.attachments = saved.attachments
+            self._update_index(saved)
+            self._remember(note.id, before)
+            self.refresh_notes()
+            fill()
+
+        def save_as():
+            from tkinter import filedialog
+            attachment = selected()
+            if attachment is None:
+                return
+            path = filedialog.asksaveasfilename(parent=win, initialfile=attachment["name"])
+            if path and not self.storage.blobs.copy_to(attachment["sha256"], path):
+                messagebox.showerror("Ошибка", "Не удалось сохранить вложение", parent=win)
+
+        listbox.bind("<<ListboxSelect>>", show_preview)
+        ttk.Button(attach_frame, text="Прикрепить…", style='Pink.TButton', command=attach).pack(
+            side=tk.TOP, padx=(5, 0), fill=tk.X)
+        ttk.Button(attach_frame, text="Сохранить…", style='Pink.TButton', command=save_as).pack(
+            side=tk.TOP, padx=(5, 0), pady=(5, 0), fill=tk.X)
+        win.after_idle(fill)
+
     def delete_selected(self, event=None):
         """Удаляет выбранную заметку.
 
@@ -311,8 +613,146 @@ class NoteApp:
             return
         if messagebox.askyesno("Удалить?", "Удалить выбранную заметку?"):
             note_id = int(self.tree.item(selected[0], "values")[0])
+            before = self.storage.checkpoint(note_id)
             if self.storage.delete(note_id):
+                self._update_index(removed_id=note_id)
+                self._remember(note_id, before)
                 self.refresh_notes()
                 messagebox.showinfo("Удалено", f"Заметка ID {note_id} удалена")
             else:
-                messagebox.showerror("Ошибка", "Не удалось удалить")
\ No newline at end of file
+                messagebox.showerror("Ошибка", "Не удалось удалить")
+
+    def show_stats(self, event=None):
+        """Открывает окно со статистикой отладки.
+
+        Args:
+            event: Событие нажатия F11 (опционально)
+        """
+        win = tk.Toplevel(self.root)
+        win.title("Статистика")
+        win.geometry("640x420")
+        win.configure(bg=BG_COLOR)
+
+        text = scrolledtext.ScrolledText(win, wrap=tk.NONE, font=("Consolas", 10), bg=WHITE, relief='flat')
+        text.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+
+        def update():
+            text.config(state=tk.NORMAL)
+            text.delete("1.0", tk.END)
+            text.insert(tk.END, stats.report())
+            text.insert(tk.END, "\n\nОбслуживание:\n")
+            for name, state in self.maintenance.status().items():
+                text.insert(tk.END, f"{name:<12}запусков: {state['runs']:<6}{state['last_result']}\n")
+            text.config(state=tk.DISABLED)
+
+        def reset():
+            stats.reset()
+            update()
+
+        def dump():
+            from tkinter import filedialog  # нужен только здесь
+            path = filedialog.asksaveasfilename(parent=win, defaultextension=".json",
+                                                filetypes=[("JSON", "*.json")])
+            if path and stats.dump(path):
+                messagebox.showinfo("Сохранено", f"Статистика сохранена в {path}", parent=win)
+
+        btn_frame = ttk.Frame(win)
+        btn_frame.pack(pady=(0, 10))
+        ttk.Button(btn_frame, text="Обновить", style='Pink.TButton', command=update).pack(side=tk.LEFT, padx=5)
+        ttk.Button(btn_frame, text="Сбросить", style='Pink.TButton', command=reset).pack(side=tk.LEFT, padx=5)
+        ttk.Button(btn_frame, text="Сохранить в файл", style='Pink.TButton', command=dump).pack(side=tk.LEFT,
+                                                                                                padx=5)
+        update()
+
+    def toggle_profile(self, event=None):
+        """Запускает или останавливает захват профиля cProfile/tracemalloc.
+
+        Args:
+            event: Событие нажатия F12 (опционально)
+        """
+        if stats.profiling:
+            path = stats.stop_profile()
+            print(f"[DEBUG] Профиль сохранен: {path}")
+        else:
+            stats.start_profile()
+            print("[DEBUG] Захват профиля начат (F12 — остановить)")
+
+    def _current_rev(self, note_id: int):
+        """Возвращает номер текущей версии заметки или None, если заметки нет.
+
+        Args:
+            note_id (int): ID заметки
+        """
+        latest = self.storage.versions.latest(note_id) if self.storage.versions else None
+        if latest is None or latest["deleted"]:
+            return None
+        return latest["rev"]
+
+    def _remember(self, note_id: int, before):
+        """Запоминает выполненное действие для отмены.
+
+        Args:
+            note_id (int): ID измененной заметки
+            before: Версия до изменения (None — заметки не было)
+        """
+        if not self.storage.versions:
+            return
+        self.undo_stack.append((note_id, before, self._current_rev(note_id)))
+        self.redo_stack.clear()
+
+    def _apply_rev(self, note_id: int, rev) -> bool:
+        """Приводит заметку к указанной версии.
+
+        Args:
+            note_id (int): ID заметки
+            rev: Номер версии или None, чтобы удалить заметку
+
+        Returns:
+            bool: True если хранилище изменено успешно
+        """
+        if rev is None:
+            if not self.storage.delete(note_id):
+                return False
+            self._update_index(removed_id=note_id)
+        else:
+            if not self.storage.restore(note_id, rev):
+                return False
+            data = self.storage.versions.get(note_id, self._current_rev(note_id))
+            self._update_index(Note.from_dict(data, trusted=True))
+        self.refresh_notes()
+        return True
+
+    def undo(self, event=None):
+        """Отменяет последнее добавление или удаление заметки.
+
+        Нажатие в поле ввода не отменяет действие с заметкой.
+
+        Args:
+            event: Событие нажатия Ctrl+Z (опционально)
+        """
+        if event is not None and isinstance(event.widget, TEXT_INPUTS):
+            return
+        if not self.undo_stack:
+            return
+        note_id, before, after = self.undo_stack.pop()
+        if self._apply_rev(note_id, before):
+            # после восстановления у заметки новая версия — повтор вернет ее к after
+            self.redo_stack.append((note_id, self._current_rev(note_id), after))
+        else:
+            messagebox.showerror("Ошибка", "Не удалось отменить действие")
+
+    def redo(self, event=None):
+        """Повторяет последнее отмененное действие.
+
+        Args:
+            event: Событие нажатия Ctrl+Y (опционально)
+        """
+        if event is not None and isinstance(event.widget, TEXT_INPUTS):
+            return
+        if not self.redo_stack:
+            return
+        note_id, before, after = self.redo_stack.pop()
+        if self._apply_rev(note_id, after):
+            self.undo_stack.append((note_id, before, self._current_rev(note_id)))
+        else:
+            messagebox.showerror("Ошибка", "Не удалось повторить действие")
@@ -4,16 +4,33 @@
 Этот модуль запускает графическое приложение для управления заметками.
 Приложение позволяет создавать, просматривать, редактировать и удалять заметки
 с поддержкой тегов, приоритетов и статусов.
-Поддерживает аргументы командной строки через argparse
+Поддерживает аргументы командной строки через argparse, а также
+команду export для потоковой выгрузки заметок без запуска интерфейса,
+команду sync для синхронизации с другим файлом заметок
+и хранение файла заметок в зашифрованном виде (--encrypted)
+
+tkinter и интерфейс импортируются только при запуске окна, а заметки
+загружаются в фоне уже после появления окна.
 
 Attributes:
-    root (tk.Tk): Корневое окно приложения
-    app (NoteApp): Основной класс приложения
+    START_TIME (float): Момент запуска процесса для замера времени старта
+    PASSWORD_ENV (str): Переменная окружения с паролем для неинтерактивного запуска
 """
 
-import tkinter as tk
+import time
+
+START_TIME = time.perf_counter()  # отсчет времени старта для режима отладки
+
 import argparse
-from gui.app import NoteApp
+import getpass
+import os
+import sys
+from notebook import Storage
+from notebook.profiling import stats
+from notebook.export import export_notes, FORMATS, COMPRESSIONS
+from notebook.sync import sync
+
+PASSWORD_ENV = "NOTES_PASSWORD"
 
 def parse_arguments():
     """Парсит аргументы ком-ой строки"""
@@ -35,11 +52,149 @@ def parse_arguments():
         help="Включить режим отладки"
     )
 
+    parser.add_argument(
+        '--stats-file', # выгрузка статистики отладки при выходе
+        type=str,
+        default=None,
+        help="Сохранить статистику режима отладки в JSON-файл при выходе"
+    )
+
+    parser.add_argument(
+        '--encrypted', # шифрование файла заметок
+        action='store_true',
+        help=f"Хранить заметки в зашифрованном виде (пароль из {PASSWORD_ENV} или запрос)"
+    )
+
+    subparsers = parser.add_subparsers(dest="command")
+    export_parser = subparsers.add_parser(
+        "export",
+        help="Выгрузить заметки в NDJSON, CSV или Markdown"
+    )
+    export_parser.add_argument('--format', choices=FORMATS, default="ndjson", help="Формат выгрузки")
+    export_parser.add_argument('-q', '--query', default="", help="Текст или #тег для поиска")
+    export_parser.add_argument('--priority', choices=("low", "medium", "high"), help="Фильтр по приоритету")
+    export_parser.add_argument('--status', choices=("active", "done", "archived"), help="Фильтр по статусу")
+    export_parser.add_argument('--tag', help="Фильтр по тегу")
+    export_parser.add_argument('--regex', help="Регулярное выражение для заголовка, содержимого или тегов")
+    export_parser.add_argument('--workers', type=int, default=0,
+                               help="Фильтровать большой файл в нескольких процессах "
+                                    "(память - порядка размера файла)")
+    export_parser.add_argument('--compress', choices=COMPRESSIONS, default="none",
+                               help="Сжатие: gzip, zstd или auto (zstd, если установлен)")
+    export_parser.add_argument('-o', '--output', default="-", help="Выходной файл (по умолчанию stdout)")
+
+    sync_parser = subparsers.add_parser(
+        "sync",
+        help="Синхронизировать заметки с другим файлом (например, с другой машины)"
+    )
+    sync_parser.add_argument('other', help="Путь к другому файлу заметок")
+
     return parser.parse_args()
 
+
+def read_password(args):
+    """Возвращает пароль для зашифрованного хранилища или None.
+
+    Args:
+        args: Разобранные аргументы командной строки
+
+    Returns:
+        Optional[str]: Пароль, если указан --encrypted
+    """
+    if not args.encrypted:
+        return None
+    return os.environ.get(PASSWORD_ENV) or getpass.getpass("Пароль: ")
+
+
+def run_export(args) -> int:
+    """Выполняет команду export.
+
+    Args:
+        args: Разобранные аргументы командной строки
+
+    Returns:
+        int: Код завершения процесса
+    """
+    stats.enabled = args.debug
+    try:
+        storage = Storage(args.file, password=read_password(args))
+        count = export_notes(storage, args.output, fmt=args.format, query=args.query,
+                             priority=args.priority, status=args.status, tag=args.tag,
+                             compress=args.compress, pattern=args.regex, workers=args.workers)
+    except (ValueError, OSError) as e:
+        print(f"Ошибка выгрузки: {e}", file=sys.stderr)
+        return 1
+    if args.debug:
+        print(f"[DEBUG] Выгружено заметок: {count}", file=sys.stderr)
+        print(stats.report(), file=sys.stderr)
+        if args.stats_file:
+            stats.dump(args.stats_file)
+    return 0
+
+
+def run_sync(args) -> int:
+    """Выполняет команду sync.
+
+    Args:
+        args: Разобранные аргументы командной строки
+
+    Returns:
+        int: Код завершения процесса
+    """
+    stats.enabled = args.debug
+    password = read_password(args)
+    try:
+        result = sync(Storage(args.file, password=password), Storage(args.other, password=password))
+    except (ValueError, OSError) as e:
+        print(f"Ошибка синхронизации: {e}", file=sys.stderr)
+        return 1
+    print(f"Отправлено: {result['sent']}, получено: {result['received']}")
+    if result["renumbered"]:
+        print(f"Заметок с совпавшим ID перенесено на новый ID: {result['renumbered']}")
+    if args.debug:
+        print(f"[DEBUG] Различающихся корзин: {result['buckets']}", file=sys.stderr)
+        print(stats.report(), file=sys.stderr)
+    return 0
+
+
+def run_gui(args) -> int:
+    """Запускает графический интерфейс.
+
+    tkinter и модуль интерфейса импортируются только здесь, чтобы команда
+    export не тратила на них время.
+
+    Args:
+        args: Разобранные аргументы командной строки
+
+    Returns:
+        int: Код завершения процесса
+    """
+    password = read_password(args)
+    import tkinter as tk
+    from gui.app import NoteApp
+
+    stats.enabled = args.debug
+    root = tk.Tk()
+    try:
+        app = NoteApp(root, storage_file=args.file, debug=args.debug, start_time=START_TIME, # передаём режим отладки
+                      password=password)
+    except ValueError as e:
+        root.destroy()
+        print(f"Ошибка открытия хранилища: {e}", file=sys.stderr)
+        return 1
+    root.mainloop()
+
+    if args.debug and args.stats_file:
+        stats.dump(args.stats_file)
+    return 0
+
+
 if __name__ == "__main__":
     args = parse_arguments()
 
-    root = tk.Tk()
-    app = NoteApp(root, storage_file=args.file, debug=args.debug) # передаём режим отладки
-    root.mainloop()
\ No newline at end of file
+    if args.command == "export":
+        sys.exit(run_export(args))
+    if args.command == "sync":
+        sys.exit(run_sync(args))
+
+    sys.exit(run_gui(args))
\ No newline at end of file
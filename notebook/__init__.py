@@ -6,14 +6,31 @@
 
 Modules:
     models: Определение класса Note и методов работы с заметками
+    schema: Проверка и нормализация записей заметок по схеме
     storage: Класс для сохранения и загрузки заметок из JSON-файла
+    blobs: Хранилище файлов вложений с адресацией по хэшу содержимого
+    history: История версий заметок с дельта-сжатием
+    snapshot: Теплый снимок разобранного файла заметок
+    crypto: Шифрование файла заметок (AES-GCM по записям, нужен пакет cryptography)
+    maintenance: Фоновое обслуживание хранилища в простое (сжатие, проверки)
+    search: Точный и нечеткий (триграммный) поиск заметок
+    sync: Синхронизация двух хранилищ по ревизиям заметок и деревьям Меркла
+    export: Потоковая выгрузка заметок в NDJSON, CSV и Markdown
+    parallel: Разбор и фильтрация больших файлов в нескольких процессах
+    profiling: Счетчики, гистограммы времени и захват профиля для режима отладки
 
 Classes:
     Note: Класс, представляющий заметку
     Storage: Класс для работы с хранилищем заметок
+    TrigramIndex: Поисковый индекс заметок
+
+Functions:
+    export_notes: Выгрузка отфильтрованных заметок в файл
 """
 
 from .models import Note
 from .storage import Storage
+from .search import TrigramIndex
+from .export import export_notes
 
-__all__ = ["Note", "Storage"] # какие имена должны быть доступны при использовании звездочного импорта
\ No newline at end of file
+__all__ = ["Note", "Storage", "TrigramIndex", "export_notes"] # какие имена должны быть доступны при использовании звездочного импорта
\ No newline at end of file
@@ -0,0 +1,243 @@
+"""
+Модуль blobs - хранилище вложений с адресацией по содержимому.
+
+Файлы вложений не попадают в notes.json: каждый хранится в директории
+рядом с файлом заметок под именем, равным SHA-256 его содержимого, поэтому
+одинаковые вложения хранятся один раз. Запись и чтение идут кусками
+по CHUNK_SIZE, файл целиком в память не загружается. В заметке хранится
+только описание вложения: имя, хэш и размер. Хэш приходит из notes.json
+или от другого хранилища при синхронизации, поэтому путь строится только
+из строки ровно из 64 шестнадцатеричных символов (см. is_digest).
+
+Вложения, на которые не ссылается ни одна заметка и ни одна версия в
+истории, удаляются сборкой мусора (collect_garbage).
+"""
+
+import hashlib
+import os
+import re
+import shutil
+import time
+from typing import BinaryIO, Dict, Iterable, Iterator
+
+BLOBS_SUFFIX = ".blobs"
+CHUNK_SIZE = 1024 * 1024
+GC_GRACE_SECONDS = 3600
+DIGEST_PATTERN = re.compile(r"[0-9a-f]{64}")
+
+
+def is_digest(value) -> bool:
+    """Проверяет, что значение - SHA-256 в шестнадцатеричном виде (строчными буквами).
+
+    Args:
+        value: Проверяемое значение
+
+    Returns:
+        bool: True если значение можно использовать как имя файла вложения
+    """
+    return isinstance(value, str) and DIGEST_PATTERN.fullmatch(value) is not None
+
+
+class BlobStore:
+    """Хранилище файлов по хэшу содержимого.
+
+    Attributes:
+        directory (str): Директория с файлами вложений
+    """
+
+    def __init__(self, directory: str):
+        """Инициализирует хранилище.
+
+        Args:
+            directory (str): Директория с файлами вложений (создается при первой записи)
+        """
+        self.directory = directory
+
+    def path(self, digest: str) -> str:
+        """Возвращает путь к файлу по хэшу.
+
+        Args:
+            digest (str): SHA-256 содержимого в шестнадцатеричном виде
+
+        Returns:
+            str: Путь к файлу
+
+        Raises:
+            ValueError: Если digest не является хэшем SHA-256 (например, содержит "..")
+        """
+        if not is_digest(digest):
+            raise ValueError(f"Некорректный хэш вложения: {digest!r}")
+        return os.path.join(self.directory, digest[:2], digest)
+
+    def exists(self, digest: str) -> bool:
+        """Есть ли в хранилище файл с указанным хэшем (False для некорректного хэша)."""
+        return is_digest(digest) and os.path.exists(self.path(digest))
+
+    def put(self, src: BinaryIO) -> Dict:
+        """Потоково записывает содержимое в хранилище.
+
+        Если такой файл уже есть, новая копия не сохраняется.
+
+        Args:
+            src (BinaryIO): Источник, открытый на чтение в двоичном режиме
+
+        Returns:
+            Dict: Хэш (sha256) и размер (size) записанного содержимого
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        h = hashlib.sha256()
+        size = 0
+        tmp_path = os.path.join(self.directory, f"incoming-{os.getpid()}-{id(src)}.tmp")
+        try:
+            with open(tmp_path, 'wb') as f:
+                for chunk in iter(lambda: src.read(CHUNK_SIZE), b""):
+                    h.update(chunk)
+                    f.write(chunk)
+                    size += len(chunk)
+            digest = h.hexdigest()
+            path = self.path(digest)
+            if os.path.exists(path):
+                os.remove(tmp_path)
+                os.utime(path)  # свежая ссылка: сборка мусора не должна удалить файл
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return {"sha256": digest, "size": size}
+
+    def put_file(self, file_path: str) -> Dict:
+        """Добавляет файл в хранилище.
+
+        Args:
+            file_path (str): Путь к исходному файлу
+
+        Returns:
+            Dict: Описание вложения: name, sha256, size
+        """
+        with open(file_path, 'rb') as f:
+            info = self.put(f)
+        return {"name": os.path.basename(file_path), **info}
+
+    def iter_chunks(self, digest: str, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+        """Потоково читает содержимое файла.
+
+        Args:
+            digest (str): Хэш файла
+            chunk_size (int, optional): Размер куска. Defaults to CHUNK_SIZE.
+
+        Yields:
+            bytes: Очередной кусок содержимого
+        """
+        with open(self.path(digest), 'rb') as f:
+            yield from iter(lambda: f.read(chunk_size), b"")
+
+    def copy_to(self, digest: str, dest: str) -> bool:
+        """Сохраняет содержимое файла из хранилища по указанному пути.
+
+        Args:
+            digest (str): Хэш файла
+            dest (str): Путь назначения
+
+        Returns:
+            bool: True если копирование успешно, иначе False
+        """
+        try:
+            with open(self.path(digest), 'rb') as src, open(dest, 'wb') as dst:
+                shutil.copyfileobj(src, dst, CHUNK_SIZE)
+            return True
+        except (PermissionError, OSError, ValueError) as e:
+            print(f"Ошибка при сохранении вложения: {e}")
+            return False
+
+    def import_from(self, other: 'BlobStore', digest: str) -> bool:
+        """Копирует файл из другого хранилища, если его здесь еще нет.
+
+        Args:
+            other (BlobStore): Хранилище-источник
+            digest (str): Хэш файла
+
+        Returns:
+            bool: True если файл есть в хранилище после вызова
+        """
+        if self.exists(digest):
+            return True
+        if not other.exists(digest):
+            return False
+        with open(other.path(digest), 'rb') as f:
+            return self.put(f)["sha256"] == digest
+
+    def digests(self) -> Iterator[str]:
+        """Перебирает хэши всех файлов хранилища.
+
+        Yields:
+            str: Хэш файла
+        """
+        if not os.path.isdir(self.directory):
+            return
+        for prefix in os.listdir(self.directory):
+            subdir = os.path.join(self.directory, prefix)
+            if len(prefix) == 2 and os.path.isdir(subdir):
+                yield from (name for name in os.listdir(subdir) if is_digest(name) and name[:2] == prefix)
+
+    def collect_garbage(self, referenced: Iterable[str], grace: float = GC_GRACE_SECONDS) -> Dict[str, int]:
+        """Удаляет файлы, на которые никто не ссылается.
+
+        Недавно записанные файлы не трогаются: вложение могло быть уже
+        записано, а заметка со ссылкой на него - еще нет.
+
+        Args:
+            referenced (Iterable[str]): Хэши, на которые есть ссылки
+            grace (float, optional): Минимальный возраст удаляемого файла в секундах.
+                Defaults to GC_GRACE_SECONDS.
+
+        Returns:
+            Dict[str, int]: Количество удаленных файлов и освобожденных байт
+        """
+        keep = set(referenced)
+        deadline = time.time() - grace
+        removed = freed = 0
+        for digest in list(self.digests()):
+            if digest in keep:
+                continue
+            path = self.path(digest)
+            try:
+                st = os.stat(path)
+                if st.st_mtime > deadline:
+                    continue
+                os.remove(path)
+            except OSError:
+                continue
+            removed += 1
+            freed += st.st_size
+        return {"removed": removed, "bytes": freed}
+
+
+def attachment_digests(note: Dict) -> Iterator[str]:
+    """Перебирает хэши вложений заметки в виде словаря.
+
+    Args:
+        note (Dict): Заметка или метаданные версии
+
+    Yields:
+        str: Хэш вложения (некорректные значения пропускаются)
+    """
+    for attachment in note.get("attachments", ()):
+        digest = attachment.get("sha256") if isinstance(attachment, dict) else None
+        if is_digest(digest):
+            yield digest
+
+
+def blob_directory(file_path: str) -> str:
+    """Возвращает директорию вложений для файла заметок.
+
+    Args:
+        file_path (str): Путь к файлу заметок
+
+    Returns:
+        str: Путь к директории вложений
+    """
+    return file_path + BLOBS_SUFFIX
+
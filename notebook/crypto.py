@@ -0,0 +1,305 @@
+"""
+Модуль crypto - шифрование файла заметок на диске.
+
+Каждая заметка шифруется отдельно алгоритмом AES-GCM (аутентифицированное
+шифрование), поэтому файл можно расшифровывать потоково, по одной записи,
+а отдельную заметку - прочитать без расшифровки всего файла. В конце файла
+лежит зашифрованное оглавление: ID, смещение и длина каждой записи.
+
+Формат файла::
+
+    заголовок   MAGIC, соль, параметры scrypt, случайный ID записи файла
+    записи      длина (4 байта), nonce (12 байт), шифртекст
+    оглавление  nonce, шифртекст JSON {"count": ..., "digest": ..., "index": [[id, offset, length], ...]}
+    хвост       смещение и длина оглавления, END_MAGIC
+
+Основной ключ получается из пароля через hashlib.scrypt и кэшируется на
+время работы процесса; соль сохраняется между записями. При каждой
+записи файла выбирается новый ID, и записи шифруются ключом, выведенным
+из основного ключа и этого ID (HMAC-SHA256). Поэтому запись из другой
+версии файла не расшифровывается, а один ключ не используется для
+неограниченного числа перезаписей со случайными nonce.
+
+Заголовок и номер записи входят в проверяемые данные (AAD), а оглавление
+хранит количество записей и SHA-256 их шифртекстов, так что перестановка,
+подмена и обрезка записей обнаруживаются при чтении. Замену всего файла
+его более старой целиком сохраненной версией обнаружить нельзя.
+
+Шифрование требует необязательного пакета cryptography.
+"""
+
+import functools
+import hashlib
+import hmac
+import json
+import os
+import struct
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from .profiling import stats
+from .snapshot import file_signature
+
+MAGIC = b"ZMTKENC\x02"
+END_MAGIC = b"ZMTKEND\x01"
+SALT_SIZE = 16
+FILE_ID_SIZE = 16
+NONCE_SIZE = 12
+SCRYPT_LOG_N = 15
+SCRYPT_R = 8
+SCRYPT_P = 1
+
+_HEADER = struct.Struct(f">{len(MAGIC)}s{SALT_SIZE}sBBB{FILE_ID_SIZE}s")
+_KEY_PARAMS_SIZE = _HEADER.size - FILE_ID_SIZE
+_LENGTH = struct.Struct(">I")
+_RECORD_NO = struct.Struct(">Q")
+_TRAILER = struct.Struct(f">QI{len(END_MAGIC)}s")
+
+
+class DecryptionError(ValueError):
+    """Файл не удалось расшифровать: неверный пароль или поврежденные данные."""
+
+
+def _aesgcm() -> tuple:
+    """Импортирует AESGCM и InvalidTag из необязательного пакета cryptography.
+
+    Raises:
+        ValueError: Если пакет не установлен
+    """
+    try:
+        from cryptography.exceptions import InvalidTag
+        from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+    except ImportError:
+        raise ValueError("Для шифрования установите пакет cryptography") from None
+    return AESGCM, InvalidTag
+
+
+@functools.lru_cache(maxsize=16)
+def derive_key(password: str, salt: bytes, log_n: int = SCRYPT_LOG_N,
+               r: int = SCRYPT_R, p: int = SCRYPT_P) -> bytes:
+    """Получает 256-битный ключ из пароля через scrypt.
+
+    Вычисление намеренно медленное, поэтому результат кэшируется на время сессии.
+
+    Args:
+        password (str): Пароль
+        salt (bytes): Соль файла
+        log_n (int, optional): log2 параметра стоимости N. Defaults to SCRYPT_LOG_N.
+        r (int, optional): Размер блока. Defaults to SCRYPT_R.
+        p (int, optional): Параллелизм. Defaults to SCRYPT_P.
+
+    Returns:
+        bytes: Ключ длиной 32 байта
+    """
+    with stats.timer("crypto.derive_key"):
+        return hashlib.scrypt(password.encode('utf-8'), salt=salt, n=1 << log_n, r=r, p=p,
+                              maxmem=256 * r * (1 << log_n), dklen=32)
+
+
+def is_encrypted(file_path: str) -> bool:
+    """Проверяет, зашифрован ли файл заметок.
+
+    Args:
+        file_path (str): Путь к файлу
+
+    Returns:
+        bool: True если файл начинается с сигнатуры зашифрованного формата
+    """
+    try:
+        with open(file_path, 'rb') as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+class EncryptedFile:
+    """Зашифрованный файл заметок.
+
+    Attributes:
+        file_path (str): Путь к файлу
+    """
+
+    def __init__(self, file_path: str, password: str):
+        """Инициализирует файл.
+
+        Args:
+            file_path (str): Путь к файлу
+            password (str): Пароль
+
+        Raises:
+            ValueError: Если пакет cryptography не установлен
+        """
+        self.file_path = file_path
+        self._password = password
+        self._aead_class, self._invalid_tag = _aesgcm()
+        self._ciphers: Dict[bytes, object] = {}
+        self._master_keys: Dict[bytes, bytes] = {}
+        self._new_params: Optional[bytes] = None
+        # (подпись файла, заголовок, {id: (номер, смещение, длина)}) для чтения по ID
+        self._footer: Optional[tuple] = None
+
+    def _cipher(self, header: bytes):
+        """Возвращает объект AESGCM для заголовка файла (ключ зависит от соли и ID записи файла)."""
+        cipher = self._ciphers.get(header)
+        if cipher is None:
+            magic, salt, log_n, r, p, file_id = _HEADER.unpack(header)
+            if magic != MAGIC:
+                raise DecryptionError("Файл не является зашифрованным файлом заметок")
+            params = header[:_KEY_PARAMS_SIZE]
+            master = self._master_keys.get(params)
+            if master is None:
+                master = self._master_keys[params] = derive_key(self._password, salt, log_n, r, p)
+            key = hmac.new(master, b"records" + file_id, hashlib.sha256).digest()
+            if len(self._ciphers) >= 4:
+                self._ciphers.clear()  # ключи прежних версий файла больше не нужны
+            cipher = self._ciphers[header] = self._aead_class(key)
+        return cipher
+
+    def _decrypt(self, header: bytes, blob: bytes, aad: bytes) -> bytes:
+        """Расшифровывает nonce + шифртекст и проверяет подлинность."""
+        try:
+            return self._cipher(header).decrypt(blob[:NONCE_SIZE], blob[NONCE_SIZE:], header + aad)
+        except self._invalid_tag:
+            raise DecryptionError("Неверный пароль или файл поврежден") from None
+
+    def _encrypt(self, header: bytes, data: bytes, aad: bytes) -> bytes:
+        """Шифрует данные со случайным nonce."""
+        nonce = os.urandom(NONCE_SIZE)
+        return nonce + self._cipher(header).encrypt(nonce, data, header + aad)
+
+    def _header_for_write(self) -> bytes:
+        """Заголовок для записи: новый ID записи файла, соль существующего файла
+        сохраняется, чтобы не пересчитывать основной ключ."""
+        params = None
+        try:
+            with open(self.file_path, 'rb') as f:
+                header = f.read(_HEADER.size)
+            if len(header) == _HEADER.size and header.startswith(MAGIC):
+                params = header[:_KEY_PARAMS_SIZE]
+        except OSError:
+            pass
+        if params is None:
+            if self._new_params is None:
+                self._new_params = _HEADER.pack(MAGIC, os.urandom(SALT_SIZE), SCRYPT_LOG_N, SCRYPT_R, SCRYPT_P,
+                                                bytes(FILE_ID_SIZE))[:_KEY_PARAMS_SIZE]
+            params = self._new_params
+        return params + os.urandom(FILE_ID_SIZE)
+
+    def write(self, records: Iterable[Dict]) -> int:
+        """Шифрует и атомарно записывает заметки.
+
+        Args:
+            records (Iterable[Dict]): Заметки в виде словарей
+
+        Returns:
+            int: Размер записанного файла в байтах
+        """
+        header = self._header_for_write()
+        index = []
+        digest = hashlib.sha256()
+        tmp_path = self.file_path + ".tmp"
+        with stats.timer("crypto.encrypt"):
+            with open(tmp_path, 'wb') as f:
+                f.write(header)
+                offset = len(header)
+                for i, record in enumerate(records):
+                    data = json.dumps(record, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+                    blob = self._encrypt(header, data, _RECORD_NO.pack(i))
+                    f.write(_LENGTH.pack(len(blob)))
+                    f.write(blob)
+                    digest.update(blob)
+                    index.append([record.get("id"), offset, len(blob) + _LENGTH.size])
+                    offset += len(blob) + _LENGTH.size
+                footer = json.dumps({"count": len(index), "digest": digest.hexdigest(), "index": index},
+                                    separators=(',', ':'))
+                blob = self._encrypt(header, footer.encode('utf-8'), b"index")
+                f.write(blob)
+                f.write(_TRAILER.pack(offset, len(blob), END_MAGIC))
+                size = offset + len(blob) + _TRAILER.size
+        os.replace(tmp_path, self.file_path)
+        return size
+
+    def _read_footer(self, f) -> Tuple[bytes, int, Dict]:
+        """Читает заголовок и расшифровывает оглавление."""
+        header = f.read(_HEADER.size)
+        if len(header) != _HEADER.size:
+            raise DecryptionError("Файл обрезан")
+        f.seek(-_TRAILER.size, os.SEEK_END)
+        footer_offset, footer_size, end_magic = _TRAILER.unpack(f.read(_TRAILER.size))
+        if end_magic != END_MAGIC:
+            raise DecryptionError("Файл обрезан")
+        f.seek(footer_offset)
+        footer = json.loads(self._decrypt(header, f.read(footer_size), b"index"))
+        if footer["count"] != len(footer["index"]):
+            raise DecryptionError("Файл поврежден")
+        return header, footer_offset, footer
+
+    def verify(self):
+        """Проверяет пароль, расшифровывая оглавление (если файл существует).
+
+        Raises:
+            DecryptionError: Если пароль неверный или файл поврежден
+        """
+        if is_encrypted(self.file_path):
+            with open(self.file_path, 'rb') as f:
+                self._read_footer(f)
+
+    def iter_records(self) -> Iterator[Dict]:
+        """Потоково расшифровывает заметки по одной.
+
+        Yields:
+            Dict: Очередная заметка в виде словаря
+
+        Raises:
+            DecryptionError: Если пароль неверный или файл поврежден
+        """
+        with open(self.file_path, 'rb') as f:
+            header, footer_offset, footer = self._read_footer(f)
+            digest = hashlib.sha256()
+            f.seek(_HEADER.size)
+            for i in range(footer["count"]):
+                (size,) = _LENGTH.unpack(f.read(_LENGTH.size))
+                if f.tell() + size > footer_offset:
+                    raise DecryptionError("Файл поврежден")
+                blob = f.read(size)
+                digest.update(blob)
+                with stats.timer("crypto.decrypt"):
+                    data = self._decrypt(header, blob, _RECORD_NO.pack(i))
+                yield json.loads(data)
+            if f.tell() != footer_offset or digest.hexdigest() != footer["digest"]:
+                raise DecryptionError("Файл поврежден")
+
+    def read_all(self) -> List[Dict]:
+        """Расшифровывает все заметки.
+
+        Returns:
+            List[Dict]: Заметки в виде словарей
+        """
+        return list(self.iter_records())
+
+    def get(self, note_id: int) -> Optional[Dict]:
+        """Читает одну заметку по оглавлению, не расшифровывая остальные.
+
+        Оглавление кэшируется, пока файл не изменится.
+
+        Args:
+            note_id (int): ID заметки
+
+        Returns:
+            Optional[Dict]: Заметка в виде словаря или None, если ее нет
+        """
+        signature = file_signature(self.file_path)
+        if signature is None:
+            return None
+        with open(self.file_path, 'rb') as f:
+            if self._footer is None or self._footer[0] != signature:
+                header, _, footer = self._read_footer(f)
+                positions = {entry[0]: (i, entry[1], entry[2]) for i, entry in enumerate(footer["index"])}
+                self._footer = (signature, header, positions)
+            _, header, positions = self._footer
+            position = positions.get(note_id)
+            if position is None:
+                return None
+            i, offset, size = position
+            f.seek(offset + _LENGTH.size)
+            with stats.timer("crypto.decrypt"):
+                data = self._decrypt(header, f.read(size - _LENGTH.size), _RECORD_NO.pack(i))
+        return json.loads(data)
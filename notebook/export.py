@@ -0,0 +1,268 @@
+"""
+Модуль export - потоковая выгрузка заметок в NDJSON, CSV и Markdown.
+
+Заметки читаются из хранилища по одной через Storage.iter_notes(),
+фильтруются и записываются в выходной файл кусками, поэтому расход памяти
+не зависит от количества заметок. Выходной файл можно сжать gzip или zstd
+(если установлен пакет zstandard). Для очень больших файлов фильтрацию
+можно распределить по ядрам (workers, см. модуль parallel); в этом режиме
+файл копируется в разделяемую память, и расход памяти пропорционален
+размеру файла.
+"""
+
+import contextlib
+import csv
+import gzip
+import io
+import json
+import mmap
+import os
+import re
+import sys
+from typing import Iterable, Iterator, Optional, TextIO
+from .models import Note
+from .storage import Storage
+from .profiling import stats
+from .search import normalize_query
+
+FORMATS = ("ndjson", "csv", "md")
+COMPRESSIONS = ("none", "gzip", "zstd", "auto")
+CSV_FIELDS = ("id", "title", "content", "priority", "status", "tags", "created_at")
+WRITE_CHUNK_SIZE = 256 * 1024
+
+
+def _zstandard():
+    """Импортирует необязательный пакет zstandard (None, если он не установлен).
+
+    Импорт отложен до первой выгрузки со сжатием, чтобы не замедлять запуск.
+    """
+    try:
+        import zstandard
+    except ImportError:
+        return None
+    return zstandard
+
+
+def matches(note: Note, query: str = "", priority: Optional[str] = None,
+            status: Optional[str] = None, tag: Optional[str] = None,
+            pattern: Optional[str] = None) -> bool:
+    """Проверяет, подходит ли заметка под фильтры выгрузки.
+
+    Текстовый запрос работает так же, как поиск в окне приложения:
+    подстрока ищется в заголовке, содержимом и тегах без учета регистра.
+
+    Args:
+        note (Note): Проверяемая заметка
+        query (str, optional): Текст или #тег для поиска. Defaults to "".
+        priority (Optional[str], optional): Требуемый приоритет. Defaults to None.
+        status (Optional[str], optional): Требуемый статус. Defaults to None.
+        tag (Optional[str], optional): Тег, который должен быть у заметки. Defaults to None.
+        pattern (Optional[str], optional): Регулярное выражение для заголовка,
+            содержимого или тегов. Defaults to None.
+
+    Returns:
+        bool: True если заметка проходит все фильтры
+    """
+    if priority and note.priority != priority.lower():
+        return False
+    if status and note.status != status.lower():
+        return False
+    if tag and tag.lower().lstrip('#') not in note.tags:
+        return False
+    if pattern and not (re.search(pattern, note.title) or re.search(pattern, note.content)
+                        or any(re.search(pattern, t) for t in note.tags)):
+        return False
+    search = normalize_query(query)
+    if search:
+        return (search in note.title.lower() or
+                search in note.content.lower() or
+                search in " ".join(note.tags))
+    return True
+
+
+def resolve_compression(compress: Optional[str]) -> str:
+    """Определяет фактический способ сжатия.
+
+    Args:
+        compress (Optional[str]): none, gzip, zstd или auto (zstd, если доступен, иначе gzip)
+
+    Returns:
+        str: none, gzip или zstd
+
+    Raises:
+        ValueError: Если способ неизвестен или zstd запрошен без пакета zstandard
+    """
+    compress = (compress or "none").lower()
+    if compress not in COMPRESSIONS:
+        raise ValueError(f"Неизвестный способ сжатия: {compress}")
+    if compress == "auto":
+        return "zstd" if _zstandard() is not None else "gzip"
+    if compress == "zstd" and _zstandard() is None:
+        raise ValueError("Для сжатия zstd установите пакет zstandard")
+    return compress
+
+
+def _open_output(path: str, compress: str) -> TextIO:
+    """Открывает выходной поток с нужным сжатием.
+
+    Args:
+        path (str): Путь к файлу или "-" для стандартного вывода
+        compress (str): none, gzip или zstd
+
+    Returns:
+        TextIO: Текстовый поток для записи
+    """
+    if compress == "none":
+        if path == "-":
+            return io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', newline='')
+        return open(path, 'w', encoding='utf-8', newline='')
+    if compress == "gzip":
+        if path == "-":
+            binary = gzip.GzipFile(fileobj=sys.stdout.buffer, mode='wb')
+        else:
+            binary = gzip.open(path, 'wb')
+    else:
+        raw = sys.stdout.buffer if path == "-" else open(path, 'wb')
+        binary = _zstandard().ZstdCompressor().stream_writer(raw, closefd=path != "-")
+    return io.TextIOWrapper(binary, encoding='utf-8', newline='')
+
+
+def _ndjson_lines(notes: Iterable[Note]) -> Iterator[str]:
+    """Сериализует заметки в NDJSON: одна заметка на строку."""
+    for note in notes:
+        yield json.dumps(note.to_dict(), ensure_ascii=False) + "\n"
+
+
+def _csv_lines(notes: Iterable[Note]) -> Iterator[str]:
+    """Сериализует заметки в CSV с заголовком."""
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(CSV_FIELDS)
+    for note in notes:
+        writer.writerow((note.id, note.title, note.content, note.priority,
+                         note.status, " ".join(note.tags), note.created_at))
+        yield buf.getvalue()
+        buf.seek(0)
+        buf.truncate()
+    if buf.tell():
+        yield buf.getvalue()
+
+
+def _md_lines(notes: Iterable[Note]) -> Iterator[str]:
+    """Сериализует заметки в Markdown: один раздел на заметку."""
+    for note in notes:
+        tags_str = " ".join([f"#{t}" for t in note.tags])
+        meta = f"ID {note.id} | {note.priority} | {note.status} | {note.created_at[:10]}"
+        if tags_str:
+            meta += f" | {tags_str}"
+        yield f"## {note.title}\n\n_{meta}_\n\n{note.content}\n\n---\n\n"
+
+
+_SERIALIZERS = {
+    "ndjson": _ndjson_lines,
+    "csv": _csv_lines,
+    "md": _md_lines,
+}
+
+
+def write_notes(notes: Iterable[Note], out: TextIO, fmt: str = "ndjson",
+                chunk_size: int = WRITE_CHUNK_SIZE) -> int:
+    """Записывает заметки в открытый поток кусками.
+
+    Args:
+        notes (Iterable[Note]): Заметки для записи
+        out (TextIO): Текстовый поток
+        fmt (str, optional): Формат: ndjson, csv или md. Defaults to "ndjson".
+        chunk_size (int, optional): Размер куска перед записью в поток. Defaults to WRITE_CHUNK_SIZE.
+
+    Returns:
+        int: Количество записанных заметок
+
+    Raises:
+        ValueError: Если формат неизвестен
+    """
+    if fmt not in _SERIALIZERS:
+        raise ValueError(f"Неизвестный формат: {fmt}")
+    counter = {"count": 0}
+
+    def counted():
+        for note in notes:
+            counter["count"] += 1
+            yield note
+
+    pending = []
+    size = 0
+    for line in _SERIALIZERS[fmt](counted()):
+        pending.append(line)
+        size += len(line)
+        if size >= chunk_size:
+            out.write("".join(pending))
+            pending = []
+            size = 0
+    if pending:
+        out.write("".join(pending))
+    return counter["count"]
+
+
+def export_notes(storage: Storage, path: str, fmt: str = "ndjson", query: str = "",
+                 priority: Optional[str] = None, status: Optional[str] = None,
+                 tag: Optional[str] = None, compress: Optional[str] = None,
+                 chunk_size: int = WRITE_CHUNK_SIZE, pattern: Optional[str] = None,
+                 workers: int = 0) -> int:
+    """Выгружает отфильтрованные заметки из хранилища в файл.
+
+    Args:
+        storage (Storage): Хранилище заметок
+        path (str): Путь к выходному файлу или "-" для стандартного вывода
+        fmt (str, optional): Формат: ndjson, csv или md. Defaults to "ndjson".
+        query (str, optional): Текст или #тег для поиска. Defaults to "".
+        priority (Optional[str], optional): Фильтр по приоритету. Defaults to None.
+        status (Optional[str], optional): Фильтр по статусу. Defaults to None.
+        tag (Optional[str], optional): Фильтр по тегу. Defaults to None.
+        compress (Optional[str], optional): none, gzip, zstd или auto. Defaults to None.
+        chunk_size (int, optional): Размер куска записи. Defaults to WRITE_CHUNK_SIZE.
+        pattern (Optional[str], optional): Регулярное выражение. Defaults to None.
+        workers (int, optional): Процессов для фильтрации большого файла (0 - без
+            параллельной обработки). Память в этом режиме - порядка размера файла:
+            он целиком копируется в разделяемую память. Defaults to 0.
+
+    Returns:
+        int: Количество выгруженных заметок
+
+    Raises:
+        ValueError: Если формат, способ сжатия или регулярное выражение некорректны
+            или файл заметок не удалось дочитать (часть заметок уже может быть записана)
+    """
+    if fmt not in _SERIALIZERS:
+        raise ValueError(f"Неизвестный формат: {fmt}")
+    compress = resolve_compression(compress)
+    if pattern:
+        try:
+            re.compile(pattern)
+        except re.error as e:
+            raise ValueError(f"Некорректное регулярное выражение: {e}") from None
+    with contextlib.ExitStack() as stack:
+        if workers > 1 and not storage.cipher and os.path.exists(storage.file_path) \
+                and os.path.getsize(storage.file_path) > 0:
+            from .parallel import ParallelScanner  # процессы нужны только для больших выгрузок
+            f = stack.enter_context(open(storage.file_path, 'rb'))
+            data = stack.enter_context(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+            scanner = stack.enter_context(ParallelScanner(workers))
+            found = scanner.iter_filter(data, query, pattern, priority, status, tag)
+            stack.callback(found.close)  # освобождает разделяемую память и при ошибке записи
+            notes = (Note.from_dict(item, trusted=True) for item in found)  # проверены в процессах
+        else:
+            notes = (n for n in storage.iter_notes() if matches(n, query, priority, status, tag, pattern))
+        out = _open_output(path, compress)
+        try:
+            with stats.timer("export.write"):
+                count = write_notes(notes, out, fmt, chunk_size)
+            stats.add("export.notes", count)
+            return count
+        finally:
+            if path == "-" and compress == "none":
+                # не закрываем стандартный вывод
+                out.flush()
+                out.detach()
+            else:
+                out.close()
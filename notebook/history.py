@@ -0,0 +1,319 @@
+"""
+Модуль history - история версий заметок с дельта-сжатием.
+
+История каждой заметки хранится в отдельном файле <id>.json в директории
+рядом с файлом заметок, поэтому при сохранении переписывается только файл
+измененной заметки. Последняя версия хранится целиком, а каждая предыдущая -
+как обратная дельта по строкам содержимого относительно следующей версии.
+Метаданные (заголовок, приоритет, статус, теги) малы и хранятся в каждой
+версии целиком.
+
+Размер истории одной заметки ограничен количеством версий и объемом;
+самые старые версии удаляются первыми.
+"""
+
+import json
+import os
+from datetime import datetime
+from difflib import SequenceMatcher
+from typing import Dict, List, Optional, Set, Union
+from .blobs import attachment_digests
+
+DEFAULT_MAX_REVISIONS = 50
+DEFAULT_MAX_BYTES = 256 * 1024
+
+Delta = List[Union[List[int], str]]
+
+
+def make_delta(base: str, target: str) -> Delta:
+    """Строит дельту, превращающую base в target.
+
+    Дельта - список инструкций: пара [i1, i2] копирует строки base[i1:i2],
+    строка вставляется как есть.
+
+    Args:
+        base (str): Исходный текст
+        target (str): Целевой текст
+
+    Returns:
+        Delta: Список инструкций
+    """
+    base_lines = base.splitlines(keepends=True)
+    target_lines = target.splitlines(keepends=True)
+    delta: Delta = []
+    matcher = SequenceMatcher(None, base_lines, target_lines, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            delta.append([i1, i2])
+        elif j1 != j2:
+            delta.append("".join(target_lines[j1:j2]))
+    return delta
+
+
+def apply_delta(base: str, delta: Delta) -> str:
+    """Применяет дельту к тексту.
+
+    Args:
+        base (str): Исходный текст
+        delta (Delta): Дельта из make_delta
+
+    Returns:
+        str: Целевой текст
+    """
+    base_lines = base.splitlines(keepends=True)
+    parts = []
+    for op in delta:
+        if isinstance(op, str):
+            parts.append(op)
+        else:
+            parts.extend(base_lines[op[0]:op[1]])
+    return "".join(parts)
+
+
+class History:
+    """Хранилище версий заметок.
+
+    Attributes:
+        directory (str): Директория с файлами истории
+        max_revisions (int): Максимальное количество версий одной заметки
+        max_bytes (int): Максимальный объем истории одной заметки в байтах
+    """
+
+    def __init__(self, directory: str, max_revisions: int = DEFAULT_MAX_REVISIONS,
+                 max_bytes: int = DEFAULT_MAX_BYTES):
+        """Инициализирует историю.
+
+        Args:
+            directory (str): Директория с файлами истории
+            max_revisions (int, optional): Лимит версий. Defaults to DEFAULT_MAX_REVISIONS.
+            max_bytes (int, optional): Лимит объема. Defaults to DEFAULT_MAX_BYTES.
+        """
+        self.directory = directory
+        self.max_revisions = max_revisions
+        self.max_bytes = max_bytes
+        self._max_id: Optional[int] = None
+
+    def _path(self, note_id: int) -> str:
+        return os.path.join(self.directory, f"{note_id}.json")
+
+    def _load(self, note_id: int) -> Optional[Dict]:
+        """Читает файл истории заметки (None, если его нет или он поврежден)."""
+        path = self._path(note_id)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (json.JSONDecodeError, PermissionError) as e:
+            print(f"Ошибка при чтении истории: {e}")
+            return None
+
+    def _write(self, note_id: int, data: Dict) -> bool:
+        """Атомарно записывает файл истории заметки."""
+        path = self._path(note_id)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_path = path + ".tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+            os.replace(tmp_path, path)
+            return True
+        except (PermissionError, OSError) as e:
+            print(f"Ошибка при записи истории: {e}")
+            return False
+
+    def record(self, note: Dict, deleted: bool = False) -> int:
+        """Добавляет новую версию заметки.
+
+        Args:
+            note (Dict): Заметка в виде словаря (Note.to_dict())
+            deleted (bool, optional): Версия отмечает удаление заметки. Defaults to False.
+
+        Returns:
+            int: Номер новой версии (0, если записать не удалось)
+        """
+        note_id = note["id"]
+        data = self._load(note_id) or {"id": note_id, "head": None, "revs": []}
+        revs = data["revs"]
+        head = data["head"]
+        if head is not None and revs:
+            # предыдущая версия превращается в дельту от новой
+            revs[-1]["delta"] = make_delta(note["content"], head["content"])
+        rev = revs[-1]["rev"] + 1 if revs else 1
+        meta = {k: v for k, v in note.items() if k != "content"}
+        revs.append({
+            "rev": rev,
+            "saved_at": datetime.now().isoformat(),
+            "deleted": deleted,
+            "meta": meta,
+            "delta": None,
+        })
+        data["head"] = note
+        self._trim(data)
+        if not self._write(note_id, data):
+            return 0
+        if self._max_id is not None:
+            self._max_id = max(self._max_id, note_id)
+        return rev
+
+    def record_base(self, note: Dict) -> int:
+        """Записывает исходную версию заметки, у которой еще нет истории.
+
+        Заметка могла быть сохранена до включения истории или получена
+        синхронизацией без истории. Без исходной версии ее состояние до
+        первого изменения нельзя было бы восстановить.
+
+        Args:
+            note (Dict): Текущая сохраненная заметка в виде словаря
+
+        Returns:
+            int: Номер записанной версии (0, если история уже есть)
+        """
+        if os.path.exists(self._path(note["id"])):
+            return 0
+        return self.record(note)
+
+    def _trim(self, data: Dict):
+        """Удаляет самые старые версии сверх лимитов."""
+        revs = data["revs"]
+        while len(revs) > max(self.max_revisions, 1):
+            revs.pop(0)
+        size = len(json.dumps(data, ensure_ascii=False).encode('utf-8'))
+        while len(revs) > 1 and size > self.max_bytes:
+            dropped = revs.pop(0)
+            size -= len(json.dumps(dropped, ensure_ascii=False).encode('utf-8')) + 1
+
+    def revisions(self, note_id: int) -> List[Dict]:
+        """Возвращает список сохраненных версий заметки.
+
+        Args:
+            note_id (int): ID заметки
+
+        Returns:
+            List[Dict]: Версии от старой к новой: rev, saved_at, deleted, title
+        """
+        data = self._load(note_id)
+        if not data:
+            return []
+        return [{
+            "rev": r["rev"],
+            "saved_at": r["saved_at"],
+            "deleted": r["deleted"],
+            "title": r["meta"].get("title", ""),
+        } for r in data["revs"]]
+
+    def get(self, note_id: int, rev: int) -> Optional[Dict]:
+        """Восстанавливает заметку в указанной версии.
+
+        Args:
+            note_id (int): ID заметки
+            rev (int): Номер версии
+
+        Returns:
+            Optional[Dict]: Заметка в виде словаря или None, если версии нет
+        """
+        data = self._load(note_id)
+        if not data:
+            return None
+        content = data["head"]["content"]
+        # идем от новой версии к старой, применяя обратные дельты
+        for r in reversed(data["revs"]):
+            if r["delta"] is not None:
+                content = apply_delta(content, r["delta"])
+            if r["rev"] == rev:
+                note = dict(r["meta"])
+                note["content"] = content
+                return note
+        return None
+
+    def note_ids(self) -> List[int]:
+        """Возвращает ID всех заметок, у которых есть история.
+
+        Returns:
+            List[int]: Список ID
+        """
+        if not os.path.isdir(self.directory):
+            return []
+        return [int(name[:-5]) for name in os.listdir(self.directory)
+                if name.endswith(".json") and name[:-5].isdigit()]
+
+    def max_id(self) -> int:
+        """Возвращает наибольший ID заметки в истории (0, если истории нет).
+
+        Returns:
+            int: Наибольший ID
+        """
+        if self._max_id is None:
+            self._max_id = max(self.note_ids(), default=0)
+        return self._max_id
+
+    def renumber(self, note_id: int, new_id: int) -> bool:
+        """Переносит историю заметки на новый ID.
+
+        Args:
+            note_id (int): Прежний ID заметки
+            new_id (int): Новый ID (истории с этим ID быть не должно)
+
+        Returns:
+            bool: True если история перенесена или ее не было
+        """
+        data = self._load(note_id)
+        if data is None:
+            return True
+        data["id"] = new_id
+        if data["head"]:
+            data["head"]["id"] = new_id
+        for r in data["revs"]:
+            r["meta"]["id"] = new_id
+        if not self._write(new_id, data):
+            return False
+        try:
+            os.remove(self._path(note_id))
+        except OSError as e:
+            print(f"Ошибка при удалении истории: {e}")
+        if self._max_id is not None:
+            self._max_id = max(self._max_id, new_id)
+        return True
+
+    def tombstone(self, note_id: int) -> Optional[Dict]:
+        """Возвращает заметку в момент удаления, если последняя версия - удаление.
+
+        Args:
+            note_id (int): ID заметки
+
+        Returns:
+            Optional[Dict]: Заметка в виде словаря или None, если заметка не удалена
+        """
+        data = self._load(note_id)
+        if not data or not data["revs"] or not data["revs"][-1]["deleted"]:
+            return None
+        return data["head"]
+
+    def attachment_digests(self) -> Set[str]:
+        """Возвращает хэши вложений, на которые ссылается любая сохраненная версия.
+
+        Returns:
+            Set[str]: Хэши вложений
+        """
+        digests = set()
+        for note_id in self.note_ids():
+            data = self._load(note_id)
+            if not data:
+                continue
+            if data["head"]:
+                digests.update(attachment_digests(data["head"]))
+            for r in data["revs"]:
+                digests.update(attachment_digests(r["meta"]))
+        return digests
+
+    def latest(self, note_id: int) -> Optional[Dict]:
+        """Возвращает описание последней версии заметки.
+
+        Args:
+            note_id (int): ID заметки
+
+        Returns:
+            Optional[Dict]: rev, saved_at, deleted, title или None
+        """
+        revs = self.revisions(note_id)
+        return revs[-1] if revs else None
@@ -0,0 +1,285 @@
+"""
+Модуль maintenance - фоновое обслуживание хранилища.
+
+MaintenanceScheduler выполняет задачи обслуживания в отдельном потоке, пока
+пользователь ничего не делает: сжатие файла данных, проверку поискового
+индекса и проверку целостности. Частота ограничена: каждая задача имеет
+минимальный интервал между запусками, а за один цикл выполняется не больше
+одной задачи. Время выполнения и результаты попадают в статистику режима
+отладки (модуль profiling) под именами maintenance.*.
+"""
+
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+from .models import Note
+from .profiling import stats
+from .schema import NOTE_SCHEMA, PRIORITIES, STATUSES
+from .search import TrigramIndex
+from .snapshot import file_signature
+from .storage import Storage
+
+DEFAULT_IDLE_AFTER = 5.0
+DEFAULT_POLL_INTERVAL = 1.0
+REQUIRED_FIELDS = tuple(name for name, rule in NOTE_SCHEMA.items() if rule.get("required"))
+STALE_TMP_SECONDS = 60
+
+
+def check_integrity(storage: Storage) -> Dict[str, List]:
+    """Проверяет целостность данных хранилища.
+
+    Находит повторяющиеся ID, пропущенные поля и недопустимые значения
+    приоритета и статуса. Читается сам файл, а не проверенные по схеме
+    записи: хранилище пропускает некорректные заметки при загрузке.
+    Файл читается потоково и без блокировки хранилища: запись заменяет
+    его целиком (os.replace), поэтому чтение видит одну из его версий.
+
+    Args:
+        storage (Storage): Хранилище заметок
+
+    Returns:
+        Dict[str, List]: Найденные проблемы по видам (пустые списки, если все в порядке)
+
+    Raises:
+        ValueError: Если файл поврежден или обрезан
+    """
+    issues = {"duplicate_ids": [], "missing_fields": [], "bad_priority": [], "bad_status": []}
+    seen = set()
+    for item in storage._iter_records():
+        if not isinstance(item, dict):
+            continue
+        note_id = item.get("id")
+        if note_id in seen and note_id not in issues["duplicate_ids"]:
+            issues["duplicate_ids"].append(note_id)
+        seen.add(note_id)
+        missing = [field for field in REQUIRED_FIELDS if field not in item]
+        if missing:
+            issues["missing_fields"].append((note_id, missing))
+        if "priority" in item and item["priority"] not in PRIORITIES:
+            issues["bad_priority"].append((note_id, item["priority"]))
+        if "status" in item and item["status"] not in STATUSES:
+            issues["bad_status"].append((note_id, item["status"]))
+    return issues
+
+
+def compact(storage: Storage) -> Dict[str, int]:
+    """Сжимает файл данных: убирает дубликаты ID и брошенные временные файлы.
+
+    Дубликаты ищутся без блокировки хранилища; файл переписывается под
+    блокировкой и только если с момента чтения его никто не изменил.
+
+    Args:
+        storage (Storage): Хранилище заметок
+
+    Returns:
+        Dict[str, int]: Количество удаленных дубликатов и временных файлов
+    """
+    signature = file_signature(storage.file_path)
+    records = storage._load_notes()
+    latest = {}
+    for item in records:
+        # при повторе ID побеждает последняя запись, как при сохранении
+        latest.pop(item.get("id"), None)
+        latest[item.get("id")] = item
+    removed = len(records) - len(latest)
+    if removed:
+        with storage._lock:
+            if file_signature(storage.file_path) != signature:
+                removed = 0  # файл изменился, попробуем в следующий раз
+            elif storage._save_notes(list(latest.values())):
+                stats.add("maintenance.compact.duplicates", removed)
+            else:
+                removed = 0
+    return {"duplicates": removed, "tmp_files": _remove_stale_tmp(storage)}
+
+
+def stale_index_ids(index: TrigramIndex, notes: List[Note]) -> List[int]:
+    """Сверяет поисковый индекс с заметками хранилища.
+
+    Args:
+        index (TrigramIndex): Проверяемый индекс
+        notes (List[Note]): Актуальные заметки хранилища
+
+    Returns:
+        List[int]: ID заметок, которых нет в индексе, которые в нем лишние или устарели
+    """
+    indexed = {note.id: note for note in index.notes()}
+    stale = []
+    for note in notes:
+        old = indexed.pop(note.id, None)
+        if old is None or old.to_dict() != note.to_dict():
+            stale.append(note.id)
+    stale.extend(indexed)
+    return stale
+
+
+def _remove_stale_tmp(storage: Storage) -> int:
+    """Удаляет временные файлы, оставшиеся после прерванной записи."""
+    # рядом с файлом заметок трогаем только его собственные временные файлы
+    file_path = os.path.abspath(storage.file_path)
+    directories = [(os.path.dirname(file_path), os.path.basename(file_path))]
+    if storage.versions:
+        directories.append((storage.versions.directory, ""))
+    directories.append((storage.blobs.directory, ""))
+    now = time.time()
+    removed = 0
+    for directory, prefix in directories:
+        if not os.path.isdir(directory):
+            continue
+        for name in os.listdir(directory):
+            path = os.path.join(directory, name)
+            if not (name.startswith(prefix) and name.endswith(".tmp")):
+                continue
+            try:
+                if now - os.path.getmtime(path) > STALE_TMP_SECONDS:
+                    os.remove(path)
+                    removed += 1
+            except OSError:
+                pass
+    return removed
+
+
+class Task:
+    """Задача обслуживания.
+
+    Attributes:
+        name (str): Имя задачи
+        func (Callable): Функция без аргументов, возвращающая результат
+        interval (float): Минимальный интервал между запусками в секундах
+        last_run (Optional[float]): Время последнего запуска (time.monotonic)
+        last_result: Результат последнего запуска
+        runs (int): Количество запусков
+    """
+
+    def __init__(self, name: str, func: Callable[[], object], interval: float):
+        """Инициализирует задачу.
+
+        Args:
+            name (str): Имя задачи
+            func (Callable): Функция задачи
+            interval (float): Минимальный интервал между запусками в секундах
+        """
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.last_run: Optional[float] = None
+        self.last_result = None
+        self.runs = 0
+
+    def is_due(self, now: float) -> bool:
+        """Пора ли запускать задачу."""
+        return self.last_run is None or now - self.last_run >= self.interval
+
+
+class MaintenanceScheduler:
+    """Планировщик фоновых задач обслуживания.
+
+    Attributes:
+        idle_after (float): Сколько секунд без действий пользователя считается простоем
+        poll_interval (float): Период проверки в секундах
+        tasks (List[Task]): Зарегистрированные задачи
+        debug (bool): Печатать ли результаты задач
+    """
+
+    def __init__(self, idle_after: float = DEFAULT_IDLE_AFTER,
+                 poll_interval: float = DEFAULT_POLL_INTERVAL, debug: bool = False):
+        """Инициализирует планировщик.
+
+        Args:
+            idle_after (float, optional): Порог простоя. Defaults to DEFAULT_IDLE_AFTER.
+            poll_interval (float, optional): Период проверки. Defaults to DEFAULT_POLL_INTERVAL.
+            debug (bool, optional): Печатать результаты задач. Defaults to False.
+        """
+        self.idle_after = idle_after
+        self.poll_interval = poll_interval
+        self.debug = debug
+        self.tasks: List[Task] = []
+        self._last_activity = time.monotonic()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def add_task(self, name: str, func: Callable[[], object], interval: float) -> Task:
+        """Регистрирует задачу.
+
+        Args:
+            name (str): Имя задачи
+            func (Callable): Функция без аргументов
+            interval (float): Минимальный интервал между запусками в секундах
+
+        Returns:
+            Task: Созданная задача
+        """
+        task = Task(name, func, interval)
+        self.tasks.append(task)
+        return task
+
+    def touch(self, event=None):
+        """Отмечает активность пользователя, откладывая обслуживание.
+
+        Args:
+            event: Событие Tkinter (опционально, чтобы метод можно было привязать к bind)
+        """
+        self._last_activity = time.monotonic()
+
+    def is_idle(self) -> bool:
+        """Простаивает ли сейчас приложение."""
+        return time.monotonic() - self._last_activity >= self.idle_after
+
+    def run_pending(self, force: bool = False) -> Optional[str]:
+        """Выполняет одну задачу, срок которой подошел.
+
+        Args:
+            force (bool, optional): Не ждать простоя. Defaults to False.
+
+        Returns:
+            Optional[str]: Имя выполненной задачи или None
+        """
+        if not force and not self.is_idle():
+            return None
+        now = time.monotonic()
+        due = [task for task in self.tasks if task.is_due(now)]
+        if not due:
+            return None
+        # первой идет задача, которая дольше всех не запускалась
+        task = min(due, key=lambda t: t.last_run if t.last_run is not None else float("-inf"))
+        task.last_run = now
+        try:
+            with stats.timer(f"maintenance.{task.name}"):
+                task.last_result = task.func()
+            stats.add(f"maintenance.{task.name}.runs")
+        except Exception as e:  # задача обслуживания не должна ронять поток
+            task.last_result = e
+            stats.add(f"maintenance.{task.name}.errors")
+        task.runs += 1
+        if self.debug:
+            print(f"[DEBUG] Обслуживание {task.name}: {task.last_result}")
+        return task.name
+
+    def status(self) -> Dict[str, dict]:
+        """Возвращает состояние задач для отображения.
+
+        Returns:
+            Dict[str, dict]: Количество запусков и последний результат каждой задачи
+        """
+        return {task.name: {"runs": task.runs, "last_result": task.last_result} for task in self.tasks}
+
+    def _loop(self):
+        while not self._stop.wait(self.poll_interval):
+            self.run_pending()
+
+    def start(self):
+        """Запускает фоновый поток планировщика."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="notes-maintenance", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Останавливает фоновый поток и ждет его завершения."""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
@@ -7,6 +7,7 @@
 
 from datetime import datetime
 from typing import Optional, List
+from .schema import validate_note
 
 
 class Note:
@@ -20,6 +21,9 @@ class Note:
         status (str): Статус заметки (active/done/archived)
         tags (List[str]): Список тегов заметки
         created_at (str): Временная метка создания в формате ISO
+        rev (int): Счетчик изменений заметки для синхронизации (0 - еще не сохранялась)
+        updated_at (Optional[str]): Временная метка последнего сохранения в формате ISO
+        attachments (List[dict]): Описания вложений: name, sha256, size (файлы лежат в BlobStore)
     """
 
     def __init__(self, title: str, content: str,
@@ -41,6 +45,9 @@ class Note:
         self.status = status.lower()
         self.tags = [t.strip().lower() for t in (tags or []) if t.strip()]
         self.created_at = datetime.now().isoformat()
+        self.rev = 0
+        self.updated_at: Optional[str] = None
+        self.attachments: List[dict] = []
 
     def to_dict(self) -> dict:
         """Преобразует объект заметки в словарь.
@@ -48,7 +55,7 @@ class Note:
         Returns:
             dict: Словарь с данными заметки
         """
-        return {
+        data = {
             "id": self.id,
             "title": self.title,
             "content": self.content,
@@ -57,17 +64,31 @@ class Note:
             "tags": self.tags,
             "created_at": self.created_at
         }
+        if self.rev:
+            # поля синхронизации появляются после первого сохранения
+            data["rev"] = self.rev
+            data["updated_at"] = self.updated_at
+        if self.attachments:
+            data["attachments"] = self.attachments
+        return data
 
     @staticmethod
-    def from_dict(data: dict) -> 'Note':
+    def from_dict(data: dict, trusted: bool = False) -> 'Note':
         """Создает объект Note из словаря.
 
         Args:
             data (dict): Словарь с данными заметки
+            trusted (bool, optional): Данные записаны самим приложением или уже
+                проверены, проверка по схеме пропускается. Defaults to False.
 
         Returns:
             Note: Объект заметки
+
+        Raises:
+            ValidationError: Если данные не соответствуют схеме (см. модуль schema)
         """
+        if not trusted:
+            data = validate_note(data)
         note = Note(
             title=data["title"],
             content=data["content"],
@@ -77,4 +98,7 @@ class Note:
         )
         note.id = data["id"]
         note.created_at = data["created_at"]
+        note.rev = data.get("rev", 0)
+        note.updated_at = data.get("updated_at")
+        note.attachments = data.get("attachments", [])
         return note
\ No newline at end of file
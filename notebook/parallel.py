@@ -0,0 +1,262 @@
+"""
+Модуль parallel - разбор и фильтрация больших файлов заметок на нескольких ядрах.
+
+Байты файла заметок один раз копируются в разделяемую память
+(multiprocessing.shared_memory), а процессы ProcessPoolExecutor получают
+только имя блока и границы своего куска, поэтому сами данные не
+сериализуются при передаче. Файл делится на куски по границам записей:
+Storage пишет массив с отступом 2, и каждая заметка начинается с
+последовательности RECORD_START (во вложенных объектах отступ больше,
+а переводы строк внутри строк экранированы). Если границ нет - например,
+файл записан без отступов, - он обрабатывается одним куском.
+
+Процессы возвращают только результат своей работы (для фильтрации - только
+подходящие заметки), результаты склеиваются в порядке кусков, то есть в
+порядке заметок в файле. Фильтрация и нечеткий поиск пропускают записи,
+не прошедшие проверку по схеме (см. модуль schema). Маленькие файлы
+обрабатываются в текущем процессе: запуск процессов дороже их разбора.
+
+Вместо bytes можно передать mmap файла: тогда он не читается в память
+процесса целиком, а копируется в разделяемую память частями. Сам блок
+разделяемой памяти занимает столько же, сколько файл, поэтому расход
+памяти здесь пропорционален размеру файла.
+
+Загрузка всего файла здесь не распараллеливается: передача разобранных
+записей обратно в родительский процесс (pickle) дороже самого json.loads.
+Выигрыш есть, только когда результат намного меньше файла.
+"""
+
+import json
+import mmap
+import os
+import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Union
+from .export import matches
+from .models import Note
+from .profiling import stats
+from .schema import validate_records
+from .search import TrigramIndex, DEFAULT_THRESHOLD
+
+RECORD_START = b"\n  {"
+PARALLEL_MIN_BYTES = 4 * 1024 * 1024
+CHUNKS_PER_WORKER = 4
+COPY_CHUNK_SIZE = 4 * 1024 * 1024
+
+Data = Union[bytes, mmap.mmap]
+
+
+def split_records(data: Data, parts: int) -> List[Tuple[int, int]]:
+    """Делит JSON-массив заметок на куски по границам записей.
+
+    Args:
+        data (Data): Содержимое файла заметок (bytes или mmap)
+        parts (int): Желаемое количество кусков
+
+    Returns:
+        List[Tuple[int, int]]: Границы кусков [start, end) в порядке файла
+    """
+    start = data.find(b"[") + 1
+    end = data.rfind(b"]")
+    if start <= 0 or end < start:
+        return []
+    bounds = [start]
+    step = max((end - start) // max(parts, 1), 1)
+    while True:
+        pos = data.find(RECORD_START, bounds[-1] + step, end)
+        if pos < 0:
+            break
+        bounds.append(pos)
+    bounds.append(end)
+    return list(zip(bounds, bounds[1:]))
+
+
+def _parse_chunk(chunk: bytes) -> List[Dict]:
+    """Разбирает кусок массива: записи через запятую без скобок."""
+    chunk = chunk.strip().strip(b",")
+    if not chunk:
+        return []
+    return json.loads(b"[" + chunk + b"]")
+
+
+def _filter_task(records: List[Dict], query: str, pattern: Optional[str], priority: Optional[str],
+                 status: Optional[str], tag: Optional[str]) -> List[Dict]:
+    records, _ = validate_records(records)
+    return [item for item in records
+            if matches(Note.from_dict(item, trusted=True), query, priority, status, tag, pattern)]
+
+
+def _fuzzy_task(records: List[Dict], query: str, threshold: float) -> List[Tuple[int, Dict, float]]:
+    records, _ = validate_records(records)
+    index = TrigramIndex((Note.from_dict(item, trusted=True) for item in records),
+                         threshold=threshold, cache_size=0)
+    positions = {item["id"]: (i, item) for i, item in enumerate(records)}
+    return [(*positions[note.id], score) for note, score in index.fuzzy(query)]
+
+
+_TASKS: Dict[str, Callable] = {
+    "filter": _filter_task,
+    "fuzzy": _fuzzy_task,
+}
+
+
+def _run_chunk(shm_name: str, start: int, end: int, task: str, args: tuple):
+    """Обрабатывает кусок в процессе-исполнителе, читая его из разделяемой памяти."""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        chunk = bytes(shm.buf[start:end])
+    finally:
+        shm.close()
+    return _TASKS[task](_parse_chunk(chunk), *args)
+
+
+class ParallelScanner:
+    """Параллельный разбор и фильтрация файла заметок.
+
+    Attributes:
+        workers (int): Количество процессов
+        min_bytes (int): Файлы меньше этого размера обрабатываются в текущем процессе
+    """
+
+    def __init__(self, workers: Optional[int] = None, min_bytes: int = PARALLEL_MIN_BYTES):
+        """Инициализирует сканер.
+
+        Args:
+            workers (Optional[int], optional): Количество процессов. По умолчанию - число ядер.
+            min_bytes (int, optional): Порог параллельной обработки. Defaults to PARALLEL_MIN_BYTES.
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.min_bytes = min_bytes
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def close(self):
+        """Останавливает процессы-исполнители."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def iter_chunks(self, data: Data, task: str, *args) -> Iterator:
+        """Выполняет задачу над кусками файла и отдает результаты по одному в порядке кусков.
+
+        Результат куска не держится в памяти после того, как его забрали.
+
+        Args:
+            data (Data): Содержимое файла заметок (bytes или mmap)
+            task (str): Имя задачи: filter или fuzzy
+            *args: Аргументы задачи
+
+        Yields:
+            Результат очередного куска
+        """
+        bounds = split_records(data, self.workers * CHUNKS_PER_WORKER)
+        if self.workers <= 1 or len(data) < self.min_bytes or len(bounds) <= 1:
+            for start, end in bounds:
+                yield _TASKS[task](_parse_chunk(data[start:end]), *args)
+            return
+        stats.add("parallel.chunks", len(bounds))
+        shm = shared_memory.SharedMemory(create=True, size=len(data))
+        futures = deque()
+        try:
+            # по частям, чтобы не держать рядом вторую копию файла целиком
+            for pos in range(0, len(data), COPY_CHUNK_SIZE):
+                end = min(pos + COPY_CHUNK_SIZE, len(data))
+                shm.buf[pos:end] = data[pos:end]
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(self.workers)
+            futures.extend(self._executor.submit(_run_chunk, shm.name, start, end, task, args)
+                           for start, end in bounds)
+            while futures:
+                yield futures.popleft().result()
+        finally:
+            for future in futures:
+                future.cancel()
+            shm.close()
+            shm.unlink()
+
+    def map_chunks(self, data: Data, task: str, *args) -> List:
+        """Выполняет задачу над кусками файла и возвращает результаты в порядке кусков.
+
+        Args:
+            data (Data): Содержимое файла заметок (bytes или mmap)
+            task (str): Имя задачи: filter или fuzzy
+            *args: Аргументы задачи
+
+        Returns:
+            List: Результаты кусков в порядке файла
+        """
+        return list(self.iter_chunks(data, task, *args))
+
+    def iter_filter(self, data: Data, query: str = "", pattern: Optional[str] = None,
+                    priority: Optional[str] = None, status: Optional[str] = None,
+                    tag: Optional[str] = None) -> Iterator[Dict]:
+        """Как filter, но отдает заметки по мере обработки кусков, не собирая все совпадения.
+
+        Args:
+            data (Data): Содержимое файла заметок (bytes или mmap)
+            query (str, optional): Текст или #тег (как в поиске приложения). Defaults to "".
+            pattern (Optional[str], optional): Регулярное выражение. Defaults to None.
+            priority (Optional[str], optional): Фильтр по приоритету. Defaults to None.
+            status (Optional[str], optional): Фильтр по статусу. Defaults to None.
+            tag (Optional[str], optional): Фильтр по тегу. Defaults to None.
+
+        Yields:
+            Dict: Подходящая заметка (в порядке файла)
+        """
+        for part in self.iter_chunks(data, "filter", query, pattern, priority, status, tag):
+            yield from part
+
+    def filter(self, data: Data, query: str = "", pattern: Optional[str] = None,
+               priority: Optional[str] = None, status: Optional[str] = None,
+               tag: Optional[str] = None) -> List[Dict]:
+        """Отбирает заметки по фильтрам выгрузки и регулярному выражению.
+
+        Args:
+            data (Data): Содержимое файла заметок (bytes или mmap)
+            query (str, optional): Текст или #тег (как в поиске приложения). Defaults to "".
+            pattern (Optional[str], optional): Регулярное выражение для заголовка,
+                содержимого или тегов. Defaults to None.
+            priority (Optional[str], optional): Фильтр по приоритету. Defaults to None.
+            status (Optional[str], optional): Фильтр по статусу. Defaults to None.
+            tag (Optional[str], optional): Фильтр по тегу. Defaults to None.
+
+        Returns:
+            List[Dict]: Подходящие заметки в порядке файла
+
+        Raises:
+            re.error: Если регулярное выражение некорректно
+        """
+        if pattern:
+            re.compile(pattern)  # ошибка в выражении - до запуска процессов
+        with stats.timer("parallel.filter"):
+            return list(self.iter_filter(data, query, pattern, priority, status, tag))
+
+    def fuzzy(self, data: Data, query: str, threshold: float = DEFAULT_THRESHOLD) -> List[Tuple[Dict, float]]:
+        """Нечеткий поиск по всему файлу без построения общего индекса.
+
+        Порядок совпадает с TrigramIndex.fuzzy: по убыванию похожести,
+        при равной похожести - в порядке файла.
+
+        Args:
+            data (Data): Содержимое файла заметок (bytes или mmap)
+            query (str): Текст или #тег
+            threshold (float, optional): Минимальная похожесть. Defaults to DEFAULT_THRESHOLD.
+
+        Returns:
+            List[Tuple[Dict, float]]: Пары (заметка, похожесть)
+        """
+        with stats.timer("parallel.fuzzy"):
+            parts = self.map_chunks(data, "fuzzy", query, threshold)
+        # сначала порядок файла (кусок, позиция в куске), затем устойчиво по похожести
+        merged = [(chunk, pos, item, score) for chunk, part in enumerate(parts) for pos, item, score in part]
+        merged.sort(key=lambda entry: entry[:2])
+        merged.sort(key=lambda entry: entry[3], reverse=True)
+        return [(item, score) for _, _, item, score in merged]
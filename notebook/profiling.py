@@ -0,0 +1,261 @@
+"""
+Модуль profiling - счетчики, гистограммы времени и захват профиля.
+
+Глобальный объект stats собирает время операций (загрузка, разбор и запись
+хранилища, поиск, обновление таблицы) и счетчики (например, прочитанные
+байты). По умолчанию сбор выключен и timer() возвращает пустой контекст,
+поэтому в обычном режиме накладные расходы минимальны. Режим --debug
+включает сбор, а также позволяет по горячей клавише снять профиль cProfile
+и статистику памяти tracemalloc.
+"""
+
+import io
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List
+
+# Верхние границы корзин гистограммы в миллисекундах
+BUCKETS_MS = (0.1, 0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 5000)
+
+
+class Histogram:
+    """Гистограмма длительностей операции.
+
+    Attributes:
+        count (int): Количество замеров
+        total (float): Суммарное время в секундах
+        min (float): Минимальное время в секундах
+        max (float): Максимальное время в секундах
+        buckets (List[int]): Счетчики по корзинам BUCKETS_MS (+ переполнение)
+    """
+
+    def __init__(self):
+        """Инициализирует пустую гистограмму."""
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+        self.buckets: List[int] = [0] * (len(BUCKETS_MS) + 1)
+
+    def add(self, seconds: float):
+        """Добавляет замер.
+
+        Args:
+            seconds (float): Длительность в секундах
+        """
+        self.count += 1
+        self.total += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+        ms = seconds * 1000
+        for i, bound in enumerate(BUCKETS_MS):
+            if ms <= bound:
+                self.buckets[i] += 1
+                return
+        self.buckets[-1] += 1
+
+    def to_dict(self) -> dict:
+        """Преобразует гистограмму в словарь для выгрузки.
+
+        Returns:
+            dict: Количество, среднее, минимум, максимум (в мс) и корзины
+        """
+        return {
+            "count": self.count,
+            "avg_ms": self.total / self.count * 1000 if self.count else 0.0,
+            "min_ms": self.min * 1000 if self.count else 0.0,
+            "max_ms": self.max * 1000,
+            "buckets_ms": {f"<={b}": n for b, n in zip(BUCKETS_MS, self.buckets) if n},
+            "overflow": self.buckets[-1],
+        }
+
+
+class Stats:
+    """Сборщик статистики и захват профиля.
+
+    Attributes:
+        enabled (bool): Включен ли сбор статистики
+        profile_dir (str): Директория для файлов профиля
+        counters (Dict[str, int]): Счетчики (байты, количество записей и т.п.)
+        timings (Dict[str, Histogram]): Гистограммы длительностей по операциям
+    """
+
+    def __init__(self, enabled: bool = False, profile_dir: str = "."):
+        """Инициализирует сборщик.
+
+        Args:
+            enabled (bool, optional): Включить сбор сразу. Defaults to False.
+            profile_dir (str, optional): Директория для файлов профиля. Defaults to ".".
+        """
+        self.enabled = enabled
+        self.profile_dir = profile_dir
+        self.counters: Dict[str, int] = {}
+        self.timings: Dict[str, Histogram] = {}
+        self._lock = threading.Lock()
+        self._profiler = None
+
+    def record(self, name: str, seconds: float):
+        """Добавляет замер длительности операции.
+
+        Args:
+            name (str): Имя операции, например "storage.load"
+            seconds (float): Длительность в секундах
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            hist = self.timings.get(name)
+            if hist is None:
+                hist = self.timings[name] = Histogram()
+            hist.add(seconds)
+
+    def add(self, name: str, value: int = 1):
+        """Увеличивает счетчик.
+
+        Args:
+            name (str): Имя счетчика, например "storage.load.bytes"
+            value (int, optional): Приращение. Defaults to 1.
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    @contextmanager
+    def _timed(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def timer(self, name: str):
+        """Возвращает контекстный менеджер, замеряющий время блока.
+
+        Args:
+            name (str): Имя операции
+
+        Returns:
+            Контекстный менеджер (пустой, если сбор выключен)
+        """
+        if not self.enabled:
+            return _NULL_TIMER
+        return self._timed(name)
+
+    def reset(self):
+        """Сбрасывает все счетчики и гистограммы."""
+        with self._lock:
+            self.counters.clear()
+            self.timings.clear()
+
+    def snapshot(self) -> dict:
+        """Возвращает текущую статистику в виде словаря.
+
+        Returns:
+            dict: Счетчики и гистограммы
+        """
+        with self._lock:
+            return {
+                "counters": dict(sorted(self.counters.items())),
+                "timings": {name: hist.to_dict() for name, hist in sorted(self.timings.items())},
+            }
+
+    def report(self) -> str:
+        """Формирует текстовый отчет для окна статистики.
+
+        Returns:
+            str: Таблица операций и счетчиков
+        """
+        data = self.snapshot()
+        lines = [f"{'операция':<28}{'кол-во':>8}{'сред, мс':>11}{'мин':>9}{'макс':>9}"]
+        for name, hist in data["timings"].items():
+            lines.append(f"{name:<28}{hist['count']:>8}{hist['avg_ms']:>11.2f}"
+                         f"{hist['min_ms']:>9.2f}{hist['max_ms']:>9.2f}")
+        if data["counters"]:
+            lines.append("")
+            for name, value in data["counters"].items():
+                lines.append(f"{name:<28}{value:>12}")
+        return "\n".join(lines)
+
+    def dump(self, path: str) -> bool:
+        """Сохраняет статистику в JSON-файл.
+
+        Args:
+            path (str): Путь к файлу
+
+        Returns:
+            bool: True если сохранение успешно, иначе False
+        """
+        try:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(self.snapshot(), f, ensure_ascii=False, indent=2)
+            return True
+        except (PermissionError, OSError) as e:
+            print(f"Ошибка при записи статистики: {e}")
+            return False
+
+    @property
+    def profiling(self) -> bool:
+        """Идет ли сейчас захват профиля."""
+        return self._profiler is not None
+
+    def start_profile(self):
+        """Начинает захват профиля cProfile и трассировку памяти tracemalloc."""
+        if self._profiler is not None:
+            return
+        import cProfile  # профилировщики нужны только в отладке
+        import tracemalloc
+        tracemalloc.start()
+        self._profiler = cProfile.Profile()
+        self._profiler.enable()
+
+    def stop_profile(self, top: int = 20) -> str:
+        """Останавливает захват профиля и сохраняет его в profile_dir.
+
+        Файл .prof можно открыть через pstats или snakeviz, рядом сохраняется
+        текстовая сводка с самыми затратными функциями и местами выделения памяти.
+
+        Args:
+            top (int, optional): Количество строк в сводке. Defaults to 20.
+
+        Returns:
+            str: Путь к текстовой сводке (пустая строка, если захват не шел)
+        """
+        if self._profiler is None:
+            return ""
+        import pstats
+        import tracemalloc
+        self._profiler.disable()
+        snapshot = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        profiler, self._profiler = self._profiler, None
+
+        base = os.path.join(self.profile_dir, datetime.now().strftime("profile-%Y%m%d-%H%M%S"))
+        profiler.dump_stats(base + ".prof")
+        out = io.StringIO()
+        pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(top)
+        out.write("\nВыделение памяти (tracemalloc):\n")
+        for stat in snapshot.statistics("lineno")[:top]:
+            out.write(f"{stat}\n")
+        with open(base + ".txt", 'w', encoding='utf-8') as f:
+            f.write(out.getvalue())
+        return base + ".txt"
+
+
+class _NullTimer:
+    """Пустой контекстный менеджер для выключенной статистики."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+stats = Stats()
@@ -0,0 +1,206 @@
+"""
+Модуль schema - проверка и нормализация заметок, прочитанных с диска.
+
+Схема описывает поля заметки: тип, обязательность, допустимые значения,
+формат временных меток. Необязательные поля могут отсутствовать, значения
+по умолчанию для них подставляет Note.from_dict. compile_schema один раз
+превращает описание в функцию проверки, в которой остаются только нужные
+для каждого поля проверки, поэтому массовая проверка при загрузке и
+импорте обходится дешево.
+
+Проверка нужна только для данных извне: JSON-файла, который могли
+отредактировать вручную, и импортируемых записей. Данные, которые
+приложение записало само (теплый снимок, зашифрованный файл, история),
+читаются в доверенном режиме без проверки (Note.from_dict(..., trusted=True)).
+"""
+
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from .blobs import DIGEST_PATTERN
+
+PRIORITIES = ("low", "medium", "high")
+STATUSES = ("active", "done", "archived")
+
+ATTACHMENT_SCHEMA: Dict[str, Dict] = {
+    "name": {"type": str, "required": True},
+    "sha256": {"type": str, "required": True, "pattern": DIGEST_PATTERN},
+    "size": {"type": int, "required": True},
+}
+
+NOTE_SCHEMA: Dict[str, Dict] = {
+    "id": {"type": int, "required": True},
+    "title": {"type": str, "required": True},
+    "content": {"type": str, "required": True},
+    "priority": {"type": str, "required": True, "enum": PRIORITIES, "normalize": str.lower},
+    "status": {"type": str, "required": True, "enum": STATUSES, "normalize": str.lower},
+    "tags": {"type": list, "items": str},
+    "created_at": {"type": str, "required": True, "format": "iso"},
+    "rev": {"type": int},
+    "updated_at": {"type": str, "format": "iso", "nullable": True},
+    "attachments": {"type": list, "items": ATTACHMENT_SCHEMA},
+}
+
+_MISSING = object()
+
+
+class ValidationError(ValueError):
+    """Запись не соответствует схеме.
+
+    Attributes:
+        note_id: ID заметки (если его удалось прочитать)
+        field (Optional[str]): Поле с ошибкой
+    """
+
+    def __init__(self, message: str, note_id=None, field: Optional[str] = None):
+        """Инициализирует ошибку.
+
+        Args:
+            message (str): Описание проблемы
+            note_id (optional): ID заметки. Defaults to None.
+            field (Optional[str], optional): Поле с ошибкой. Defaults to None.
+        """
+        prefix = f"Заметка {note_id}: " if note_id is not None else ""
+        super().__init__(prefix + (f"{field}: " if field else "") + message)
+        self.note_id = note_id
+        self.field = field
+
+
+def _type_name(expected: type) -> str:
+    return {int: "целое число", str: "строка", list: "список", dict: "объект"}.get(expected, expected.__name__)
+
+
+def _compile_field(name: str, rule: Dict) -> Callable[[Dict], object]:
+    """Собирает проверку одного поля из тех шагов, которые для него нужны."""
+    expected = rule["type"]
+    nullable = rule.get("nullable", False)
+    steps: List[Callable] = []
+
+    # bool - подкласс int, но в заметке true вместо числа - ошибка
+    if expected is int:
+        def check_type(value):
+            if type(value) is not int:
+                raise ValueError(f"ожидается {_type_name(int)}")
+    else:
+        def check_type(value):
+            if not isinstance(value, expected):
+                raise ValueError(f"ожидается {_type_name(expected)}")
+    steps.append(check_type)
+
+    if isinstance(rule.get("items"), dict):
+        # элементы - объекты со своей схемой (проверяются без нормализации)
+        validate_item = compile_schema(rule["items"])
+
+        def check_items(value):
+            for i, item in enumerate(value):
+                try:
+                    validate_item(item)
+                except ValidationError as e:
+                    raise ValueError(f"элемент {i}: {e}") from None
+        steps.append(check_items)
+    elif "items" in rule:
+        item_type = rule["items"]
+
+        def check_items(value):
+            for item in value:
+                if not isinstance(item, item_type):
+                    raise ValueError(f"элементы должны быть: {_type_name(item_type)}")
+        steps.append(check_items)
+
+    if "pattern" in rule:
+        pattern = rule["pattern"]
+
+        def check_pattern(value):
+            if pattern.fullmatch(value) is None:
+                raise ValueError(f"значение {value!r} не соответствует формату")
+        steps.append(check_pattern)
+
+    if "enum" in rule:
+        allowed = frozenset(rule["enum"])
+        choices = ", ".join(rule["enum"])
+
+        def check_enum(value):
+            if value not in allowed:
+                raise ValueError(f"недопустимое значение {value!r} (допустимо: {choices})")
+        steps.append(check_enum)
+
+    if rule.get("format") == "iso":
+        def check_iso(value):
+            try:
+                datetime.fromisoformat(value)
+            except ValueError:
+                raise ValueError(f"ожидается время в формате ISO, получено {value!r}") from None
+        steps.append(check_iso)
+
+    normalize = rule.get("normalize")
+
+    # возвращает нормализованное значение, если оно отличается от исходного
+    def check(record: Dict):
+        value = original = record.get(name, _MISSING)
+        if value is _MISSING or (value is None and nullable):
+            return _MISSING
+        try:
+            if normalize is not None and isinstance(value, expected):
+                value = normalize(value)
+            for step in steps:
+                step(value)
+        except ValueError as e:
+            raise ValidationError(str(e), record.get("id"), name) from None
+        return _MISSING if value == original else value
+
+    return check
+
+
+def compile_schema(schema: Dict[str, Dict]) -> Callable[[Dict], Dict]:
+    """Компилирует схему в функцию проверки.
+
+    Args:
+        schema (Dict[str, Dict]): Описание полей: type, required, enum, normalize,
+            format ("iso"), pattern (скомпилированное регулярное выражение), items
+            (тип элементов списка или схема для элементов-объектов), nullable
+
+    Returns:
+        Callable[[Dict], Dict]: Функция, возвращающая запись (нормализованную копию,
+            если что-то пришлось исправить) или выбрасывающая ValidationError
+    """
+    required = frozenset(name for name, rule in schema.items() if rule.get("required"))
+    checks = [(name, _compile_field(name, rule)) for name, rule in schema.items()]
+
+    def validate(data: Dict) -> Dict:
+        if not isinstance(data, dict):
+            raise ValidationError("запись должна быть объектом")
+        missing = required.difference(data)
+        if missing:
+            raise ValidationError(f"нет обязательных полей: {', '.join(sorted(missing))}", data.get("id"))
+        record = data
+        for name, check in checks:
+            value = check(data)
+            if value is not _MISSING:
+                if record is data:
+                    record = dict(data)  # исходную запись не меняем, копируем только при исправлении
+                record[name] = value
+        return record
+
+    return validate
+
+
+validate_note = compile_schema(NOTE_SCHEMA)
+
+
+def validate_records(records: Iterable[Dict]) -> Tuple[List[Dict], List[Tuple[Dict, ValidationError]]]:
+    """Проверяет записи пачкой.
+
+    Args:
+        records (Iterable[Dict]): Записи заметок
+
+    Returns:
+        Tuple[List[Dict], List[Tuple[Dict, ValidationError]]]: Нормализованные
+            корректные записи и отклоненные записи с ошибками
+    """
+    valid = []
+    rejected = []
+    for item in records:
+        try:
+            valid.append(validate_note(item))
+        except ValidationError as e:
+            rejected.append((item, e))
+    return valid, rejected
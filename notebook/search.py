@@ -0,0 +1,389 @@
+"""
+Модуль search - поиск заметок: точный по подстроке и нечеткий по триграммам.
+
+Индекс хранит словарь слов из заголовков, содержимого и тегов. Каждое слово
+разбивается на триграммы с дополнением пробелами (как в pg_trgm: "  у", " ур",
+"уро", ...), поэтому запрос с опечаткой "урки" находит слово "уроки".
+Похожесть слов считается по коэффициенту Жаккара над их триграммами,
+а похожесть заметки - как средняя по словам запроса лучшая похожесть.
+
+Точный режим повторяет прежнее поведение поиска: подстрока без учета
+регистра в заголовке, содержимом или тегах. Запрос из одного слова длиной от
+трех символов ищется через словарь: проверяются только слова с самой редкой
+из его триграмм. Короткие запросы проверяются по каждой заметке, остальные -
+через str.find по склеенному тексту всех заметок (он строится при первом
+таком запросе после изменения).
+
+Замеры на корпусе benchmarks (100 000 заметок, 64 тысячи разных слов):
+точный поиск слова - 4 мс, одной буквы - 20 мс; нечеткий поиск слова с
+опечаткой - 10-25 мс, двух слов - 35 мс. Запрос из одной-двух букв в
+нечетком режиме совпадает почти со всеми заметками и занимает 55-65 мс:
+время уходит на сортировку и сборку ста тысяч результатов. Построение
+индекса занимает около 5 с (приложение строит его в фоне при загрузке).
+
+Результаты запросов кэшируются (LRU) с ключом (режим, запрос, поколение
+данных). Поколение увеличивается при каждом изменении индекса, и кэш при этом
+очищается. Если запрос продолжает уже найденный ("раб" -> "рабо"), точный
+поиск фильтрует прошлый результат вместо всей коллекции.
+"""
+
+import re
+from bisect import bisect_right
+from collections import Counter, OrderedDict
+from itertools import chain
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from .models import Note
+from .profiling import stats
+
+DEFAULT_THRESHOLD = 0.3
+DEFAULT_CACHE_SIZE = 64
+_WORD_RE = re.compile(r"\w+")
+_SEPARATOR = "\x00"
+
+
+def normalize_query(query: str) -> str:
+    """Приводит поисковый запрос к виду, в котором он сравнивается с заметками.
+
+    Args:
+        query (str): Текст или #тег из поля поиска
+
+    Returns:
+        str: Запрос в нижнем регистре без ведущих '#'
+    """
+    return query.lower().lstrip('#')
+
+
+def word_trigrams(word: str) -> Set[str]:
+    """Возвращает триграммы слова, дополненного пробелами.
+
+    Args:
+        word (str): Слово в нижнем регистре
+
+    Returns:
+        Set[str]: Множество триграмм
+    """
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _haystack(note: Note) -> str:
+    """Текст заметки для поиска: заголовок, содержимое и теги."""
+    return f"{note.title.lower()}\n{note.content.lower()}\n{' '.join(note.tags)}"
+
+
+class TrigramIndex:
+    """Поисковый индекс заметок.
+
+    Attributes:
+        threshold (float): Минимальная похожесть для нечеткого поиска
+        generation (int): Поколение данных, растет при каждом изменении индекса
+        cache_size (int): Максимальное число запросов в кэше результатов
+    """
+
+    def __init__(self, notes: Iterable[Note] = (), threshold: float = DEFAULT_THRESHOLD,
+                 cache_size: int = DEFAULT_CACHE_SIZE):
+        """Инициализирует индекс.
+
+        Args:
+            notes (Iterable[Note], optional): Заметки для индексации. Defaults to ().
+            threshold (float, optional): Минимальная похожесть. Defaults to DEFAULT_THRESHOLD.
+            cache_size (int, optional): Размер кэша результатов. Defaults to DEFAULT_CACHE_SIZE.
+        """
+        self.threshold = threshold
+        self.generation = 0
+        self.cache_size = cache_size
+        self._cache: OrderedDict = OrderedDict()
+        self._notes: Dict[int, Note] = {}
+        self._texts: Dict[int, str] = {}
+        self._note_words: Dict[int, Set[int]] = {}
+        self._word_ids: Dict[str, int] = {}
+        self._words: List[str] = []
+        self._word_sizes: List[int] = []
+        self._word_notes: List[Set[int]] = []
+        self._gram_words: Dict[str, List[int]] = {}
+        self._blob: Optional[str] = None
+        self._starts: List[int] = []
+        self._order: List[int] = []
+        self._positions: Dict[int, int] = {}
+        self._dirty = False
+        for note in notes:
+            self.add(note)
+
+    def __len__(self) -> int:
+        return len(self._notes)
+
+    def _word_id(self, word: str) -> int:
+        """Возвращает номер слова в словаре, добавляя его при необходимости."""
+        word_id = self._word_ids.get(word)
+        if word_id is None:
+            word_id = len(self._word_sizes)
+            self._word_ids[word] = word_id
+            self._words.append(word)
+            grams = word_trigrams(word)
+            self._word_sizes.append(len(grams))
+            self._word_notes.append(set())
+            for gram in grams:
+                self._gram_words.setdefault(gram, []).append(word_id)
+        return word_id
+
+    def add(self, note: Note):
+        """Добавляет заметку в индекс или обновляет ее.
+
+        Args:
+            note (Note): Заметка с назначенным id
+        """
+        if note.id in self._notes:
+            self.remove(note.id)
+        text = _haystack(note)
+        words = set(_WORD_RE.findall(text))
+        # обычно все слова уже в словаре: ищем их одним проходом, новые добавляем отдельно
+        word_ids = set(map(self._word_ids.get, words))
+        if None in word_ids:
+            word_ids.discard(None)
+            word_ids.update(self._word_id(word) for word in words if word not in self._word_ids)
+        word_notes = self._word_notes
+        for word_id in word_ids:
+            word_notes[word_id].add(note.id)
+        self._notes[note.id] = note
+        self._texts[note.id] = text
+        self._note_words[note.id] = word_ids
+        self._changed()
+
+    def remove(self, note_id: int) -> bool:
+        """Удаляет заметку из индекса.
+
+        Args:
+            note_id (int): ID заметки
+
+        Returns:
+            bool: True если заметка была в индексе
+        """
+        if note_id not in self._notes:
+            return False
+        for word_id in self._note_words.pop(note_id):
+            self._word_notes[word_id].discard(note_id)
+        del self._notes[note_id]
+        del self._texts[note_id]
+        self._changed()
+        return True
+
+    def _changed(self):
+        """Отмечает изменение данных: новое поколение и пустой кэш."""
+        self._dirty = True
+        self.generation += 1
+        self._cache.clear()
+
+    def _cache_get(self, mode: str, search: str):
+        """Возвращает результат из кэша и поднимает его в начало очереди LRU."""
+        key = (mode, search, self.generation)
+        result = self._cache.get(key)
+        if result is not None:
+            self._cache.move_to_end(key)
+            stats.add("search.cache.hit")
+        return result
+
+    def _cache_put(self, mode: str, search: str, result):
+        """Кладет результат в кэш, вытесняя самый старый при переполнении."""
+        if self.cache_size <= 0:
+            return
+        stats.add("search.cache.miss")
+        self._cache[(mode, search, self.generation)] = result
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def notes(self) -> List[Note]:
+        """Возвращает все заметки индекса в порядке добавления.
+
+        Returns:
+            List[Note]: Список заметок
+        """
+        return list(self._notes.values())
+
+    def _rebuild_order(self):
+        """Запоминает порядок добавления заметок для сортировки результатов."""
+        self._order = list(self._texts)
+        self._positions = {note_id: i for i, note_id in enumerate(self._order)}
+        self._blob = None  # склеивается заново, только когда понадобится
+        self._dirty = False
+
+    def _rebuild_blob(self):
+        """Склеивает тексты заметок в одну строку для точного поиска."""
+        texts = [self._texts[note_id] for note_id in self._order]
+        starts = []
+        pos = 0
+        for text in texts:
+            starts.append(pos)
+            pos += len(text) + 1
+        self._blob = _SEPARATOR.join(texts)
+        self._starts = starts
+
+    def _exact_ids(self, search: str) -> List[int]:
+        """Возвращает id заметок, содержащих подстроку, в порядке добавления.
+
+        Сначала смотрит в кэш, затем пробует сузить результат самого длинного
+        закэшированного префикса запроса и только потом сканирует все заметки.
+        """
+        found = self._cache_get("exact", search)
+        if found is None:
+            for end in range(len(search) - 1, 0, -1):
+                base = self._cache_get("exact", search[:end])
+                if base is not None:
+                    texts = self._texts
+                    found = [note_id for note_id in base if search in texts[note_id]]
+                    break
+            else:
+                if len(search) >= 3 and _WORD_RE.fullmatch(search):
+                    found = self._word_scan(search)
+                else:
+                    found = self._scan(search)
+            self._cache_put("exact", search, found)
+        return found
+
+    def _word_scan(self, search: str) -> List[int]:
+        """Ищет подстроку из букв и цифр через словарь.
+
+        Такая подстрока целиком лежит внутри одного слова заметки, поэтому
+        достаточно проверить слова с самой редкой из ее триграмм.
+        """
+        grams = [search[i:i + 3] for i in range(len(search) - 2)]
+        candidates = min((self._gram_words.get(gram, ()) for gram in grams), key=len)
+        words, word_notes = self._words, self._word_notes
+        found = set()
+        for word_id in candidates:
+            if search in words[word_id]:
+                found.update(word_notes[word_id])
+        if self._dirty:
+            self._rebuild_order()
+        return sorted(found, key=self._positions.__getitem__)
+
+    def _scan(self, search: str) -> List[int]:
+        """Ищет подстроку по текстам заметок."""
+        if len(search) < 3:
+            # короткая подстрока есть почти везде: проверка каждой заметки дешевле
+            # поиска следующего вхождения по склеенному тексту
+            return [note_id for note_id, text in self._texts.items() if search in text]
+        if self._dirty:
+            self._rebuild_order()
+        if self._blob is None:
+            self._rebuild_blob()
+        blob, starts, ids = self._blob, self._starts, self._order
+        found = []
+        pos = blob.find(search)
+        while pos != -1:
+            i = bisect_right(starts, pos) - 1
+            found.append(ids[i])
+            # продолжаем со следующей заметки
+            pos = blob.find(search, starts[i + 1]) if i + 1 < len(starts) else -1
+        return found
+
+    def exact(self, query: str) -> List[Note]:
+        """Ищет заметки, содержащие запрос как подстроку.
+
+        Args:
+            query (str): Текст или #тег
+
+        Returns:
+            List[Note]: Найденные заметки в порядке добавления
+        """
+        search = normalize_query(query).replace(_SEPARATOR, "")
+        if not search:
+            return self.notes()
+        notes = self._notes
+        return [notes[note_id] for note_id in self._exact_ids(search)]
+
+    def _similar_words(self, word: str) -> List[Tuple[int, float]]:
+        """Находит слова словаря, похожие на слово запроса.
+
+        Args:
+            word (str): Слово запроса
+
+        Returns:
+            List[Tuple[int, float]]: Пары (номер слова, похожесть) не ниже порога
+        """
+        grams = word_trigrams(word)
+        shared = Counter()
+        shared.update(chain.from_iterable(self._gram_words.get(g, ()) for g in grams))
+        size = len(grams)
+        sizes = self._word_sizes
+        result = []
+        for word_id, common in shared.items():
+            similarity = common / (size + sizes[word_id] - common)
+            if similarity >= self.threshold:
+                result.append((word_id, similarity))
+        return result
+
+    def _fuzzy_ids(self, search: str) -> Tuple[List[int], Dict[int, float]]:
+        """Ранжирует заметки по похожести на нормализованный запрос.
+
+        Args:
+            search (str): Запрос после normalize_query
+
+        Returns:
+            Tuple[List[int], Dict[int, float]]: id по убыванию похожести и сами оценки
+        """
+        cached = self._cache_get("fuzzy", search)
+        if cached is not None:
+            return cached
+        words = _WORD_RE.findall(search)
+        if not words:
+            ids = self._exact_ids(search.replace(_SEPARATOR, ""))
+            return ids, dict.fromkeys(ids, 1.0)
+
+        scores: Dict[int, float] = {}
+        for word in words:
+            # более похожие слова обрабатываются последними и перезаписывают оценку
+            best: Dict[int, float] = {}
+            for word_id, similarity in sorted(self._similar_words(word), key=lambda item: item[1]):
+                best.update(dict.fromkeys(self._word_notes[word_id], similarity))
+            if not scores:
+                scores = best
+            else:
+                for note_id, similarity in best.items():
+                    scores[note_id] = scores.get(note_id, 0.0) + similarity
+        count = len(words)
+        search = search.replace(_SEPARATOR, "")
+        scores.update(dict.fromkeys(self._exact_ids(search), float(count)))
+
+        if count > 1:
+            limit = self.threshold * count
+            scores = {note_id: total / count for note_id, total in scores.items() if total >= limit}
+        if self._dirty:
+            self._rebuild_order()
+        # сначала по порядку добавления, затем устойчивая сортировка по похожести
+        ranked = sorted(scores, key=self._positions.__getitem__)
+        ranked.sort(key=scores.__getitem__, reverse=True)
+        self._cache_put("fuzzy", search, (ranked, scores))
+        return ranked, scores
+
+    def fuzzy(self, query: str) -> List[Tuple[Note, float]]:
+        """Ищет заметки, похожие на запрос, с учетом опечаток.
+
+        Заметки, содержащие запрос как подстроку, получают похожесть 1.0.
+
+        Args:
+            query (str): Текст или #тег
+
+        Returns:
+            List[Tuple[Note, float]]: Пары (заметка, похожесть) по убыванию похожести
+        """
+        ranked, scores = self._fuzzy_ids(normalize_query(query))
+        notes = self._notes
+        return [(notes[note_id], scores[note_id]) for note_id in ranked]
+
+    def search(self, query: str, fuzzy: bool = True) -> List[Note]:
+        """Ищет заметки по запросу.
+
+        Args:
+            query (str): Текст или #тег
+            fuzzy (bool, optional): Нечеткий поиск с ранжированием. Defaults to True.
+
+        Returns:
+            List[Note]: Найденные заметки
+        """
+        if not normalize_query(query):
+            return self.notes()
+        if not fuzzy:
+            return self.exact(query)
+        ranked, _ = self._fuzzy_ids(normalize_query(query))
+        notes = self._notes
+        return [notes[note_id] for note_id in ranked]
@@ -0,0 +1,102 @@
+"""
+Модуль snapshot - теплый кэш разобранного файла заметок.
+
+Разбор большого JSON при запуске занимает заметную часть времени старта.
+Поэтому после чтения или записи файла заметок рядом сохраняется снимок
+разобранных данных в формате marshal, который читается в разы быстрее JSON.
+Снимок действителен, только пока совпадают время изменения и размер
+исходного файла, а также версия формата marshal и интерпретатора.
+"""
+
+import marshal
+import os
+import sys
+from typing import Dict, List, Optional
+
+SNAPSHOT_SUFFIX = ".cache"
+# 2: в снимок попадают только записи, прошедшие проверку по схеме (модуль schema),
+# поэтому Storage читает его без проверки; снимки версии 1 не проверялись
+_FORMAT = 2
+_TAG = (_FORMAT, marshal.version, sys.version_info[:2])
+
+
+def snapshot_path(file_path: str) -> str:
+    """Возвращает путь к снимку для файла заметок.
+
+    Args:
+        file_path (str): Путь к файлу заметок
+
+    Returns:
+        str: Путь к файлу снимка
+    """
+    return file_path + SNAPSHOT_SUFFIX
+
+
+def file_signature(file_path: str) -> Optional[tuple]:
+    """Возвращает подпись файла (mtime_ns, size) или None, если его нет.
+
+    Args:
+        file_path (str): Путь к файлу
+
+    Returns:
+        Optional[tuple]: Время изменения в наносекундах и размер
+    """
+    try:
+        st = os.stat(file_path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def load_snapshot(file_path: str) -> Optional[List[Dict]]:
+    """Читает снимок, если он соответствует текущему файлу заметок.
+
+    Args:
+        file_path (str): Путь к файлу заметок
+
+    Returns:
+        Optional[List[Dict]]: Заметки в виде словарей или None, если снимок устарел
+    """
+    signature = file_signature(file_path)
+    if signature is None:
+        return None
+    try:
+        with open(snapshot_path(file_path), 'rb') as f:
+            tag, saved_signature, data = marshal.loads(f.read())
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    if tag != _TAG or tuple(saved_signature) != signature:
+        return None
+    return data
+
+
+def write_snapshot(file_path: str, data: List[Dict], signature: Optional[tuple] = None) -> bool:
+    """Сохраняет снимок разобранных заметок.
+
+    Подпись нужно снять до чтения файла: если файл успеют изменить
+    между чтением и записью снимка, подписи не совпадут и снимок не будет
+    использован.
+
+    Args:
+        file_path (str): Путь к файлу заметок
+        data (List[Dict]): Заметки в виде словарей
+        signature (Optional[tuple], optional): Подпись файла, из которого получены данные.
+            По умолчанию берется текущая подпись файла.
+
+    Returns:
+        bool: True если снимок записан
+    """
+    if signature is None:
+        signature = file_signature(file_path)
+    if signature is None:
+        return False
+    path = snapshot_path(file_path)
+    try:
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(marshal.dumps((_TAG, signature, data)))
+        os.replace(tmp_path, path)
+        return True
+    except (OSError, ValueError):
+        # снимок — только ускорение, без него все работает
+        return False
@@ -2,14 +2,36 @@
 Модуль storage - работа с хранилищем заметок.
 
 Обеспечивает сохранение и загрузку заметок в формате JSON.
+Каждое сохранение и удаление записывается в историю версий (см. модуль history),
+а разобранные данные кэшируются в теплом снимке (см. модуль snapshot).
+Файлы вложений хранятся отдельно, в BlobStore рядом с файлом заметок
+(см. модуль blobs). Записи из JSON-файла проверяются по схеме (см. модуль schema);
+снимок, зашифрованный файл и история записаны самим приложением и читаются без проверки.
+С паролем файл хранится зашифрованным (см. модуль crypto); в этом режиме
+история и снимок отключены, чтобы не оставлять на диске открытый текст,
+а оставшиеся от открытого файла снимок и история удаляются при первой
+зашифрованной записи. Зашифрованный файл без пароля не открывается.
 """
 
 import json
 import os
-from typing import List, Dict
+import shutil
+import sys
+import threading
+from datetime import datetime
+from typing import List, Dict, Iterator, Optional
 from .models import Note
+from .schema import ValidationError, validate_records
+from .profiling import stats
+from .history import History, DEFAULT_MAX_REVISIONS, DEFAULT_MAX_BYTES
+from .snapshot import load_snapshot, write_snapshot, file_signature, snapshot_path
+from .crypto import EncryptedFile, is_encrypted
+from .blobs import BlobStore, blob_directory, attachment_digests
 
 NOTES_FILE = "notes.json"
+READ_CHUNK_SIZE = 64 * 1024
+REJECTED_SUFFIX = ".rejected.json"
+HISTORY_SUFFIX = ".history"
 
 
 class Storage:
@@ -17,15 +39,62 @@ class Storage:
 
     Attributes:
         file_path (str): Путь к файлу с заметками
+        generation (int): Поколение данных, растет при каждой успешной записи
+        versions (Optional[History]): История версий или None, если она отключена
+        use_snapshot (bool): Использовать ли теплый снимок разобранных данных
+        cipher (Optional[EncryptedFile]): Шифрование файла или None для открытого JSON
+        blobs (BlobStore): Хранилище файлов вложений
     """
 
-    def __init__(self, file_path: str = NOTES_FILE):
+    def __init__(self, file_path: str = NOTES_FILE, history_revisions: int = DEFAULT_MAX_REVISIONS,
+                 history_bytes: int = DEFAULT_MAX_BYTES, use_snapshot: bool = True,
+                 password: Optional[str] = None):
         """Инициализирует хранилище.
 
         Args:
             file_path (str, optional): Путь к файлу заметок. Defaults to NOTES_FILE.
+            history_revisions (int, optional): Сколько версий хранить для каждой заметки,
+                0 отключает историю. Defaults to DEFAULT_MAX_REVISIONS.
+            history_bytes (int, optional): Лимит объема истории одной заметки.
+                Defaults to DEFAULT_MAX_BYTES.
+            use_snapshot (bool, optional): Читать и писать теплый снимок. Defaults to True.
+            password (Optional[str], optional): Пароль для шифрования файла. Открытый
+                файл читается как есть и шифруется при первой записи. Defaults to None.
+
+        Raises:
+            ValueError: Если пароль неверный (DecryptionError), не установлен пакет cryptography
+                или файл зашифрован, а пароль не указан
         """
         self.file_path = file_path
+        self.generation = 0
+        self.use_snapshot = use_snapshot
+        # хранилище читают из фонового потока, запись и чтение сериализуются
+        self._lock = threading.RLock()
+        self.cipher: Optional[EncryptedFile] = None
+        self.blobs = BlobStore(blob_directory(file_path))
+        if password is not None:
+            self.cipher = EncryptedFile(file_path, password)
+            self.cipher.verify()
+            self.use_snapshot = False
+            history_revisions = 0
+        else:
+            self._require_plaintext()
+        self.versions: Optional[History] = None
+        if history_revisions > 0:
+            self.versions = History(file_path + HISTORY_SUFFIX, history_revisions, history_bytes)
+
+    def _require_plaintext(self) -> None:
+        """Не дает работать с зашифрованным файлом без пароля.
+
+        Без этой проверки зашифрованный файл читался бы как пустой (ошибка
+        разбора JSON), а следующая запись заменила бы его открытым файлом
+        с одной новой заметкой.
+
+        Raises:
+            ValueError: Если пароль не указан, а файл зашифрован
+        """
+        if self.cipher is None and is_encrypted(self.file_path):
+            raise ValueError(f"Файл {self.file_path} зашифрован, откройте его с паролем (--encrypted)")
 
     def _load_notes(self) -> List[Dict]:
         """Читает заметки из файла.
@@ -36,15 +105,72 @@ class Storage:
         Note:
             Возвращает пустой список, если файл не существует
         """
+        with self._lock:
+            return self._read_notes()
+
+    def _read_notes(self) -> List[Dict]:
+        """Читает заметки из снимка или из JSON-файла (вызывается под блокировкой)."""
         if not os.path.exists(self.file_path):
             return []
+        if self.cipher and is_encrypted(self.file_path):
+            with stats.timer("storage.load"):
+                return self.cipher.read_all()
+        if self.use_snapshot:
+            with stats.timer("storage.snapshot_load"):
+                data = load_snapshot(self.file_path)
+            if data is not None:
+                stats.add("storage.snapshot.hit")
+                return data
+            stats.add("storage.snapshot.miss")
+        self._require_plaintext()
         try:
-            with open(self.file_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except (json.JSONDecodeError, PermissionError) as e:
+            signature = file_signature(self.file_path)
+            with stats.timer("storage.load"):
+                with open(self.file_path, 'rb') as f:
+                    data = f.read()
+            stats.add("storage.load.bytes", len(data))
+            with stats.timer("storage.parse"):
+                notes = json.loads(data.decode('utf-8'))
+            with stats.timer("storage.validate"):
+                notes, rejected = validate_records(notes)
+            if rejected:
+                self._reject(rejected)
+            if self.use_snapshot:
+                write_snapshot(self.file_path, notes, signature)
+            return notes
+        except (json.JSONDecodeError, UnicodeDecodeError, PermissionError) as e:
             print(f"Ошибка при чтении файла: {e}")
             return []
 
+    def _reject(self, rejected: List) -> None:
+        """Сообщает о некорректных записях и откладывает их в файл <file>.rejected.json.
+
+        Отклоненные записи не попадают в хранилище и пропали бы при следующей
+        записи файла, поэтому они сохраняются отдельно для ручного исправления.
+
+        Args:
+            rejected (List): Пары (запись, ValidationError) из validate_records
+        """
+        stats.add("storage.rejected", len(rejected))
+        for _, error in rejected:
+            print(f"Пропущена некорректная заметка: {error}", file=sys.stderr)
+        path = self.file_path + REJECTED_SUFFIX
+        try:
+            kept = []
+            if os.path.exists(path):
+                with open(path, 'r', encoding='utf-8') as f:
+                    kept = json.load(f)
+            known = {json.dumps(item, ensure_ascii=False, sort_keys=True) for item in kept}
+            for item, _ in rejected:
+                key = json.dumps(item, ensure_ascii=False, sort_keys=True)
+                if key not in known:
+                    known.add(key)
+                    kept.append(item)
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(kept, f, ensure_ascii=False, indent=2)
+        except (json.JSONDecodeError, PermissionError, OSError) as e:
+            print(f"Ошибка при сохранении отклоненных заметок: {e}")
+
     def _save_notes(self, notes: List[Dict]) -> bool:
         """Сохраняет заметки в файл.
 
@@ -54,14 +180,150 @@ class Storage:
         Returns:
             bool: True если сохранение успешно, иначе False
         """
+        if self.cipher is None and is_encrypted(self.file_path):
+            print(f"Файл {self.file_path} зашифрован, запись без пароля отменена")
+            return False
         try:
-            with open(self.file_path, 'w', encoding='utf-8') as f:
-                json.dump(notes, f, ensure_ascii=False, indent=2)
+            with stats.timer("storage.save"):
+                if self.cipher:
+                    size = self.cipher.write(notes)
+                    self._remove_plaintext_copies()
+                else:
+                    data = json.dumps(notes, ensure_ascii=False, indent=2).encode('utf-8')
+                    # запись прерванная на середине (например, при выходе) не должна обрезать файл
+                    tmp_path = self.file_path + ".tmp"
+                    with open(tmp_path, 'wb') as f:
+                        f.write(data)
+                    os.replace(tmp_path, self.file_path)
+                    size = len(data)
+            stats.add("storage.save.bytes", size)
+            self.generation += 1
+            if self.use_snapshot:
+                write_snapshot(self.file_path, notes)
             return True
         except (PermissionError, OSError) as e:
             print(f"Ошибка при записи в файл: {e}")
             return False
 
+    def _remove_plaintext_copies(self) -> None:
+        """Удаляет снимок и историю, оставшиеся от открытого файла после его шифрования."""
+        try:
+            path = snapshot_path(self.file_path)
+            if os.path.exists(path):
+                os.remove(path)
+            if os.path.isdir(self.file_path + HISTORY_SUFFIX):
+                shutil.rmtree(self.file_path + HISTORY_SUFFIX)
+        except OSError as e:
+            print(f"Не удалось удалить открытые копии заметок: {e}")
+        if os.path.exists(self.file_path + REJECTED_SUFFIX):
+            print(f"Отклоненные заметки остались в открытом виде: {self.file_path + REJECTED_SUFFIX}")
+
+    def _iter_records(self, chunk_size: int = READ_CHUNK_SIZE) -> Iterator[Dict]:
+        """Потоково читает заметки из файла, не загружая его целиком.
+
+        Файл читается кусками по chunk_size символов, а элементы JSON-массива
+        разбираются по одному через JSONDecoder.raw_decode.
+
+        Ошибка чтения не печатается, а выбрасывается: к этому моменту часть
+        записей уже отдана, и вызывающий код должен узнать, что их не все.
+
+        Args:
+            chunk_size (int, optional): Размер читаемого куска. Defaults to READ_CHUNK_SIZE.
+
+        Yields:
+            Dict: Очередная заметка в виде словаря
+
+        Raises:
+            ValueError: Если файл поврежден, обрезан или не читается
+        """
+        if not os.path.exists(self.file_path):
+            return
+        if self.cipher and is_encrypted(self.file_path):
+            # зашифрованный файл и так расшифровывается по одной записи
+            yield from self.cipher.iter_records()
+            return
+        self._require_plaintext()
+        decoder = json.JSONDecoder()
+        try:
+            with open(self.file_path, 'r', encoding='utf-8') as f:
+                buf = ""
+                pos = 0
+                eof = False
+                started = False
+                while True:
+                    # пропускаем пробелы и разделители между элементами
+                    while pos < len(buf) and (buf[pos].isspace() or (started and buf[pos] == ',')):
+                        pos += 1
+                    if pos >= len(buf):
+                        if eof:
+                            if started:
+                                raise json.JSONDecodeError("Незавершенный массив", buf, pos)
+                            return
+                        buf = f.read(chunk_size)
+                        pos = 0
+                        eof = not buf
+                        continue
+                    if not started:
+                        if buf[pos] != '[':
+                            raise json.JSONDecodeError("Ожидался массив", buf, pos)
+                        started = True
+                        pos += 1
+                        continue
+                    if buf[pos] == ']':
+                        return
+                    try:
+                        item, end = decoder.raw_decode(buf, pos)
+                    except json.JSONDecodeError:
+                        if eof:
+                            raise
+                        # элемент не поместился в буфер — дочитываем
+                        chunk = f.read(chunk_size)
+                        eof = not chunk
+                        buf = buf[pos:] + chunk
+                        pos = 0
+                        continue
+                    pos = end
+                    yield item
+        except (json.JSONDecodeError, UnicodeDecodeError, PermissionError) as e:
+            raise ValueError(f"Ошибка при чтении файла: {e}") from None
+
+    def iter_notes(self) -> Iterator[Note]:
+        """Возвращает итератор по заметкам с постоянным расходом памяти.
+
+        Сообщения о пропущенных записях идут в stderr: stdout может быть
+        потоком выгрузки (см. модуль export).
+
+        Yields:
+            Note: Очередной объект заметки
+
+        Raises:
+            ValueError: Если файл поврежден, обрезан или не читается
+        """
+        for item in self._iter_records():
+            try:
+                yield Note.from_dict(item)
+            except ValidationError as e:
+                stats.add("storage.rejected")
+                print(f"Пропущена некорректная заметка: {e}", file=sys.stderr)
+
+    def get(self, note_id: int) -> Optional[Note]:
+        """Возвращает заметку по ID.
+
+        Зашифрованное хранилище читает только нужную запись по оглавлению файла.
+
+        Args:
+            note_id (int): ID заметки
+
+        Returns:
+            Optional[Note]: Заметка или None, если ее нет
+        """
+        with self._lock:
+            if self.cipher and is_encrypted(self.file_path):
+                item = self.cipher.get(note_id)
+                return Note.from_dict(item, trusted=True) if item is not None else None
+            item = next((item for item in self._read_notes() if item["id"] == note_id), None)
+        return Note.from_dict(item, trusted=True) if item is not None else None
+
     def get_all(self) -> List[Note]:
         """Возвращает все заметки как объекты Note.
 
@@ -71,7 +333,7 @@ class Storage:
         data = self._load_notes()
         notes = []
         for item in data:
-            note = Note.from_dict(item)
+            note = Note.from_dict(item, trusted=True)  # _read_notes уже проверил записи
             notes.append(note)
         return notes
 
@@ -84,28 +346,247 @@ class Storage:
         Returns:
             bool: True если сохранение успешно, иначе False
         """
+        with self._lock:
+            return self._save(note)
+
+    def _save(self, note: Note) -> bool:
+        """Сохраняет заметку (вызывается под блокировкой)."""
         notes = self.get_all()
         if note.id is None:
-            # Новая заметка — назначаем ID
-            note.id = max([n.id for n in notes] + [0]) + 1
+            # Новая заметка — назначаем ID (не занятый и удаленными заметками из истории)
+            last_id = max([n.id for n in notes] + [self.versions.max_id() if self.versions else 0])
+            note.id = last_id + 1
             notes.append(note)
         else:
             # Обновляем существующую
+            stored = next((n for n in notes if n.id == note.id), None)
+            if stored is not None:
+                note.rev = max(note.rev, stored.rev)
+                if self.versions:
+                    self.versions.record_base(stored.to_dict())
+            elif self.versions:
+                # восстановление удаленной заметки должно быть новее ее удаления
+                tombstone = self.versions.tombstone(note.id)
+                if tombstone is not None:
+                    note.rev = max(note.rev, tombstone.get("rev", 0))
             notes = [n for n in notes if n.id != note.id]
             notes.append(note)
-        return self._save_notes([n.to_dict() for n in notes])
+        note.rev += 1
+        note.updated_at = datetime.now().isoformat()
+        if not self._save_notes([n.to_dict() for n in notes]):
+            return False
+        if self.versions:
+            self.versions.record(note.to_dict())
+        return True
 
     def delete(self, note_id: int) -> bool:
         """Удаляет заметку по ID.
 
+        Удаленная заметка остается в истории и может быть восстановлена через restore().
+
         Args:
             note_id (int): ID заметки для удаления
 
         Returns:
             bool: True если удаление успешно, иначе False
         """
+        with self._lock:
+            return self._delete(note_id)
+
+    def _delete(self, note_id: int) -> bool:
+        """Удаляет заметку (вызывается под блокировкой)."""
         notes = self.get_all()
         filtered = [n for n in notes if n.id != note_id]
         if len(filtered) == len(notes):
             return False  # Не найдено
-        return self._save_notes([n.to_dict() for n in filtered])
\ No newline at end of file
+        if not self._save_notes([n.to_dict() for n in filtered]):
+            return False
+        if self.versions:
+            # удаление - тоже изменение: синхронизация узнает о нем по версии в истории
+            removed = next(n for n in notes if n.id == note_id)
+            self.versions.record_base(removed.to_dict())
+            removed.rev += 1
+            removed.updated_at = datetime.now().isoformat()
+            self.versions.record(removed.to_dict(), deleted=True)
+        return True
+
+    def next_id(self) -> int:
+        """Возвращает ID, который получит следующая новая заметка.
+
+        Returns:
+            int: ID больше всех занятых, в том числе удаленными заметками из истории
+        """
+        with self._lock:
+            ids = [item["id"] for item in self._read_notes()]
+            return max(ids + [self.versions.max_id() if self.versions else 0]) + 1
+
+    def renumber(self, note_id: int, new_id: int) -> bool:
+        """Переносит заметку вместе с историей на новый ID.
+
+        В отличие от удаления и повторного сохранения, на прежнем ID не
+        остается надгробия: для синхронизации заметки с этим ID здесь
+        никогда не было. rev и updated_at не меняются.
+
+        Args:
+            note_id (int): Прежний ID заметки
+            new_id (int): Свободный ID (см. next_id)
+
+        Returns:
+            bool: True если заметка или ее история перенесены, иначе False
+        """
+        with self._lock:
+            records = self._read_notes()
+            if any(item["id"] == new_id for item in records) or (
+                    self.versions and self.versions.latest(new_id) is not None):
+                print(f"ID {new_id} уже занят")
+                return False
+            found = any(item["id"] == note_id for item in records)
+            had_history = bool(self.versions and self.versions.latest(note_id) is not None)
+            if not found and not had_history:
+                return False
+            if found:
+                records = [dict(item, id=new_id) if item["id"] == note_id else item for item in records]
+                if not self._save_notes(records):
+                    return False
+            if had_history and not self.versions.renumber(note_id, new_id):
+                return False
+        return True
+
+    def attach(self, note_id: int, path: str) -> Optional[Note]:
+        """Прикрепляет файл к заметке.
+
+        Файл потоково копируется в хранилище вложений (одинаковые файлы
+        хранятся один раз), в заметку добавляется только его описание.
+
+        Args:
+            note_id (int): ID заметки
+            path (str): Путь к прикрепляемому файлу
+
+        Returns:
+            Optional[Note]: Сохраненная заметка или None при ошибке
+        """
+        if self.cipher:
+            print("Вложения не поддерживаются в зашифрованном хранилище")
+            return None
+        with self._lock:
+            note = self.get(note_id)
+            if note is None:
+                return None
+            try:
+                with stats.timer("storage.attach"):
+                    attachment = self.blobs.put_file(path)
+            except (PermissionError, OSError) as e:
+                print(f"Ошибка при чтении вложения: {e}")
+                return None
+            stats.add("storage.attach.bytes", attachment["size"])
+            note.attachments = note.attachments + [attachment]
+            return note if self._save(note) else None
+
+    def detach(self, note_id: int, digest: str) -> Optional[Note]:
+        """Открепляет вложение от заметки.
+
+        Файл остается в хранилище вложений, пока на него ссылается история,
+        и удаляется сборкой мусора после этого.
+
+        Args:
+            note_id (int): ID заметки
+            digest (str): Хэш вложения
+
+        Returns:
+            Optional[Note]: Сохраненная заметка или None, если вложения нет
+        """
+        with self._lock:
+            note = self.get(note_id)
+            if note is None:
+                return None
+            remaining = [a for a in note.attachments if a["sha256"] != digest]
+            if len(remaining) == len(note.attachments):
+                return None
+            note.attachments = remaining
+            return note if self._save(note) else None
+
+    def collect_garbage(self) -> Dict[str, int]:
+        """Удаляет файлы вложений, на которые не ссылается ни заметка, ни история.
+
+        Ссылки собираются без блокировки хранилища: на большом хранилище
+        чтение файла и всей истории занимает заметное время, и сохранение из
+        интерфейса не должно его ждать. Файлы удаляются под блокировкой и
+        только если с момента чтения хранилище никто не изменил.
+
+        Returns:
+            Dict[str, int]: Количество удаленных файлов и освобожденных байт
+
+        Raises:
+            ValueError: Если файл заметок поврежден (тогда ничего не удаляется)
+        """
+        generation = self.generation
+        signature = file_signature(self.file_path)
+        referenced = set()
+        for item in self._iter_records():
+            if isinstance(item, dict):
+                referenced.update(attachment_digests(item))
+        if self.versions:
+            referenced |= self.versions.attachment_digests()
+        with self._lock:
+            if self.generation != generation or file_signature(self.file_path) != signature:
+                return {"removed": 0, "bytes": 0}  # хранилище изменилось, соберем в следующий раз
+            return self.blobs.collect_garbage(referenced)
+
+    def checkpoint(self, note_id: int) -> Optional[int]:
+        """Возвращает номер текущей версии заметки, при необходимости записав исходную.
+
+        Вызывается перед изменением, которое нужно уметь отменить: у заметки
+        без истории сначала появляется версия с ее текущим состоянием.
+
+        Args:
+            note_id (int): ID заметки
+
+        Returns:
+            Optional[int]: Номер версии или None, если заметки нет или история отключена
+        """
+        if not self.versions:
+            return None
+        with self._lock:
+            latest = self.versions.latest(note_id)
+            if latest is None:
+                note = self.get(note_id)
+                if note is None:
+                    return None
+                self.versions.record_base(note.to_dict())
+                latest = self.versions.latest(note_id)
+        if latest is None or latest["deleted"]:
+            return None
+        return latest["rev"]
+
+    def history(self, note_id: int) -> List[Dict]:
+        """Возвращает историю версий заметки.
+
+        Args:
+            note_id (int): ID заметки
+
+        Returns:
+            List[Dict]: Версии от старой к новой: rev, saved_at, deleted, title
+        """
+        if not self.versions:
+            return []
+        return self.versions.revisions(note_id)
+
+    def restore(self, note_id: int, rev: int) -> bool:
+        """Восстанавливает заметку из указанной версии истории.
+
+        Восстановление само становится новой версией, поэтому его можно отменить.
+        Удаленная заметка восстанавливается с прежним ID.
+
+        Args:
+            note_id (int): ID заметки
+            rev (int): Номер версии
+
+        Returns:
+            bool: True если восстановление успешно, иначе False
+        """
+        if not self.versions:
+            return False
+        data = self.versions.get(note_id, rev)
+        if data is None:
+            return False
+        return self.save(Note.from_dict(data, trusted=True))
@@ -0,0 +1,336 @@
+"""
+Модуль sync - синхронизация двух хранилищ заметок без сервера.
+
+Каждое сохранение увеличивает счетчик rev заметки, удаление остается в
+истории версий как надгробие (tombstone) со своим rev. Состояние хранилища -
+это версия каждой заметки: (rev, updated_at, хэш содержимого).
+
+Чтобы не сравнивать хранилища целиком, ID заметок делятся на корзины по
+BUCKET_SIZE, а хэши корзин собираются в дерево Меркла с ветвлением FANOUT.
+Стороны спускаются от корня только в различающиеся поддеревья, затем
+обмениваются версиями заметок из различающихся корзин (без содержимого) и
+передают в наборе изменений только заметки, версия которых побеждает.
+
+Победитель определяется детерминированно: большая версия по кортежу
+(rev, updated_at, хэш), поэтому обе стороны приходят к одному результату.
+Проигравшая версия остается в истории версий принимающей стороны.
+Недостающие файлы вложений копируются вместе с заметками. Принимаемые
+заметки проверяются по схеме (см. модуль schema), некорректные пропускаются.
+Без истории (history_revisions=0) удаления не синхронизируются.
+
+Заметки сопоставляются по ID. Каждая машина выдает новым заметкам ID
+max + 1, поэтому заметки, независимо созданные на разных машинах, могут
+получить один ID. Одна и та же заметка на обеих сторонах имеет одинаковое
+время создания (created_at), поэтому записи с одним ID и разным created_at
+считаются разными заметками: перед обменом более поздняя из них переносится
+на свободный на обеих сторонах ID (Storage.renumber), и передаются обе.
+"""
+
+import hashlib
+import json
+from typing import Dict, Iterable, List, Optional, Tuple
+from .blobs import attachment_digests
+from .profiling import stats
+from .schema import ValidationError, validate_note
+from .storage import Storage
+
+BUCKET_SIZE = 64
+FANOUT = 16
+
+Version = Tuple[int, str, str]
+
+
+class Entry:
+    """Версия заметки или надгробия в хранилище.
+
+    Attributes:
+        record (Dict): Заметка в виде словаря
+        deleted (bool): Заметка удалена
+        version (Version): Ключ для выбора победителя: (rev, updated_at, хэш)
+    """
+
+    __slots__ = ("record", "deleted", "version")
+
+    def __init__(self, record: Dict, deleted: bool = False):
+        """Инициализирует запись.
+
+        Args:
+            record (Dict): Заметка в виде словаря
+            deleted (bool, optional): Заметка удалена. Defaults to False.
+        """
+        self.record = record
+        self.deleted = deleted
+        payload = json.dumps([record, deleted], ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+        digest = hashlib.sha256(payload.encode('utf-8')).hexdigest()
+        self.version: Version = (record.get("rev", 0), record.get("updated_at") or "", digest)
+
+
+def collect(storage: Storage) -> Dict[int, Entry]:
+    """Собирает версии всех заметок и надгробий хранилища.
+
+    Args:
+        storage (Storage): Хранилище заметок
+
+    Returns:
+        Dict[int, Entry]: Записи по ID заметки
+    """
+    with storage._lock:
+        entries = {item["id"]: Entry(item) for item in storage._read_notes()}
+        if storage.versions:
+            for note_id in storage.versions.note_ids():
+                if note_id not in entries:
+                    tombstone = storage.versions.tombstone(note_id)
+                    if tombstone is not None:
+                        entries[note_id] = Entry(tombstone, deleted=True)
+    return entries
+
+
+def merkle_tree(entries: Dict[int, Entry], height: int) -> List[Dict[int, str]]:
+    """Строит дерево Меркла по корзинам ID.
+
+    Args:
+        entries (Dict[int, Entry]): Записи хранилища
+        height (int): Количество уровней над корзинами (одинаковое у обеих сторон)
+
+    Returns:
+        List[Dict[int, str]]: Уровни от корзин к корню: {номер узла: хэш}
+    """
+    buckets: Dict[int, List[int]] = {}
+    for note_id in entries:
+        buckets.setdefault(note_id // BUCKET_SIZE, []).append(note_id)
+    level = {}
+    for bucket, ids in buckets.items():
+        h = hashlib.sha256()
+        for note_id in sorted(ids):
+            h.update(f"{note_id}:{entries[note_id].version[2]}\n".encode())
+        level[bucket] = h.hexdigest()
+    levels = [level]
+    for _ in range(height):
+        children: Dict[int, List[Tuple[int, str]]] = {}
+        for node, digest in level.items():
+            children.setdefault(node // FANOUT, []).append((node, digest))
+        level = {}
+        for parent, nodes in children.items():
+            h = hashlib.sha256()
+            for node, digest in sorted(nodes):
+                h.update(f"{node}:{digest}\n".encode())
+            level[parent] = h.hexdigest()
+        levels.append(level)
+    return levels
+
+
+def tree_height(*entry_maps: Dict[int, Entry]) -> int:
+    """Возвращает высоту дерева, при которой все ID помещаются под одним корнем.
+
+    Args:
+        *entry_maps (Dict[int, Entry]): Записи сторон синхронизации
+
+    Returns:
+        int: Количество уровней над корзинами
+    """
+    max_bucket = max((max(entries, default=0) for entries in entry_maps), default=0) // BUCKET_SIZE
+    height = 0
+    while max_bucket > 0:
+        max_bucket //= FANOUT
+        height += 1
+    return height
+
+
+def changed_buckets(local: List[Dict[int, str]], remote: List[Dict[int, str]]) -> List[int]:
+    """Находит корзины, хэши которых различаются, спускаясь от корня.
+
+    Args:
+        local (List[Dict[int, str]]): Дерево одной стороны
+        remote (List[Dict[int, str]]): Дерево другой стороны той же высоты
+
+    Returns:
+        List[int]: Номера различающихся корзин
+    """
+    nodes = [0]
+    for depth in range(len(local) - 1, -1, -1):
+        level_local, level_remote = local[depth], remote[depth]
+        nodes = [node for node in nodes if level_local.get(node) != level_remote.get(node)]
+        if depth:
+            nodes = [child for node in nodes for child in range(node * FANOUT, (node + 1) * FANOUT)]
+    return nodes
+
+
+def bucket_versions(entries: Dict[int, Entry], buckets: Iterable[int]) -> Dict[int, Version]:
+    """Возвращает версии заметок из указанных корзин (без содержимого).
+
+    Args:
+        entries (Dict[int, Entry]): Записи хранилища
+        buckets (Iterable[int]): Номера корзин
+
+    Returns:
+        Dict[int, Version]: Версии по ID заметки
+    """
+    wanted = set(buckets)
+    return {note_id: entry.version for note_id, entry in entries.items() if note_id // BUCKET_SIZE in wanted}
+
+
+def winning_ids(local: Dict[int, Version], remote: Dict[int, Version]) -> List[int]:
+    """Выбирает заметки, локальная версия которых должна уйти на другую сторону.
+
+    Args:
+        local (Dict[int, Version]): Версии этой стороны
+        remote (Dict[int, Version]): Версии другой стороны
+
+    Returns:
+        List[int]: ID заметок для передачи
+    """
+    return sorted(note_id for note_id, version in local.items()
+                  if note_id not in remote or version > remote[note_id])
+
+
+def split_id_conflicts(local: Storage, remote: Storage, local_entries: Dict[int, Entry],
+                       remote_entries: Dict[int, Entry], buckets: Iterable[int]) -> int:
+    """Разводит по разным ID независимо созданные заметки с одинаковым ID.
+
+    Проверяются только различающиеся корзины: в совпадающих корзинах записи
+    одинаковы. Новый ID получает заметка, созданная позже (при равном времени -
+    с большим хэшем), на той стороне, где она лежит.
+
+    Args:
+        local (Storage): Первое хранилище
+        remote (Storage): Второе хранилище
+        local_entries (Dict[int, Entry]): Записи первого хранилища
+        remote_entries (Dict[int, Entry]): Записи второго хранилища
+        buckets (Iterable[int]): Различающиеся корзины
+
+    Returns:
+        int: Количество перенесенных заметок
+    """
+    wanted = set(buckets)
+    conflicts = sorted(note_id for note_id, entry in local_entries.items()
+                       if note_id // BUCKET_SIZE in wanted and note_id in remote_entries
+                       and entry.record.get("created_at") != remote_entries[note_id].record.get("created_at"))
+    if not conflicts:
+        return 0
+    next_id = max(local.next_id(), remote.next_id(), max(local_entries) + 1, max(remote_entries) + 1)
+    moved = 0
+    for note_id in conflicts:
+        ours, theirs = local_entries[note_id], remote_entries[note_id]
+        later = remote if ((theirs.record.get("created_at") or "", theirs.version[2])
+                           > (ours.record.get("created_at") or "", ours.version[2])) else local
+        if later.renumber(note_id, next_id):
+            next_id += 1
+            moved += 1
+    stats.add("sync.renumbered", moved)
+    return moved
+
+
+def make_changeset(entries: Dict[int, Entry], ids: Iterable[int]) -> List[Dict]:
+    """Формирует набор изменений для передачи.
+
+    Args:
+        entries (Dict[int, Entry]): Записи хранилища
+        ids (Iterable[int]): ID передаваемых заметок
+
+    Returns:
+        List[Dict]: Изменения: {"note": заметка, "deleted": bool}
+    """
+    return [{"note": entries[note_id].record, "deleted": entries[note_id].deleted} for note_id in ids]
+
+
+def apply_changeset(storage: Storage, changeset: List[Dict], source: Optional[Storage] = None) -> int:
+    """Применяет набор изменений одной записью файла.
+
+    Изменение применяется, только если оно новее локальной версии, поэтому
+    повторное или устаревшее применение ничего не портит. rev и updated_at
+    сохраняются как есть, а прежняя локальная версия остается в истории.
+
+    Args:
+        storage (Storage): Хранилище заметок
+        changeset (List[Dict]): Изменения из make_changeset
+        source (Optional[Storage], optional): Хранилище-источник, из которого
+            копируются недостающие файлы вложений. Defaults to None.
+
+    Returns:
+        int: Количество примененных изменений
+    """
+    checked = []
+    for change in changeset:
+        if not change["deleted"]:
+            try:
+                change = {"note": validate_note(change["note"]), "deleted": False}
+            except ValidationError as e:
+                print(f"Пропущена некорректная заметка: {e}")
+                continue
+        checked.append(change)
+    with storage._lock:
+        local = collect(storage)
+        accepted = [change for change in checked
+                    if change["note"]["id"] not in local
+                    or Entry(change["note"], change["deleted"]).version > local[change["note"]["id"]].version]
+        if not accepted:
+            return 0
+        if source is not None:
+            # файлы вложений копируются до записи заметок, которые на них ссылаются
+            for change in accepted:
+                for digest in attachment_digests(change["note"]):
+                    storage.blobs.import_from(source.blobs, digest)
+        notes = {item["id"]: item for item in storage._read_notes()}
+        for change in accepted:
+            note = change["note"]
+            if change["deleted"]:
+                notes.pop(note["id"], None)
+            else:
+                notes[note["id"]] = note
+        if not storage._save_notes(list(notes.values())):
+            return 0
+        if storage.versions:
+            for change in accepted:
+                previous = local.get(change["note"]["id"])
+                if previous is not None and not previous.deleted:
+                    # заметка без истории: сначала ее локальная версия, иначе она потеряется
+                    storage.versions.record_base(previous.record)
+                storage.versions.record(change["note"], deleted=change["deleted"])
+    stats.add("sync.applied", len(accepted))
+    return len(accepted)
+
+
+def sync(local: Storage, remote: Storage) -> Dict[str, int]:
+    """Синхронизирует два хранилища в обе стороны.
+
+    Args:
+        local (Storage): Первое хранилище
+        remote (Storage): Второе хранилище
+
+    Returns:
+        Dict[str, int]: Число различающихся корзин, заметок, перенесенных на новый ID
+            из-за совпадения ID, и переданных заметок в каждую сторону
+    """
+    with stats.timer("sync.total"):
+        renumbered = 0
+        while True:
+            local_entries = collect(local)
+            remote_entries = collect(remote)
+            height = tree_height(local_entries, remote_entries)
+            buckets = changed_buckets(merkle_tree(local_entries, height), merkle_tree(remote_entries, height))
+            moved = split_id_conflicts(local, remote, local_entries, remote_entries, buckets)
+            if not moved:
+                break
+            renumbered += moved  # ID изменились, состояние собирается заново
+        local_versions = bucket_versions(local_entries, buckets)
+        remote_versions = bucket_versions(remote_entries, buckets)
+        sent = apply_changeset(remote, make_changeset(local_entries, winning_ids(local_versions, remote_versions)),
+                               source=local)
+        received = apply_changeset(local, make_changeset(remote_entries, winning_ids(remote_versions, local_versions)),
+                                   source=remote)
+    return {"buckets": len(buckets), "renumbered": renumbered, "sent": sent, "received": received}
+
+
+def root_hash(storage: Storage, height: Optional[int] = None) -> str:
+    """Возвращает корневой хэш хранилища (совпадает у синхронизированных хранилищ).
+
+    Args:
+        storage (Storage): Хранилище заметок
+        height (Optional[int], optional): Высота дерева. По умолчанию минимальная.
+
+    Returns:
+        str: Хэш корня или пустая строка для пустого хранилища
+    """
+    entries = collect(storage)
+    levels = merkle_tree(entries, tree_height(entries) if height is None else height)
+    return levels[-1].get(0, "")
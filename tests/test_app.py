@@ -7,13 +7,14 @@ import sys
 import os
 import tempfile
 import shutil
+import time
 from unittest import mock
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import tkinter as tk
 from notebook import Storage, Note
-from gui.app import NoteApp
+from gui.app import NoteApp, display_row
 
 
 class TestNoteApp(unittest.TestCase):
@@ -129,6 +130,59 @@ class TestNoteApp(unittest.TestCase):
         if notes:  # Если заметка была добавлена
             self.assertEqual(notes[-1].tags, ["тег1", "тег2", "тег3"])
 
+    def test_undo_redo_add(self):
+        """Тест отмены и повтора добавления заметки"""
+        self.app.title_entry.insert(0, "Отменяемая")
+        self.app.content_text.insert("1.0", "Содержание")
+        with mock.patch('tkinter.messagebox.showinfo'):
+            self.app.add_note()
+        self.assertEqual(len(self.app.storage.get_all()), 1)
+
+        self.app.undo()
+        self.assertEqual(self.app.storage.get_all(), [])
+
+        self.app.redo()
+        notes = self.app.storage.get_all()
+        self.assertEqual([n.title for n in notes], ["Отменяемая"])
+
+    def test_undo_shortcut_ignored_in_text_inputs(self):
+        """Тест: Ctrl+Z в поле ввода не отменяет добавление заметки"""
+        self.app.title_entry.insert(0, "Новая")
+        self.app.content_text.insert("1.0", "Содержание")
+        with mock.patch('tkinter.messagebox.showinfo'):
+            self.app.add_note()
+        for widget in (self.app.title_entry, self.app.content_text, self.app.search_entry):
+            self.app.undo(mock.Mock(widget=widget))
+            self.app.redo(mock.Mock(widget=widget))
+        self.assertEqual([n.title for n in self.app.storage.get_all()], ["Новая"])
+        self.app.undo(mock.Mock(widget=self.app.tree))
+        self.assertEqual(self.app.storage.get_all(), [])
+
+    def test_destroy_stops_maintenance(self):
+        """Тест: при закрытии окна поток обслуживания останавливается"""
+        thread = self.app.maintenance._thread
+        self.assertTrue(thread.is_alive())
+        self.root.destroy()
+        self.assertFalse(thread.is_alive())
+        self.assertIsNone(self.app.maintenance._thread)
+
+
+class TestDisplayRow(unittest.TestCase):
+    """Тесты подготовки строк таблицы"""
+
+    def test_display_row(self):
+        """Тест строки таблицы для заметки"""
+        note = Note("Заголовок", "Текст", priority="high", status="done", tags=["дом", "срочно"])
+        note.id = 7
+        note.created_at = "2024-05-01T12:30:00"
+        self.assertEqual(display_row(note),
+                         (7, "Заголовок", "#дом, #срочно", "Высокий", "Готово", "2024-05-01"))
+
+    def test_display_row_without_tags(self):
+        """Тест строки таблицы для заметки без тегов"""
+        note = Note("Заголовок", "Текст")
+        self.assertEqual(display_row(note)[2:5], ("—", "Средний", "В работе"))
+
 
 class TestNoteAppIntegration(unittest.TestCase):
     """Интеграционные тесты для приложения"""
@@ -165,6 +219,24 @@ class TestNoteAppIntegration(unittest.TestCase):
             # Всегда уничтожаем окно
             root.destroy()
 
+    def test_background_load_error_reported(self):
+        """Тест: ошибка фоновой загрузки показывается, а не оставляет окно в загрузке"""
+        root = tk.Tk()
+        root.withdraw()
+        try:
+            with mock.patch.object(Storage, "get_all", side_effect=ValueError("повреждено")), \
+                    mock.patch('tkinter.messagebox.showerror') as showerror:
+                NoteApp(root, storage_file=self.test_file)
+                deadline = time.monotonic() + 5
+                while not showerror.called and time.monotonic() < deadline:
+                    root.update()
+                    time.sleep(0.01)
+            showerror.assert_called_once()
+            self.assertIn("повреждено", showerror.call_args[0][1])
+            self.assertNotIn("загрузка", root.title())
+        finally:
+            root.destroy()
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,183 @@
+"""
+Тесты для модуля blobs.py
+"""
+
+import unittest
+import sys
+import os
+import io
+import tempfile
+import shutil
+import hashlib
+import time
+import threading
+from unittest import mock
+from notebook.blobs import BlobStore, attachment_digests
+from notebook.storage import Storage
+from notebook.sync import sync
+from notebook.models import Note
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class TestBlobStore(unittest.TestCase):
+    """Тесты хранилища вложений"""
+
+    def setUp(self):
+        """Создание временной директории"""
+        self.test_dir = tempfile.mkdtemp()
+        self.blobs = BlobStore(os.path.join(self.test_dir, "notes.json.blobs"))
+
+    def tearDown(self):
+        """Очистка временной директории после тестов"""
+        shutil.rmtree(self.test_dir)
+
+    def test_put_and_read_in_chunks(self):
+        """Тест потоковой записи и чтения кусками"""
+        data = os.urandom(300 * 1024)
+        with mock.patch("notebook.blobs.CHUNK_SIZE", 64 * 1024):
+            info = self.blobs.put(io.BytesIO(data))
+        self.assertEqual(info, {"sha256": hashlib.sha256(data).hexdigest(), "size": len(data)})
+        chunks = list(self.blobs.iter_chunks(info["sha256"], chunk_size=100 * 1024))
+        self.assertEqual(len(chunks), 3)
+        self.assertEqual(b"".join(chunks), data)
+
+    def test_deduplication(self):
+        """Тест: одинаковое содержимое хранится один раз"""
+        first = self.blobs.put(io.BytesIO(b"abc"))
+        second = self.blobs.put(io.BytesIO(b"abc"))
+        self.assertEqual(first, second)
+        self.assertEqual(list(self.blobs.digests()), [first["sha256"]])
+
+    def test_collect_garbage(self):
+        """Тест удаления файлов без ссылок с учетом недавних записей"""
+        keep = self.blobs.put(io.BytesIO(b"keep"))["sha256"]
+        drop = self.blobs.put(io.BytesIO(b"drop"))["sha256"]
+        self.assertEqual(self.blobs.collect_garbage([keep])["removed"], 0)
+        old = time.time() - 7200
+        os.utime(self.blobs.path(drop), (old, old))
+        self.assertEqual(self.blobs.collect_garbage([keep]), {"removed": 1, "bytes": 4})
+        self.assertEqual(list(self.blobs.digests()), [keep])
+
+
+    def test_path_rejects_bad_digest(self):
+        """Тест: хэш из файла заметок не может указывать за пределы хранилища"""
+        for digest in ("../../../../etc/passwd", "A" * 64, "0" * 63, "0" * 63 + "/", None):
+            with self.subTest(digest=digest):
+                with self.assertRaises(ValueError):
+                    self.blobs.path(digest)
+                self.assertFalse(self.blobs.exists(digest))
+        self.assertFalse(self.blobs.copy_to("../notes.json", os.path.join(self.test_dir, "out")))
+        note = {"attachments": [{"name": "x", "sha256": "../../etc/passwd", "size": 1}]}
+        self.assertEqual(list(attachment_digests(note)), [])
+
+class TestStorageAttachments(unittest.TestCase):
+    """Тесты вложений в хранилище"""
+
+    def setUp(self):
+        """Создание временного хранилища и файла для вложения"""
+        self.test_dir = tempfile.mkdtemp()
+        self.storage = Storage(os.path.join(self.test_dir, "notes.json"))
+        self.file = os.path.join(self.test_dir, "photo.png")
+        with open(self.file, 'wb') as f:
+            f.write(b"\x89PNG" + b"0" * 1000)
+
+    def tearDown(self):
+        """Очистка временной директории после тестов"""
+        shutil.rmtree(self.test_dir)
+
+    def age_blobs(self, storage):
+        old = time.time() - 7200
+        for digest in storage.blobs.digests():
+            os.utime(storage.blobs.path(digest), (old, old))
+
+    def test_attach(self):
+        """Тест: в заметке хранится только описание вложения"""
+        self.storage.save(Note("Заметка", "Текст"))
+        note = self.storage.attach(1, self.file)
+        self.assertEqual(note.attachments[0]["name"], "photo.png")
+        self.assertEqual(note.attachments[0]["size"], 1004)
+        with open(self.storage.file_path, encoding='utf-8') as f:
+            self.assertNotIn("0000", f.read())
+        self.assertEqual(self.storage.get(1).attachments, note.attachments)
+        self.assertIsNone(self.storage.attach(42, self.file))
+
+    def test_undo_attach_for_note_without_history(self):
+        """Тест: версия до прикрепления есть и у заметки без истории"""
+        self.storage.save(Note("Заметка", "Текст"))
+        shutil.rmtree(self.storage.versions.directory)
+        before = self.storage.checkpoint(1)
+        self.assertIsNotNone(before)
+        self.storage.attach(1, self.file)
+        self.assertTrue(self.storage.restore(1, before))
+        self.assertEqual(self.storage.get(1).attachments, [])
+
+    def test_attachments_omitted_when_empty(self):
+        """Тест: у заметки без вложений поле не записывается"""
+        self.assertNotIn("attachments", Note("Заметка", "Текст").to_dict())
+
+    def test_gc_keeps_blobs_referenced_by_history(self):
+        """Тест: откреплённый файл живет, пока на него ссылается история"""
+        self.storage.save(Note("Заметка", "Текст"))
+        digest = self.storage.attach(1, self.file).attachments[0]["sha256"]
+        self.storage.detach(1, digest)
+        self.age_blobs(self.storage)
+        self.assertEqual(self.storage.collect_garbage()["removed"], 0)
+        shutil.rmtree(self.storage.versions.directory)
+        self.assertEqual(self.storage.collect_garbage()["removed"], 1)
+        self.assertFalse(self.storage.blobs.exists(digest))
+
+    def test_gc_scan_does_not_block_writes(self):
+        """Тест: пока сборка мусора читает историю, хранилище не заблокировано"""
+        self.storage.save(Note("Заметка", "Текст"))
+        scan = self.storage.versions.attachment_digests
+        acquired = []
+
+        def try_lock():
+            acquired.append(self.storage._lock.acquire(timeout=1))
+            if acquired[-1]:
+                self.storage._lock.release()
+
+        def scan_in_parallel():
+            writer = threading.Thread(target=try_lock)
+            writer.start()
+            writer.join()
+            return scan()
+
+        with mock.patch.object(self.storage.versions, "attachment_digests", side_effect=scan_in_parallel):
+            self.storage.collect_garbage()
+        self.assertEqual(acquired, [True])
+
+    def test_gc_skips_when_store_changes(self):
+        """Тест: файл, на который сослались во время сборки мусора, не удаляется"""
+        self.storage.save(Note("Заметка", "Текст"))
+        digest = self.storage.attach(1, self.file).attachments[0]["sha256"]
+        self.storage.detach(1, digest)
+        shutil.rmtree(self.storage.versions.directory)
+        self.age_blobs(self.storage)
+        scan = self.storage.versions.attachment_digests
+
+        def attach_again():
+            digests = scan()
+            self.storage.attach(1, self.file)
+            self.age_blobs(self.storage)  # защищает не срок давности, а проверка изменений
+            return digests
+
+        with mock.patch.object(self.storage.versions, "attachment_digests", side_effect=attach_again):
+            self.assertEqual(self.storage.collect_garbage(), {"removed": 0, "bytes": 0})
+        self.assertTrue(self.storage.blobs.exists(digest))
+
+    def test_sync_copies_blobs(self):
+        """Тест: синхронизация переносит файлы вложений"""
+        other_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, other_dir)
+        other = Storage(os.path.join(other_dir, "notes.json"))
+        self.storage.save(Note("Заметка", "Текст"))
+        digest = self.storage.attach(1, self.file).attachments[0]["sha256"]
+        sync(self.storage, other)
+        self.assertTrue(other.blobs.exists(digest))
+        self.assertEqual(other.get(1).attachments[0]["sha256"], digest)
+
+
+if __name__ == '__main__':
+    unittest.main()
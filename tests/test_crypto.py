@@ -0,0 +1,208 @@
+"""
+Тесты для модуля crypto.py
+"""
+
+import unittest
+import sys
+import os
+import tempfile
+import shutil
+import json
+import struct
+from unittest import mock
+from notebook.crypto import EncryptedFile, DecryptionError, is_encrypted, derive_key
+from notebook.storage import Storage
+from notebook.models import Note
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    import cryptography  # noqa: F401
+    HAS_CRYPTOGRAPHY = True
+except ImportError:
+    HAS_CRYPTOGRAPHY = False
+
+PASSWORD = "секрет"
+
+
+def make_record(note_id, title="Тест"):
+    return {"id": note_id, "title": title, "content": "Содержание", "priority": "medium",
+            "status": "active", "tags": ["тег"], "created_at": "2024-01-01T00:00:00"}
+
+
+@unittest.skipUnless(HAS_CRYPTOGRAPHY, "пакет cryptography не установлен")
+class TestEncryptedFile(unittest.TestCase):
+    """Тесты формата зашифрованного файла"""
+
+    def setUp(self):
+        """Создание временной директории"""
+        self.test_dir = tempfile.mkdtemp()
+        self.test_file = os.path.join(self.test_dir, "notes.json")
+        self.records = [make_record(i, f"Заметка {i}") for i in range(1, 6)]
+
+    def tearDown(self):
+        """Очистка временной директории после тестов"""
+        shutil.rmtree(self.test_dir)
+
+    def test_roundtrip(self):
+        """Тест записи и потокового чтения"""
+        EncryptedFile(self.test_file, PASSWORD).write(self.records)
+        self.assertTrue(is_encrypted(self.test_file))
+        with open(self.test_file, 'rb') as f:
+            self.assertNotIn("Заметка".encode('utf-8'), f.read())
+        self.assertEqual(EncryptedFile(self.test_file, PASSWORD).read_all(), self.records)
+
+    def test_random_access(self):
+        """Тест чтения одной записи по оглавлению"""
+        encrypted = EncryptedFile(self.test_file, PASSWORD)
+        encrypted.write(self.records)
+        self.assertEqual(encrypted.get(3), self.records[2])
+        self.assertIsNone(encrypted.get(42))
+
+    def test_wrong_password(self):
+        """Тест неверного пароля"""
+        EncryptedFile(self.test_file, PASSWORD).write(self.records)
+        with self.assertRaises(DecryptionError):
+            EncryptedFile(self.test_file, "другой").verify()
+
+    def test_tampering_detected(self):
+        """Тест обнаружения измененной записи"""
+        EncryptedFile(self.test_file, PASSWORD).write(self.records)
+        with open(self.test_file, 'r+b') as f:
+            f.seek(60)
+            byte = f.read(1)
+            f.seek(60)
+            f.write(bytes([byte[0] ^ 1]))
+        with self.assertRaises(DecryptionError):
+            EncryptedFile(self.test_file, PASSWORD).read_all()
+
+    def test_splice_from_older_save_detected(self):
+        """Тест: запись из предыдущей версии файла не принимается"""
+        encrypted = EncryptedFile(self.test_file, PASSWORD)
+        encrypted.write([make_record(1, "amount 100")])
+        with open(self.test_file, 'rb') as f:
+            old = f.read()
+        encrypted.write([make_record(1, "amount 200")])
+        with open(self.test_file, 'rb') as f:
+            new = f.read()
+        start = 43  # заголовок: MAGIC, соль, параметры scrypt, ID записи файла
+        end = start + 4 + struct.unpack(">I", old[start:start + 4])[0]
+        with open(self.test_file, 'wb') as f:
+            f.write(new[:start] + old[start:end] + new[end:])
+        with self.assertRaises(DecryptionError):
+            EncryptedFile(self.test_file, PASSWORD).read_all()
+        with self.assertRaises(DecryptionError):
+            EncryptedFile(self.test_file, PASSWORD).get(1)
+
+    def test_truncated_records_detected(self):
+        """Тест обнаружения обрезанного файла"""
+        encrypted = EncryptedFile(self.test_file, PASSWORD)
+        encrypted.write(self.records)
+        with open(self.test_file, 'rb') as f:
+            data = f.read()
+        with open(self.test_file, 'wb') as f:
+            f.write(data[:-30])
+        with self.assertRaises(DecryptionError):
+            EncryptedFile(self.test_file, PASSWORD).read_all()
+
+    def test_salt_kept_between_writes(self):
+        """Тест: соль сохраняется, поэтому ключ не пересчитывается"""
+        encrypted = EncryptedFile(self.test_file, PASSWORD)
+        encrypted.write(self.records)
+        with open(self.test_file, 'rb') as f:
+            header = f.read(27)
+        derive_key.cache_clear()
+        encrypted.write(self.records[:2])
+        with open(self.test_file, 'rb') as f:
+            self.assertEqual(f.read(27), header)
+        self.assertEqual(derive_key.cache_info().misses, 0)
+
+
+@unittest.skipUnless(HAS_CRYPTOGRAPHY, "пакет cryptography не установлен")
+class TestEncryptedStorage(unittest.TestCase):
+    """Тесты хранилища в зашифрованном режиме"""
+
+    def setUp(self):
+        """Создание временной директории"""
+        self.test_dir = tempfile.mkdtemp()
+        self.test_file = os.path.join(self.test_dir, "notes.json")
+
+    def tearDown(self):
+        """Очистка временной директории после тестов"""
+        shutil.rmtree(self.test_dir)
+
+    def test_save_and_load(self):
+        """Тест сохранения, чтения и удаления"""
+        storage = Storage(self.test_file, password=PASSWORD)
+        storage.save(Note("Первая", "Текст"))
+        storage.save(Note("Вторая", "Текст"))
+        self.assertTrue(is_encrypted(self.test_file))
+        reopened = Storage(self.test_file, password=PASSWORD)
+        self.assertEqual([n.title for n in reopened.get_all()], ["Первая", "Вторая"])
+        self.assertEqual(reopened.get(2).title, "Вторая")
+        self.assertEqual([item["id"] for item in reopened._iter_records()], [1, 2])
+        self.assertTrue(reopened.delete(1))
+        self.assertEqual([n.id for n in reopened.get_all()], [2])
+
+    def test_no_plaintext_side_files(self):
+        """Тест: история и снимок в зашифрованном режиме не пишутся"""
+        storage = Storage(self.test_file, password=PASSWORD)
+        storage.save(Note("Секретная", "Текст"))
+        self.assertIsNone(storage.versions)
+        self.assertEqual(os.listdir(self.test_dir), ["notes.json"])
+
+    def test_wrong_password(self):
+        """Тест открытия хранилища с неверным паролем"""
+        Storage(self.test_file, password=PASSWORD).save(Note("Заметка", "Текст"))
+        with self.assertRaises(ValueError):
+            Storage(self.test_file, password="другой")
+
+    def test_migrates_plaintext(self):
+        """Тест шифрования существующего открытого файла при первой записи"""
+        with open(self.test_file, 'w', encoding='utf-8') as f:
+            json.dump([make_record(1)], f)
+        plain = Storage(self.test_file)
+        note = plain.get(1)
+        note.content = "Открытый текст"
+        plain.save(note)
+        self.assertEqual(sorted(os.listdir(self.test_dir)),
+                         ["notes.json", "notes.json.cache", "notes.json.history"])
+        storage = Storage(self.test_file, password=PASSWORD)
+        self.assertEqual(storage.get(1).content, "Открытый текст")
+        storage.save(Note("Новая", "Текст"))
+        self.assertTrue(is_encrypted(self.test_file))
+        self.assertEqual(len(Storage(self.test_file, password=PASSWORD).get_all()), 2)
+        # снимок и история открытого файла не остаются на диске
+        self.assertEqual(os.listdir(self.test_dir), ["notes.json"])
+
+    def test_open_without_password_refused(self):
+        """Тест: зашифрованный файл без пароля не читается как пустой и не перезаписывается"""
+        storage = Storage(self.test_file, password=PASSWORD)
+        storage.save(Note("Первая", "Текст"))
+        storage.save(Note("Вторая", "Текст"))
+        with open(self.test_file, 'rb') as f:
+            before = f.read()
+        with self.assertRaises(ValueError):
+            Storage(self.test_file)
+        # файл зашифровали уже после открытия хранилища без пароля
+        plain = Storage(os.path.join(self.test_dir, "other.json"))
+        plain.file_path = self.test_file
+        with self.assertRaises(ValueError):
+            plain.get_all()
+        self.assertFalse(plain._save_notes([make_record(3)]))
+        with open(self.test_file, 'rb') as f:
+            self.assertEqual(f.read(), before)
+
+
+class TestMissingDependency(unittest.TestCase):
+    """Тест поведения без пакета cryptography"""
+
+    def test_error_without_cryptography(self):
+        """Тест: без пакета выдается понятная ошибка"""
+        with mock.patch.dict(sys.modules, {"cryptography.exceptions": None}):
+            with self.assertRaises(ValueError):
+                Storage("notes.json", password=PASSWORD)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+"""
+Тесты для модуля export.py
+"""
+
+import unittest
+import sys
+import os
+import tempfile
+import shutil
+import json
+import csv
+import gzip
+from notebook.storage import Storage
+from notebook.models import Note
+from notebook.export import export_notes, resolve_compression, matches
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class TestExport(unittest.TestCase):
+    """Тесты потоковой выгрузки заметок"""
+
+    def setUp(self):
+        """Создание хранилища с тестовыми заметками"""
+        self.test_dir = tempfile.mkdtemp()
+        self.test_file = os.path.join(self.test_dir, "test_notes.json")
+        self.storage = Storage(self.test_file)
+        self.storage.save(Note("Уроки", "Сделать математику", priority="high", tags=["учеба"]))
+        self.storage.save(Note("Покупки", "Молоко, хлеб", status="done", tags=["дом"]))
+        self.storage.save(Note("Работа", "Отчет по урокам", tags=["работа", "учеба"]))
+
+    def tearDown(self):
+        """Очистка временной директории после тестов"""
+        shutil.rmtree(self.test_dir)
+
+    def test_iter_notes_matches_get_all(self):
+        """Тест потокового чтения: результат совпадает с get_all"""
+        streamed = list(self.storage._iter_records(chunk_size=16))
+        self.assertEqual(streamed, [n.to_dict() for n in self.storage.get_all()])
+
+    def test_iter_notes_missing_file(self):
+        """Тест потокового чтения несуществующего файла"""
+        storage = Storage(os.path.join(self.test_dir, "nonexistent.json"))
+        self.assertEqual(list(storage.iter_notes()), [])
+
+    def test_export_ndjson_with_query(self):
+        """Тест выгрузки NDJSON с поисковым запросом"""
+        out = os.path.join(self.test_dir, "out.ndjson")
+        count = export_notes(self.storage, out, fmt="ndjson", query="урок")
+        self.assertEqual(count, 2)
+        with open(out, encoding='utf-8') as f:
+            rows = [json.loads(line) for line in f]
+        self.assertEqual([r["title"] for r in rows], ["Уроки", "Работа"])
+
+    def test_export_csv_gzip(self):
+        """Тест выгрузки CSV со сжатием gzip и фильтром по тегу"""
+        out = os.path.join(self.test_dir, "out.csv.gz")
+        count = export_notes(self.storage, out, fmt="csv", tag="#учеба", compress="gzip", chunk_size=1)
+        self.assertEqual(count, 2)
+        with gzip.open(out, 'rt', encoding='utf-8', newline='') as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[1]["tags"], "работа учеба")
+
+    def test_export_markdown_filters(self):
+        """Тест выгрузки Markdown с фильтром по статусу"""
+        out = os.path.join(self.test_dir, "out.md")
+        count = export_notes(self.storage, out, fmt="md", status="done")
+        self.assertEqual(count, 1)
+        with open(out, encoding='utf-8') as f:
+            text = f.read()
+        self.assertIn("## Покупки", text)
+        self.assertIn("#дом", text)
+
+    def test_invalid_format_and_compression(self):
+        """Тест ошибок при неизвестном формате или сжатии"""
+        out = os.path.join(self.test_dir, "out.txt")
+        with self.assertRaises(ValueError):
+            export_notes(self.storage, out, fmt="xml")
+        with self.assertRaises(ValueError):
+            resolve_compression("bzip2")
+        self.assertIn(resolve_compression("auto"), ("gzip", "zstd"))
+
+    def test_truncated_file_fails_export(self):
+        """Тест: обрезанный файл не выгружается молча наполовину"""
+        with open(self.test_file, 'rb') as f:
+            data = f.read()
+        with open(self.test_file, 'wb') as f:
+            f.write(data[:len(data) // 2])
+        out = os.path.join(self.test_dir, "out.ndjson")
+        with self.assertRaises(ValueError):
+            export_notes(Storage(self.test_file, use_snapshot=False), out)
+
+    def test_matches_like_search(self):
+        """Тест фильтра: поведение как у поиска в приложении"""
+        note = Note("Заголовок", "Текст", tags=["тег"])
+        self.assertTrue(matches(note, "#ТЕГ"))
+        self.assertTrue(matches(note, "загол"))
+        self.assertFalse(matches(note, "нет"))
+        self.assertFalse(matches(note, priority="high"))
+
+
+if __name__ == '__main__':
+    unittest.main()
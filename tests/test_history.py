@@ -0,0 +1,159 @@
+"""
+Тесты для модуля history.py
+"""
+
+import unittest
+import sys
+import os
+import tempfile
+import shutil
+from notebook.history import History, make_delta, apply_delta
+from notebook.storage import Storage
+from notebook.models import Note
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def note_dict(note_id, content, title="Тест"):
+    """Создает словарь заметки для истории"""
+    note = Note(title, content)
+    note.id = note_id
+    return note.to_dict()
+
+
+class TestDelta(unittest.TestCase):
+    """Тесты дельта-сжатия"""
+
+    def test_roundtrip(self):
+        """Тест: применение дельты восстанавливает текст"""
+        base = "первая строка\nвторая строка\nтретья строка"
+        target = "первая строка\nизмененная строка\nтретья строка\nновая"
+        delta = make_delta(base, target)
+        self.assertEqual(apply_delta(base, delta), target)
+        self.assertIn([0, 1], delta)
+
+    def test_empty_texts(self):
+        """Тест дельты для пустых текстов"""
+        self.assertEqual(apply_delta("", make_delta("", "текст")), "текст")
+        self.assertEqual(apply_delta("текст", make_delta("текст", "")), "")
+
+
+class TestHistory(unittest.TestCase):
+    """Тесты для класса History"""
+
+    def setUp(self):
+        """Создание временной директории"""
+        self.test_dir = tempfile.mkdtemp()
+        self.history = History(os.path.join(self.test_dir, "history"))
+
+    def tearDown(self):
+        """Очистка временной директории после тестов"""
+        shutil.rmtree(self.test_dir)
+
+    def test_record_and_get(self):
+        """Тест записи версий и восстановления любой из них"""
+        for i in range(1, 4):
+            self.assertEqual(self.history.record(note_dict(1, f"версия {i}\nобщий хвост")), i)
+        self.assertEqual([r["rev"] for r in self.history.revisions(1)], [1, 2, 3])
+        self.assertEqual(self.history.get(1, 1)["content"], "версия 1\nобщий хвост")
+        self.assertEqual(self.history.get(1, 3)["content"], "версия 3\nобщий хвост")
+        self.assertIsNone(self.history.get(1, 99))
+        self.assertEqual(self.history.revisions(2), [])
+
+    def test_retention_by_count(self):
+        """Тест ограничения количества версий"""
+        history = History(os.path.join(self.test_dir, "limited"), max_revisions=3)
+        for i in range(5):
+            history.record(note_dict(1, f"версия {i}"))
+        self.assertEqual([r["rev"] for r in history.revisions(1)], [3, 4, 5])
+        self.assertEqual(history.get(1, 3)["content"], "версия 2")
+
+    def test_retention_by_size(self):
+        """Тест ограничения объема истории"""
+        history = History(os.path.join(self.test_dir, "small"), max_bytes=2000)
+        for i in range(20):
+            history.record(note_dict(1, f"{i}\n" + "x" * 200))
+        revs = history.revisions(1)
+        self.assertLess(len(revs), 20)
+        self.assertEqual(revs[-1]["rev"], 20)
+        self.assertLessEqual(os.path.getsize(os.path.join(self.test_dir, "small", "1.json")), 2000)
+
+
+class TestStorageHistory(unittest.TestCase):
+    """Тесты истории версий в Storage"""
+
+    def setUp(self):
+        """Создание хранилища во временной директории"""
+        self.test_dir = tempfile.mkdtemp()
+        self.storage = Storage(os.path.join(self.test_dir, "notes.json"))
+
+    def tearDown(self):
+        """Очистка временной директории после тестов"""
+        shutil.rmtree(self.test_dir)
+
+    def test_history_and_restore(self):
+        """Тест истории изменений и восстановления версии"""
+        note = Note("Тест", "Старое содержание")
+        self.storage.save(note)
+        note.content = "Новое содержание"
+        self.storage.save(note)
+
+        self.assertEqual([r["rev"] for r in self.storage.history(note.id)], [1, 2])
+        self.assertTrue(self.storage.restore(note.id, 1))
+        self.assertEqual(self.storage.get_all()[0].content, "Старое содержание")
+        self.assertEqual(len(self.storage.history(note.id)), 3)
+        self.assertFalse(self.storage.restore(note.id, 42))
+
+    def test_restore_deleted_note(self):
+        """Тест восстановления удаленной заметки с прежним ID"""
+        note = Note("Удаляемая", "Содержание")
+        self.storage.save(note)
+        self.storage.delete(note.id)
+        self.assertEqual(self.storage.get_all(), [])
+        self.assertTrue(self.storage.history(note.id)[-1]["deleted"])
+
+        self.assertTrue(self.storage.restore(note.id, 1))
+        notes = self.storage.get_all()
+        self.assertEqual([(n.id, n.title) for n in notes], [(note.id, "Удаляемая")])
+
+    def test_base_revision_for_note_without_history(self):
+        """Тест: у заметки без истории первое изменение сохраняет и исходную версию"""
+        note = Note("Старая", "Исходный текст")
+        self.storage.save(note)
+        shutil.rmtree(self.storage.versions.directory)  # например, заметка старше истории
+        note.content = "Новый текст"
+        self.storage.save(note)
+        self.assertEqual([r["rev"] for r in self.storage.history(note.id)], [1, 2])
+        self.assertTrue(self.storage.restore(note.id, 1))
+        self.assertEqual(self.storage.get(note.id).content, "Исходный текст")
+
+    def test_checkpoint(self):
+        """Тест: checkpoint записывает исходную версию только один раз"""
+        note = Note("Заметка", "Текст")
+        self.storage.save(note)
+        shutil.rmtree(self.storage.versions.directory)
+        self.assertEqual(self.storage.checkpoint(note.id), 1)
+        self.assertEqual(self.storage.checkpoint(note.id), 1)
+        self.assertIsNone(self.storage.checkpoint(42))
+
+    def test_deleted_ids_not_reused(self):
+        """Тест: ID удаленной заметки не выдается новой"""
+        note = Note("Первая", "Содержание")
+        self.storage.save(note)
+        self.storage.delete(note.id)
+        new_note = Note("Вторая", "Содержание")
+        self.storage.save(new_note)
+        self.assertEqual(new_note.id, note.id + 1)
+
+    def test_history_disabled(self):
+        """Тест хранилища без истории"""
+        storage = Storage(os.path.join(self.test_dir, "plain.json"), history_revisions=0)
+        note = Note("Тест", "Содержание")
+        storage.save(note)
+        self.assertEqual(storage.history(note.id), [])
+        self.assertFalse(storage.restore(note.id, 1))
+        self.assertFalse(os.path.exists(os.path.join(self.test_dir, "plain.json.history")))
+
+
+if __name__ == '__main__':
+    unittest.main()
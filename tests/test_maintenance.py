@@ -0,0 +1,142 @@
+"""
+Тесты для модуля maintenance.py
+"""
+
+import unittest
+import sys
+import os
+import tempfile
+import shutil
+import json
+import time
+from notebook.maintenance import MaintenanceScheduler, check_integrity, compact, stale_index_ids
+from notebook.search import TrigramIndex
+from notebook.storage import Storage
+from notebook.models import Note
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def make_record(note_id, title="Тест", priority="medium", status="active"):
+    return {"id": note_id, "title": title, "content": "Содержание", "priority": priority,
+            "status": status, "tags": [], "created_at": "2024-01-01T00:00:00"}
+
+
+class TestMaintenanceTasks(unittest.TestCase):
+    """Тесты задач обслуживания"""
+
+    def setUp(self):
+        """Создание временного хранилища"""
+        self.test_dir = tempfile.mkdtemp()
+        self.test_file = os.path.join(self.test_dir, "notes.json")
+        self.storage = Storage(self.test_file, use_snapshot=False)
+
+    def tearDown(self):
+        """Очистка временной директории после тестов"""
+        shutil.rmtree(self.test_dir)
+
+    def write(self, records):
+        with open(self.test_file, 'w', encoding='utf-8') as f:
+            json.dump(records, f)
+
+    def test_check_integrity(self):
+        """Тест поиска дубликатов и недопустимых значений"""
+        broken = make_record(3)
+        del broken["content"]
+        self.write([make_record(1), make_record(1, "Копия"), make_record(2, priority="urgent", status="?"), broken])
+        issues = check_integrity(self.storage)
+        self.assertEqual(issues["duplicate_ids"], [1])
+        self.assertEqual(issues["bad_priority"], [(2, "urgent")])
+        self.assertEqual(issues["bad_status"], [(2, "?")])
+        self.assertEqual(issues["missing_fields"], [(3, ["content"])])
+
+    def test_check_integrity_clean(self):
+        """Тест проверки исправного хранилища"""
+        self.storage.save(Note("Заметка", "Текст"))
+        self.assertFalse(any(check_integrity(self.storage).values()))
+
+    def test_compact_removes_duplicates(self):
+        """Тест удаления дубликатов: остается последняя запись"""
+        self.write([make_record(1), make_record(2), make_record(1, "Новая")])
+        result = compact(self.storage)
+        self.assertEqual(result["duplicates"], 1)
+        notes = {n.id: n.title for n in self.storage.get_all()}
+        self.assertEqual(notes, {1: "Новая", 2: "Тест"})
+
+    def test_compact_removes_stale_tmp(self):
+        """Тест удаления старых временных файлов хранилища"""
+        self.write([make_record(1)])
+        stale = self.test_file + ".cache.tmp"
+        fresh = self.test_file + ".tmp"
+        foreign = os.path.join(self.test_dir, "other.tmp")
+        for path in (stale, fresh, foreign):
+            open(path, 'w').close()
+        old = time.time() - 3600
+        os.utime(stale, (old, old))
+        os.utime(foreign, (old, old))
+        self.assertEqual(compact(self.storage)["tmp_files"], 1)
+        self.assertFalse(os.path.exists(stale))
+        self.assertTrue(os.path.exists(fresh))
+        self.assertTrue(os.path.exists(foreign))
+
+    def test_stale_index_ids(self):
+        """Тест сверки индекса с хранилищем"""
+        a = Note("Первая", "Текст")
+        a.id = 1
+        b = Note("Вторая", "Текст")
+        b.id = 2
+        index = TrigramIndex([a, b])
+        self.assertEqual(stale_index_ids(index, [a, b]), [])
+        changed = Note("Первая", "Другой текст")
+        changed.id = 1
+        c = Note("Третья", "Текст")
+        c.id = 3
+        self.assertEqual(sorted(stale_index_ids(index, [changed, c])), [1, 2, 3])
+
+
+class TestMaintenanceScheduler(unittest.TestCase):
+    """Тесты планировщика обслуживания"""
+
+    def test_waits_for_idle(self):
+        """Тест: задачи не выполняются, пока пользователь активен"""
+        scheduler = MaintenanceScheduler(idle_after=60)
+        calls = []
+        scheduler.add_task("task", lambda: calls.append(1), interval=0)
+        scheduler.touch()
+        self.assertIsNone(scheduler.run_pending())
+        self.assertEqual(scheduler.run_pending(force=True), "task")
+        self.assertEqual(calls, [1])
+
+    def test_rate_limit(self):
+        """Тест: одна задача за цикл и минимальный интервал между запусками"""
+        scheduler = MaintenanceScheduler(idle_after=0)
+        scheduler.add_task("a", lambda: "a", interval=3600)
+        scheduler.add_task("b", lambda: "b", interval=3600)
+        self.assertEqual(scheduler.run_pending(), "a")
+        self.assertEqual(scheduler.run_pending(), "b")
+        self.assertIsNone(scheduler.run_pending())
+        self.assertEqual(scheduler.status()["a"], {"runs": 1, "last_result": "a"})
+
+    def test_task_error_is_recorded(self):
+        """Тест: ошибка задачи не останавливает планировщик"""
+        scheduler = MaintenanceScheduler(idle_after=0)
+        scheduler.add_task("broken", lambda: 1 / 0, interval=0)
+        self.assertEqual(scheduler.run_pending(), "broken")
+        self.assertIsInstance(scheduler.status()["broken"]["last_result"], ZeroDivisionError)
+
+    def test_background_thread(self):
+        """Тест выполнения задач в фоновом потоке"""
+        scheduler = MaintenanceScheduler(idle_after=0, poll_interval=0.01)
+        scheduler.add_task("task", lambda: "ok", interval=3600)
+        scheduler.start()
+        try:
+            deadline = time.time() + 5
+            while scheduler.status()["task"]["runs"] == 0 and time.time() < deadline:
+                time.sleep(0.01)
+        finally:
+            scheduler.stop()
+        self.assertEqual(scheduler.status()["task"]["runs"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,135 @@
+"""
+Тесты для модуля parallel.py
+"""
+
+import unittest
+import sys
+import os
+import json
+import mmap
+import tempfile
+import shutil
+from notebook.parallel import ParallelScanner, split_records
+from notebook.search import TrigramIndex
+from notebook.export import export_notes
+from notebook.storage import Storage
+from notebook.models import Note
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def make_notes(count):
+    notes = []
+    for i in range(1, count + 1):
+        note = Note(f"Заметка {i}", f"Текст про урок {i}\nвторая строка" if i % 3 else f"Запись {i}",
+                    priority=("low", "medium", "high")[i % 3], tags=["учеба"] if i % 2 else [])
+        note.id = i
+        if i % 5 == 0:
+            note.attachments = [{"name": "a.txt", "sha256": "0" * 64, "size": 1}]
+        notes.append(note.to_dict())
+    return notes
+
+
+class TestParallelScanner(unittest.TestCase):
+    """Тесты параллельного разбора и фильтрации"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Подготовка файла в формате Storage и пула процессов"""
+        cls.records = make_notes(200)
+        cls.data = json.dumps(cls.records, ensure_ascii=False, indent=2).encode('utf-8')
+        cls.scanner = ParallelScanner(workers=2, min_bytes=0)
+
+    @classmethod
+    def tearDownClass(cls):
+        """Остановка пула процессов"""
+        cls.scanner.close()
+
+    def test_split_records(self):
+        """Тест: куски начинаются на границах записей и покрывают массив"""
+        bounds = split_records(self.data, 8)
+        self.assertGreater(len(bounds), 1)
+        for start, end in bounds[1:]:
+            self.assertTrue(self.data[start:].startswith(b"\n  {"))
+        self.assertEqual(bounds[-1][1], self.data.rfind(b"]"))
+
+    def test_filter_keeps_order(self):
+        """Тест: без фильтров результат совпадает с json.loads"""
+        self.assertEqual(self.scanner.filter(self.data), self.records)
+
+    def test_filter_without_indent(self):
+        """Тест: файл без отступов обрабатывается одним куском"""
+        data = json.dumps(self.records, ensure_ascii=False).encode('utf-8')
+        self.assertEqual(self.scanner.filter(data), self.records)
+        self.assertEqual(self.scanner.filter(b"[]"), [])
+
+    def test_filter(self):
+        """Тест фильтрации по тексту, тегу и регулярному выражению"""
+        found = self.scanner.filter(self.data, "урок", priority="high", tag="учеба")
+        expected = [r for r in self.records if "урок" in r["content"] and r["priority"] == "high"
+                    and "учеба" in r["tags"]]
+        self.assertEqual(found, expected)
+        ids = [r["id"] for r in self.scanner.filter(self.data, pattern=r"^Заметка 1\d$")]
+        self.assertEqual(ids, list(range(10, 20)))
+
+    def test_iter_filter_mmap(self):
+        """Тест: файл можно передать через mmap, результат отдается по мере обработки"""
+        path = os.path.join(tempfile.mkdtemp(), "notes.json")
+        self.addCleanup(shutil.rmtree, os.path.dirname(path))
+        with open(path, 'wb') as f:
+            f.write(self.data)
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            found = self.scanner.iter_filter(data, "урок")
+            self.assertEqual(next(found), self.records[0])
+            found.close()  # брошенный генератор освобождает разделяемую память
+            self.assertEqual(self.scanner.filter(data, "урок"), self.scanner.filter(self.data, "урок"))
+
+    def test_fuzzy_matches_index(self):
+        """Тест: нечеткий поиск дает тот же порядок, что и TrigramIndex"""
+        index = TrigramIndex(Note.from_dict(r) for r in self.records)
+        expected = [(note.id, score) for note, score in index.fuzzy("урки")]
+        found = [(item["id"], score) for item, score in self.scanner.fuzzy(self.data, "урки")]
+        self.assertEqual(found, expected)
+
+
+class TestParallelExport(unittest.TestCase):
+    """Тесты параллельной выгрузки"""
+
+    def setUp(self):
+        """Создание временного файла заметок"""
+        self.test_dir = tempfile.mkdtemp()
+        self.test_file = os.path.join(self.test_dir, "notes.json")
+        self.records = make_notes(50)
+        with open(self.test_file, 'w', encoding='utf-8') as f:
+            json.dump(self.records, f, ensure_ascii=False, indent=2)
+
+    def tearDown(self):
+        """Очистка временной директории после тестов"""
+        shutil.rmtree(self.test_dir)
+
+    def test_export_with_workers(self):
+        """Тест: выгрузка с процессами совпадает с обычной"""
+        storage = Storage(self.test_file, use_snapshot=False)
+        outputs = []
+        for workers in (0, 2):
+            path = os.path.join(self.test_dir, f"out{workers}.ndjson")
+            export_notes(storage, path, query="урок", pattern=r"\d5", workers=workers)
+            with open(path, encoding='utf-8') as f:
+                outputs.append(f.read())
+        self.assertTrue(outputs[0])
+        self.assertEqual(outputs[0], outputs[1])
+
+    def test_export_empty_file_with_workers(self):
+        """Тест: пустой файл выгружается и с процессами"""
+        open(self.test_file, 'w').close()
+        path = os.path.join(self.test_dir, "out.ndjson")
+        self.assertEqual(export_notes(Storage(self.test_file, use_snapshot=False), path, workers=2), 0)
+
+    def test_export_bad_regex(self):
+        """Тест: некорректное регулярное выражение"""
+        with self.assertRaises(ValueError):
+            export_notes(Storage(self.test_file), os.path.join(self.test_dir, "out"), pattern="(")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+"""
+Тесты для модуля profiling.py
+"""
+
+import unittest
+import sys
+import os
+import tempfile
+import shutil
+import json
+from notebook.profiling import Stats, Histogram
+from notebook import profiling
+from notebook.storage import Storage
+from notebook.models import Note
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class TestStats(unittest.TestCase):
+    """Тесты для класса Stats"""
+
+    def setUp(self):
+        """Создание временной директории"""
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Очистка временной директории и глобальной статистики"""
+        profiling.stats.enabled = False
+        profiling.stats.reset()
+        shutil.rmtree(self.test_dir)
+
+    def test_disabled_stats_collect_nothing(self):
+        """Тест: выключенная статистика ничего не собирает"""
+        stats = Stats()
+        with stats.timer("op"):
+            pass
+        stats.add("bytes", 10)
+        self.assertEqual(stats.snapshot(), {"counters": {}, "timings": {}})
+
+    def test_timer_and_counters(self):
+        """Тест замеров времени и счетчиков"""
+        stats = Stats(enabled=True)
+        for _ in range(3):
+            with stats.timer("op"):
+                pass
+        stats.add("bytes", 10)
+        stats.add("bytes", 5)
+        data = stats.snapshot()
+        self.assertEqual(data["timings"]["op"]["count"], 3)
+        self.assertEqual(data["counters"]["bytes"], 15)
+        self.assertIn("op", stats.report())
+
+    def test_histogram_buckets(self):
+        """Тест распределения замеров по корзинам"""
+        hist = Histogram()
+        hist.add(0.00005)
+        hist.add(0.003)
+        hist.add(100)
+        data = hist.to_dict()
+        self.assertEqual(data["count"], 3)
+        self.assertEqual(data["buckets_ms"], {"<=0.1": 1, "<=5": 1})
+        self.assertEqual(data["overflow"], 1)
+
+    def test_storage_is_instrumented(self):
+        """Тест: операции хранилища попадают в глобальную статистику"""
+        profiling.stats.enabled = True
+        storage = Storage(os.path.join(self.test_dir, "notes.json"), use_snapshot=False)
+        storage.save(Note("Тест", "Содержание"))
+        storage.get_all()
+        data = profiling.stats.snapshot()
+        self.assertIn("storage.save", data["timings"])
+        self.assertIn("storage.parse", data["timings"])
+        self.assertEqual(data["counters"]["storage.load.bytes"],
+                         os.path.getsize(storage.file_path))
+
+    def test_dump_and_profile(self):
+        """Тест выгрузки статистики и захвата профиля"""
+        stats = Stats(enabled=True, profile_dir=self.test_dir)
+        stats.record("op", 0.01)
+        path = os.path.join(self.test_dir, "stats.json")
+        self.assertTrue(stats.dump(path))
+        with open(path, encoding='utf-8') as f:
+            self.assertEqual(json.load(f)["timings"]["op"]["count"], 1)
+
+        stats.start_profile()
+        self.assertTrue(stats.profiling)
+        sum(range(1000))
+        summary = stats.stop_profile()
+        self.assertFalse(stats.profiling)
+        self.assertTrue(os.path.exists(summary))
+        self.assertTrue(os.path.exists(summary.replace(".txt", ".prof")))
+
+
+if __name__ == '__main__':
+    unittest.main()
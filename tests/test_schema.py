@@ -0,0 +1,171 @@
+"""
+Тесты для модуля schema.py
+"""
+
+import unittest
+import sys
+import os
+import tempfile
+import shutil
+import json
+import io
+from contextlib import redirect_stdout, redirect_stderr
+from notebook.schema import ValidationError, compile_schema, validate_note, validate_records
+from notebook.storage import Storage, REJECTED_SUFFIX
+from notebook.models import Note
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def make_record(note_id, **fields):
+    record = {"id": note_id, "title": "Тест", "content": "Содержание", "priority": "medium",
+              "status": "active", "tags": ["работа"], "created_at": "2024-01-01T00:00:00"}
+    record.update(fields)
+    return record
+
+
+class TestValidateNote(unittest.TestCase):
+    """Тесты проверки записи"""
+
+    def test_valid_record_returned_as_is(self):
+        """Тест: корректная запись не копируется"""
+        record = make_record(1, rev=2, updated_at="2024-01-02T10:00:00")
+        self.assertIs(validate_note(record), record)
+
+    def test_normalizes_enums(self):
+        """Тест: регистр приоритета и статуса исправляется без изменения исходной записи"""
+        record = make_record(1, priority="HIGH", status="Done")
+        result = validate_note(record)
+        self.assertEqual((result["priority"], result["status"]), ("high", "done"))
+        self.assertEqual(record["priority"], "HIGH")
+
+    def test_missing_field(self):
+        """Тест: отсутствие обязательного поля"""
+        record = make_record(3)
+        del record["content"]
+        with self.assertRaises(ValidationError) as ctx:
+            validate_note(record)
+        self.assertEqual(ctx.exception.note_id, 3)
+        self.assertIn("content", str(ctx.exception))
+
+    def test_bad_values(self):
+        """Тест: недопустимые значения полей"""
+        cases = {
+            "priority": "urgent",
+            "status": 1,
+            "created_at": "вчера",
+            "tags": ["ok", 5],
+            "id": True,
+            "updated_at": "2024-13-01",
+        }
+        for field, value in cases.items():
+            with self.subTest(field=field), self.assertRaises(ValidationError) as ctx:
+                validate_note(make_record(1, **{field: value}))
+            self.assertEqual(ctx.exception.field, field)
+
+    def test_bad_attachments(self):
+        """Тест: каждое вложение проверяется по своей схеме"""
+        digest = "a" * 64
+        cases = [
+            [{"name": "x"}],
+            [{"name": "x", "sha256": "../../../../etc/passwd", "size": 1}],
+            [{"name": "x", "sha256": digest.upper(), "size": 1}],
+            [{"name": "x", "sha256": digest, "size": "1"}],
+            [{"name": 1, "sha256": digest, "size": 1}],
+            ["x"],
+        ]
+        for attachments in cases:
+            with self.subTest(attachments=attachments), self.assertRaises(ValidationError) as ctx:
+                validate_note(make_record(1, attachments=attachments))
+            self.assertEqual(ctx.exception.field, "attachments")
+        record = make_record(1, attachments=[{"name": "x", "sha256": digest, "size": 1}])
+        self.assertIs(validate_note(record), record)
+
+    def test_optional_fields(self):
+        """Тест: необязательные поля могут отсутствовать, updated_at - быть null"""
+        record = make_record(1, updated_at=None)
+        del record["tags"]
+        self.assertIs(validate_note(record), record)
+
+    def test_not_a_dict(self):
+        """Тест: запись должна быть объектом"""
+        with self.assertRaises(ValidationError):
+            validate_note(["id", 1])
+
+    def test_validate_records(self):
+        """Тест пачечной проверки"""
+        valid, rejected = validate_records([make_record(1), make_record(2, status="?")])
+        self.assertEqual([item["id"] for item in valid], [1])
+        self.assertEqual(rejected[0][0]["id"], 2)
+
+    def test_compile_custom_schema(self):
+        """Тест компиляции произвольной схемы"""
+        validate = compile_schema({"name": {"type": str, "required": True, "normalize": str.strip}})
+        self.assertEqual(validate({"name": " x "}), {"name": "x"})
+        with self.assertRaises(ValidationError):
+            validate({})
+
+
+class TestFromDict(unittest.TestCase):
+    """Тесты Note.from_dict"""
+
+    def test_untrusted_raises(self):
+        """Тест: по умолчанию некорректная запись отклоняется"""
+        with self.assertRaises(ValidationError):
+            Note.from_dict(make_record(1, priority="urgent"))
+
+    def test_trusted_skips_validation(self):
+        """Тест: доверенный режим не проверяет запись"""
+        note = Note.from_dict(make_record(1, created_at="вчера"), trusted=True)
+        self.assertEqual(note.created_at, "вчера")
+
+
+class TestStorageValidation(unittest.TestCase):
+    """Тесты проверки при загрузке хранилища"""
+
+    def setUp(self):
+        """Создание временной директории"""
+        self.test_dir = tempfile.mkdtemp()
+        self.test_file = os.path.join(self.test_dir, "notes.json")
+
+    def tearDown(self):
+        """Очистка временной директории после тестов"""
+        shutil.rmtree(self.test_dir)
+
+    def test_invalid_records_skipped_and_kept(self):
+        """Тест: некорректные записи пропускаются и откладываются в отдельный файл"""
+        broken = make_record(2)
+        del broken["title"]
+        with open(self.test_file, 'w', encoding='utf-8') as f:
+            json.dump([make_record(1, priority="LOW"), broken, make_record(3, status="?")], f)
+        storage = Storage(self.test_file)
+        notes = storage.get_all()
+        self.assertEqual([(n.id, n.priority) for n in notes], [(1, "low")])
+        # повторная загрузка (из снимка) не дублирует отложенные записи
+        storage.get_all()
+        Storage(self.test_file, use_snapshot=False).get_all()
+        with open(self.test_file + REJECTED_SUFFIX, encoding='utf-8') as f:
+            self.assertEqual([item["id"] for item in json.load(f)], [2, 3])
+
+    def test_bad_attachment_does_not_break_gc(self):
+        """Тест: заметка с неполным описанием вложения не доходит до сборки мусора"""
+        with open(self.test_file, 'w', encoding='utf-8') as f:
+            json.dump([make_record(1), make_record(2, attachments=[{"name": "x"}])], f)
+        storage = Storage(self.test_file)
+        self.assertEqual(storage.collect_garbage(), {"removed": 0, "bytes": 0})
+        self.assertEqual([n.id for n in storage.get_all()], [1])
+
+    def test_iter_notes_skips_invalid(self):
+        """Тест: потоковое чтение пропускает некорректные записи"""
+        with open(self.test_file, 'w', encoding='utf-8') as f:
+            json.dump([make_record(1), make_record(2, created_at=None)], f)
+        out, err = io.StringIO(), io.StringIO()
+        with redirect_stdout(out), redirect_stderr(err):
+            self.assertEqual([n.id for n in Storage(self.test_file).iter_notes()], [1])
+        # stdout может быть потоком выгрузки, сообщение уходит в stderr
+        self.assertEqual(out.getvalue(), "")
+        self.assertIn("Заметка 2", err.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+"""
+Тесты для модуля search.py
+"""
+
+import unittest
+import sys
+import os
+from unittest import mock
+from notebook.models import Note
+from notebook.search import TrigramIndex, word_trigrams
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def make_note(note_id, title, content, tags=None):
+    """Создает заметку с назначенным ID"""
+    note = Note(title, content, tags=tags)
+    note.id = note_id
+    return note
+
+
+class TestTrigramIndex(unittest.TestCase):
+    """Тесты для класса TrigramIndex"""
+
+    def setUp(self):
+        """Создание индекса с тестовыми заметками"""
+        self.index = TrigramIndex([
+            make_note(1, "Покупки", "Молоко и хлеб", tags=["дом"]),
+            make_note(2, "Уроки", "Сделать математику", tags=["учеба"]),
+            make_note(3, "Работа", "Подготовить отчет", tags=["работа"]),
+            make_note(4, "Урок физики", "Повторить уроки", tags=["учеба"]),
+        ])
+
+    def test_word_trigrams(self):
+        """Тест разбиения слова на триграммы"""
+        self.assertEqual(word_trigrams("кот"), {"  к", " ко", "кот", "от "})
+
+    def test_exact_substring(self):
+        """Тест точного поиска по подстроке, как в прежнем поиске"""
+        self.assertEqual([n.id for n in self.index.search("АБОТ", fuzzy=False)], [3])
+        self.assertEqual([n.id for n in self.index.search("#учеба", fuzzy=False)], [2, 4])
+        self.assertEqual(self.index.search("урки", fuzzy=False), [])
+
+    def test_exact_matches_plain_substring(self):
+        """Тест: поиск по словарю и по текстам дает то же, что проверка подстроки"""
+        self.index.add(make_note(1, "Покупки", "Молоко, хлеб и урок"))  # теперь последняя
+        notes = self.index.notes()
+        for query in ("у", "ур", "урок", "роки", "оло", "ко, х", "и у", "zzz"):
+            with self.subTest(query=query):
+                expected = [n.id for n in notes if query in f"{n.title} {n.content} {n.tags}".lower()]
+                self.assertEqual([n.id for n in self.index.search(query, fuzzy=False)], expected)
+
+    def test_empty_query_returns_all(self):
+        """Тест: пустой запрос возвращает все заметки по порядку"""
+        self.assertEqual([n.id for n in self.index.search("")], [1, 2, 3, 4])
+
+    def test_fuzzy_finds_typo(self):
+        """Тест нечеткого поиска с опечаткой"""
+        ids = [n.id for n in self.index.search("урки")]
+        self.assertEqual(sorted(ids), [2, 4])
+
+    def test_fuzzy_ranking(self):
+        """Тест ранжирования: точные совпадения выше похожих"""
+        results = self.index.fuzzy("уроки")
+        self.assertEqual([n.id for n, _ in results], [2, 4])
+        self.assertEqual(results[0][1], 1.0)
+
+        results = self.index.fuzzy("малоко")
+        self.assertEqual(results[0][0].id, 1)
+        self.assertLess(results[0][1], 1.0)
+
+    def test_add_and_remove(self):
+        """Тест обновления индекса"""
+        self.index.add(make_note(5, "Врач", "Записаться к врачу"))
+        self.assertEqual([n.id for n in self.index.search("врач", fuzzy=False)], [5])
+
+        self.index.add(make_note(1, "Покупки", "Кефир"))
+        self.assertEqual(self.index.search("молоко", fuzzy=False), [])
+
+        self.assertTrue(self.index.remove(5))
+        self.assertFalse(self.index.remove(5))
+        self.assertEqual(self.index.search("врач"), [])
+        self.assertEqual(len(self.index), 4)
+
+
+class TestQueryCache(unittest.TestCase):
+    """Тесты кэша результатов поиска"""
+
+    def setUp(self):
+        """Создание индекса с маленьким кэшем"""
+        self.index = TrigramIndex([
+            make_note(1, "Работа", "Отчет"),
+            make_note(2, "Рабочий план", "Встреча"),
+            make_note(3, "Дом", "Уборка"),
+        ], cache_size=3)
+
+    def test_prefix_narrowing(self):
+        """Тест: продолжение запроса фильтрует прошлый результат"""
+        self.assertEqual([n.id for n in self.index.search("раб", fuzzy=False)], [1, 2])
+        with mock.patch.object(self.index, "_scan", side_effect=AssertionError("полный скан")):
+            self.assertEqual([n.id for n in self.index.search("рабо", fuzzy=False)], [1, 2])
+            self.assertEqual([n.id for n in self.index.search("работ", fuzzy=False)], [1])
+            self.assertEqual([n.id for n in self.index.search("раб", fuzzy=False)], [1, 2])
+
+    def test_invalidation_on_change(self):
+        """Тест: изменение данных сбрасывает кэш"""
+        self.index.search("раб", fuzzy=False)
+        generation = self.index.generation
+        self.index.add(make_note(4, "Работник", "Новый"))
+        self.assertEqual(self.index.generation, generation + 1)
+        self.assertEqual([n.id for n in self.index.search("раб", fuzzy=False)], [1, 2, 4])
+        self.index.remove(1)
+        self.assertEqual([n.id for n in self.index.search("рабо", fuzzy=False)], [2, 4])
+
+    def test_lru_eviction(self):
+        """Тест вытеснения самых старых запросов"""
+        for query in ("дом", "раб", "отчет", "уборка"):
+            self.index.search(query, fuzzy=False)
+        self.assertEqual(len(self.index._cache), 3)
+        self.assertNotIn(("exact", "дом", self.index.generation), self.index._cache)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+"""
+Тесты для модуля snapshot.py
+"""
+
+import unittest
+import sys
+import os
+import tempfile
+import shutil
+import json
+import marshal
+from unittest import mock
+from notebook.snapshot import load_snapshot, write_snapshot, snapshot_path, file_signature
+from notebook.storage import Storage
+from notebook.models import Note
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class TestSnapshot(unittest.TestCase):
+    """Тесты теплого снимка хранилища"""
+
+    def setUp(self):
+        """Создание временного файла заметок"""
+        self.test_dir = tempfile.mkdtemp()
+        self.test_file = os.path.join(self.test_dir, "notes.json")
+        self.data = [{"id": 1, "title": "Тест", "content": "Содержание", "priority": "medium",
+                      "status": "active", "tags": [], "created_at": "2024-01-01T00:00:00"}]
+        with open(self.test_file, 'w', encoding='utf-8') as f:
+            json.dump(self.data, f)
+
+    def tearDown(self):
+        """Очистка временной директории после тестов"""
+        shutil.rmtree(self.test_dir)
+
+    def test_roundtrip(self):
+        """Тест записи и чтения снимка"""
+        self.assertIsNone(load_snapshot(self.test_file))
+        self.assertTrue(write_snapshot(self.test_file, self.data))
+        self.assertEqual(load_snapshot(self.test_file), self.data)
+
+    def test_invalidated_by_file_change(self):
+        """Тест: снимок устаревает при изменении файла"""
+        write_snapshot(self.test_file, self.data)
+        with open(self.test_file, 'a', encoding='utf-8') as f:
+            f.write(" ")
+        self.assertIsNone(load_snapshot(self.test_file))
+
+    def test_stale_signature_is_rejected(self):
+        """Тест: снимок с подписью прочитанной до изменения версии не используется"""
+        signature = file_signature(self.test_file)
+        with open(self.test_file, 'w', encoding='utf-8') as f:
+            json.dump(self.data * 2, f)
+        write_snapshot(self.test_file, self.data, signature)
+        self.assertIsNone(load_snapshot(self.test_file))
+
+    def test_corrupted_snapshot(self):
+        """Тест: поврежденный снимок игнорируется"""
+        with open(snapshot_path(self.test_file), 'wb') as f:
+            f.write(b"\x00garbage")
+        self.assertIsNone(load_snapshot(self.test_file))
+
+    def test_unvalidated_old_snapshot_ignored(self):
+        """Тест: снимок прежнего формата (без проверки по схеме) не используется"""
+        del self.data[0]["title"]
+        with open(self.test_file, 'w', encoding='utf-8') as f:
+            json.dump(self.data, f)
+        old_tag = (1, marshal.version, sys.version_info[:2])
+        with mock.patch("notebook.snapshot._TAG", old_tag):
+            write_snapshot(self.test_file, self.data)
+        self.assertIsNone(load_snapshot(self.test_file))
+        self.assertEqual(Storage(self.test_file).get_all(), [])
+
+    def test_storage_uses_snapshot(self):
+        """Тест: повторная загрузка хранилища не разбирает JSON"""
+        storage = Storage(self.test_file)
+        self.assertEqual(storage.get_all()[0].title, "Тест")
+        self.assertTrue(os.path.exists(snapshot_path(self.test_file)))
+
+        with mock.patch("notebook.storage.json.loads", side_effect=AssertionError("разбор JSON")):
+            self.assertEqual(Storage(self.test_file).get_all()[0].title, "Тест")
+
+        storage.save(Note("Вторая", "Содержание"))
+        with mock.patch("notebook.storage.json.loads", side_effect=AssertionError("разбор JSON")):
+            self.assertEqual(len(Storage(self.test_file).get_all()), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
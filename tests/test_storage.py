@@ -8,6 +8,7 @@ import os
 import tempfile
 import shutil
 import json
+from unittest import mock
 from notebook.storage import Storage
 from notebook.models import Note
 
@@ -97,6 +98,29 @@ class TestStorage(unittest.TestCase):
         notes = self.storage.get_all()
         self.assertEqual(len(notes), 1)
 
+    def test_generation_changes_on_write(self):
+        """Тест поколения данных: растет только при изменении файла"""
+        self.assertEqual(self.storage.generation, 0)
+        note = Note("Тест", "Содержание")
+        self.storage.save(note)
+        self.assertEqual(self.storage.generation, 1)
+
+        self.assertFalse(self.storage.delete(999))
+        self.assertEqual(self.storage.generation, 1)
+
+        self.storage.delete(note.id)
+        self.assertEqual(self.storage.generation, 2)
+
+    def test_interrupted_write_keeps_file(self):
+        """Тест: прерванная запись не портит файл заметок"""
+        self.storage.save(Note("Первая", "Содержание"))
+        with open(self.test_file, 'rb') as f:
+            before = f.read()
+        with mock.patch("notebook.storage.os.replace", side_effect=OSError("прервано")):
+            self.assertFalse(self.storage.save(Note("Вторая", "Содержание")))
+        with open(self.test_file, 'rb') as f:
+            self.assertEqual(f.read(), before)
+
     def test_load_from_nonexistent_file(self):
         """Тест загрузки из несуществующего файла"""
         storage = Storage("nonexistent_file.json")
@@ -0,0 +1,149 @@
+"""
+Тесты для модуля sync.py
+"""
+
+import unittest
+import sys
+import os
+import tempfile
+import shutil
+from notebook.sync import sync, root_hash, collect, merkle_tree, changed_buckets, BUCKET_SIZE
+from notebook.storage import Storage
+from notebook.models import Note
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class TestSync(unittest.TestCase):
+    """Тесты синхронизации двух хранилищ в разных директориях"""
+
+    def setUp(self):
+        """Создание двух временных хранилищ"""
+        self.dir_a = tempfile.mkdtemp()
+        self.dir_b = tempfile.mkdtemp()
+        self.a = Storage(os.path.join(self.dir_a, "notes.json"))
+        self.b = Storage(os.path.join(self.dir_b, "notes.json"))
+
+    def tearDown(self):
+        """Очистка временных директорий после тестов"""
+        shutil.rmtree(self.dir_a)
+        shutil.rmtree(self.dir_b)
+
+    def titles(self, storage):
+        return {n.id: n.title for n in storage.get_all()}
+
+    def test_new_notes_both_ways(self):
+        """Тест передачи новых заметок в обе стороны"""
+        self.a.save(Note("Из A", "Текст"))
+        self.b.save(Note("Из B", "Текст"))
+        self.b.save(Note("Еще из B", "Текст"))
+        # ID 1 и 2 заняты разными заметками: более поздние переносятся на новые ID
+        result = sync(self.a, self.b)
+        self.assertEqual(self.titles(self.a), self.titles(self.b))
+        self.assertEqual(sorted(self.titles(self.a).values()), ["Еще из B", "Из A", "Из B"])
+        self.assertEqual(root_hash(self.a), root_hash(self.b))
+        self.assertEqual(result["renumbered"], 1)
+        self.assertEqual(result["sent"] + result["received"], 3)
+
+    def test_notes_added_after_sync_both_kept(self):
+        """Тест: заметки, добавленные на обеих сторонах после синхронизации, не теряются"""
+        self.a.save(Note("shared", "Текст"))
+        sync(self.a, self.b)
+        self.a.save(Note("only on A", "Текст"))
+        self.b.save(Note("only on B", "Текст"))
+        self.assertEqual(sync(self.a, self.b)["renumbered"], 1)
+        expected = {1: "shared", 2: "only on A", 3: "only on B"}
+        self.assertEqual(self.titles(self.a), expected)
+        self.assertEqual(self.titles(self.b), expected)
+        # на прежнем ID перенесенной заметки нет надгробия
+        self.assertEqual(sync(self.a, self.b)["buckets"], 0)
+        self.assertEqual(self.titles(self.a), expected)
+
+    def test_higher_rev_wins(self):
+        """Тест: более новая правка побеждает, старая версия остается в истории"""
+        note = Note("Общая", "Текст")
+        self.a.save(note)
+        sync(self.a, self.b)
+        edited = self.b.get(1)
+        edited.title = "Правка B"
+        self.b.save(edited)
+        edited.title = "Вторая правка B"
+        self.b.save(edited)
+        other = self.a.get(1)
+        other.title = "Правка A"
+        self.a.save(other)
+        sync(self.a, self.b)
+        self.assertEqual(self.titles(self.a), {1: "Вторая правка B"})
+        self.assertEqual(self.titles(self.b), {1: "Вторая правка B"})
+        self.assertIn("Правка A", [r["title"] for r in self.a.history(1)])
+
+    def test_conflict_is_deterministic(self):
+        """Тест: при равном rev обе стороны выбирают одного победителя"""
+        self.a.save(Note("Общая", "Текст"))
+        sync(self.a, self.b)
+        for storage, title in ((self.a, "Вариант A"), (self.b, "Вариант B")):
+            note = storage.get(1)
+            note.title = title
+            storage.save(note)
+        sync(self.a, self.b)
+        self.assertEqual(self.titles(self.a), self.titles(self.b))
+        self.assertEqual(sync(self.a, self.b), {"buckets": 0, "renumbered": 0, "sent": 0, "received": 0})
+
+    def test_overwritten_note_without_history_kept(self):
+        """Тест: локальная версия без истории остается в истории после перезаписи"""
+        self.a.save(Note("Общая", "Текст"))
+        sync(self.a, self.b)
+        shutil.rmtree(self.b.versions.directory)
+        note = self.a.get(1)
+        note.content = "Правка A"
+        self.a.save(note)
+        sync(self.a, self.b)
+        self.assertEqual(self.b.get(1).content, "Правка A")
+        self.assertEqual(self.b.versions.get(1, 1)["content"], "Текст")
+
+    def test_delete_propagates(self):
+        """Тест: удаление передается и не воскрешается"""
+        self.a.save(Note("Первая", "Текст"))
+        self.a.save(Note("Вторая", "Текст"))
+        sync(self.a, self.b)
+        self.b.delete(1)
+        sync(self.a, self.b)
+        self.assertEqual(self.titles(self.a), {2: "Вторая"})
+        sync(self.a, self.b)
+        self.assertEqual(self.titles(self.b), {2: "Вторая"})
+
+    def test_restore_after_delete_wins(self):
+        """Тест: восстановленная заметка новее своего удаления"""
+        self.a.save(Note("Заметка", "Текст"))
+        sync(self.a, self.b)
+        self.a.delete(1)
+        sync(self.a, self.b)
+        self.assertTrue(self.b.restore(1, 1))
+        sync(self.a, self.b)
+        self.assertEqual(self.titles(self.a), {1: "Заметка"})
+
+    def test_only_changed_notes_transferred(self):
+        """Тест: передаются только измененные заметки из различающихся корзин"""
+        for i in range(3 * BUCKET_SIZE):
+            self.a.save(Note(f"Заметка {i}", "Текст"))
+        self.assertEqual(sync(self.a, self.b)["sent"], 3 * BUCKET_SIZE)
+        note = self.a.get(BUCKET_SIZE + 5)
+        note.content = "Новый текст"
+        self.a.save(note)
+        self.assertEqual(sync(self.a, self.b), {"buckets": 1, "renumbered": 0, "sent": 1, "received": 0})
+        self.assertEqual(self.b.get(BUCKET_SIZE + 5).content, "Новый текст")
+
+    def test_changed_buckets(self):
+        """Тест поиска различающихся корзин по дереву"""
+        for i in range(2 * BUCKET_SIZE):
+            self.a.save(Note(f"Заметка {i}", "Текст"))
+        sync(self.a, self.b)
+        self.b.delete(3)
+        tree_a = merkle_tree(collect(self.a), 2)
+        tree_b = merkle_tree(collect(self.b), 2)
+        self.assertEqual(changed_buckets(tree_a, tree_b), [0])
+        self.assertEqual(changed_buckets(tree_a, tree_a), [])
+
+
+if __name__ == '__main__':
+    unittest.main()